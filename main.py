@@ -1,12 +1,45 @@
 
+import atexit
+import os
+import threading
+
 import flet as ft
 from src.theme import AppTheme
 from src.components.sidebar import Sidebar
-from src.pages.dashboard import get_dashboard_page
-from src.components.study_modal import StudyModal
-from src.components.timer_overlay import TimerOverlay
-from src.components.planning_wizard import PlanningWizard
 from src.utils.navigation import NavigationManager
+from src.utils.ui_metrics import ENV_FLAG
+
+# Only the shell (app bar + sidebar) is imported up front. Pages, modals and
+# the timer overlay are imported when first needed, and the database schema
+# pass runs in the background after the first frame.
+
+
+def lazy(factory):
+    """Return a getter that builds the object on first call and reuses it."""
+    lock = threading.Lock()
+    instance = []
+
+    def get():
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+    return get
+
+
+def enable_ui_metrics():
+    """Debug mode: count controls/updates per interaction, report at exit."""
+    from src.utils.ui_metrics import metrics
+    from src.pages.dashboard import DashboardPage
+    from src.pages.reviews import ReviewsPage
+
+    metrics.install(ft.Control, ft.Page)
+    metrics.instrument_method(Sidebar, "handle_click")
+    metrics.instrument_method(ReviewsPage, "update_list_ui")
+    metrics.instrument_method(DashboardPage, "reload_data")
+    metrics.instrument_method(NavigationManager, "navigate_to", page="Navegação")
+    atexit.register(lambda: print(metrics.format_report()))
+
 
 def main(page: ft.Page):
     page.title = "Estudei - Gerenciador de Estudos"
@@ -36,18 +69,26 @@ def main(page: ft.Page):
         ]
     )
 
-    # Content Area - This container holds the current page
-    content_area = ft.Container(expand=True, content=get_dashboard_page(page))
+    # Content Area - This container holds the current page.
+    # Starts with a spinner; the dashboard is swapped in once the DB is ready.
+    content_area = ft.Container(
+        expand=True,
+        alignment=ft.Alignment(0, 0),
+        content=ft.ProgressRing(color=AppTheme.primary)
+    )
     
     # Initialize Navigation Manager (attaches to page.nav)
     nav = NavigationManager(page, content_area)
 
-    # Timer Overlay
-    timer_overlay = TimerOverlay(page)
-    page.overlay.append(timer_overlay)
-    
-    # Wizard instance
-    planning_wizard = PlanningWizard(page)
+    # Timer Overlay (built in the background or on first use)
+    def create_timer_overlay():
+        from src.components.timer_overlay import TimerOverlay
+        overlay = TimerOverlay(page)
+        page.overlay.append(overlay)
+        page.update()  # Mount it now, or show() has no page to update
+        return overlay
+
+    get_timer_overlay = lazy(create_timer_overlay)
 
     def nav_change(label):
         """Handle sidebar navigation clicks."""
@@ -65,19 +106,30 @@ def main(page: ft.Page):
         page_name = page_map.get(label, "dashboard")
         
         if page_name == "planning":
-            nav.navigate_to(page_name, on_timer_click=lambda: timer_overlay.show())
+            nav.navigate_to(page_name, on_timer_click=lambda: get_timer_overlay().show())
         else:
             nav.navigate_to(page_name)
 
-    # Modal instance
-    study_modal = StudyModal()
+    # Modal instance, built on first open
+    def create_study_modal():
+        from src.components.study_modal import StudyModal
+        return StudyModal()
+
+    get_study_modal = lazy(create_study_modal)
     
     def open_study_modal(e):
+        study_modal = get_study_modal()
         page.dialog = study_modal
         study_modal.open = True
         page.dialog.open = True
         page.update()
 
+    def on_keyboard(e):
+        from src.components.undo_snackbar import handle_undo_shortcut
+        handle_undo_shortcut(page, e)
+
+    page.on_keyboard_event = on_keyboard
+
     # Floating Action Button
     page.floating_action_button = ft.FloatingActionButton(
         icon=ft.Icons.ADD,
@@ -95,8 +147,27 @@ def main(page: ft.Page):
             expand=True
         )
 
+    # Paint the shell first
     page.add(app_layout())
     page.update()
 
+    def finish_startup():
+        from src.data.database import db
+        db.init_db()  # Schema + migrations, off the UI's first frame
+
+        # Don't clobber a page the user already navigated to
+        if nav.current_page_name == "dashboard" and isinstance(content_area.content, ft.ProgressRing):
+            from src.pages.dashboard import get_dashboard_page
+            content_area.content = get_dashboard_page(page)
+            content_area.alignment = None
+            page.update()
+
+        # Offer to recover a timer session interrupted by a crash or sleep
+        get_timer_overlay().prompt_recovery()
+
+    threading.Thread(target=finish_startup, daemon=True, name="startup").start()
+
 if __name__ == "__main__":
+    if os.environ.get(ENV_FLAG) == "1":
+        enable_ui_metrics()
     ft.app(target=main)
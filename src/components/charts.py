@@ -3,16 +3,18 @@ import flet as ft
 from src.theme import AppTheme
 
 class StudyChart(ft.Container):
-    def __init__(self):
+    def __init__(self, data=None):
+        """data: [(label, hours)] for the week; queried when not given."""
         super().__init__()
         self.bgcolor = AppTheme.surface
         self.border_radius = 10
         self.padding = 20
         # self.height = 300 # Let it expand or fixed
         
-        # self.height = 300 # Let it expand or fixed
-        import src.data.crud as crud
-        raw_data = crud.get_weekly_study_data()
+        if data is None:
+            import src.data.crud as crud
+            data = crud.get_weekly_study_data()
+        raw_data = data
         
         # Find max for scaling
         max_val = max([d[1] for d in raw_data]) if raw_data else 1
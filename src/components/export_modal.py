@@ -0,0 +1,105 @@
+
+import flet as ft
+from src.theme import AppTheme
+from src.data import export
+
+
+class ExportModal(ft.AlertDialog):
+    """Pick a folder and format, then stream every table out in the background."""
+
+    def __init__(self, page: ft.Page):
+        super().__init__()
+        self.page_ref = page
+        self.modal = True
+        self.bgcolor = AppTheme.surface
+        self.title = ft.Text("Exportar Dados", color="white")
+        self.dest_dir = None
+        self.cancel_event = None
+
+        self.dir_picker = ft.FilePicker(on_result=self.on_dir_picked)
+        self.page_ref.overlay.append(self.dir_picker)
+
+        self.dropdown_format = ft.Dropdown(
+            label="Formato",
+            value="csv",
+            options=[ft.dropdown.Option("csv", "CSV"), ft.dropdown.Option("jsonl", "JSON Lines")],
+            width=200,
+            bgcolor="#25263a",
+            border_radius=5
+        )
+        self.dir_text = ft.Text("Nenhuma pasta selecionada", color="grey", size=12)
+        self.progress_bar = ft.ProgressBar(value=0, color=AppTheme.primary, bgcolor="#2c2d3e", visible=False)
+        self.status_text = ft.Text("", color="grey", size=12)
+
+        self.content = ft.Container(
+            width=450,
+            content=ft.Column([
+                ft.Text("Sessões, tópicos, simulados e lembretes, um arquivo por tabela.", size=12, color="grey"),
+                ft.Container(height=10),
+                self.dropdown_format,
+                ft.Row([
+                    ft.ElevatedButton("Escolher Pasta", icon=ft.Icons.FOLDER_OPEN, on_click=lambda _: self.dir_picker.get_directory_path()),
+                    self.dir_text
+                ]),
+                ft.Container(height=10),
+                self.progress_bar,
+                self.status_text,
+            ], tight=True)
+        )
+
+        self.btn_export = ft.ElevatedButton("Exportar", on_click=self.start_export, bgcolor=AppTheme.primary, color="white")
+        self.actions = [
+            ft.TextButton("Cancelar", on_click=self.cancel_or_close),
+            self.btn_export
+        ]
+
+    def on_dir_picked(self, e):
+        if e.path:
+            self.dest_dir = e.path
+            self.dir_text.value = e.path
+            self.dir_text.color = "white"
+            self.dir_text.update()
+
+    def start_export(self, e):
+        if not self.dest_dir:
+            self.set_status("Selecione uma pasta de destino.", "red")
+            return
+        self.btn_export.disabled = True
+        self.progress_bar.value = 0
+        self.progress_bar.visible = True
+        self.set_status("Exportando...", "grey")
+        self.cancel_event = export.start_export(
+            self.dest_dir, self.dropdown_format.value,
+            on_progress=self.on_progress, on_done=self.on_done,
+        )
+
+    def on_progress(self, done, total):
+        # Called from the export thread
+        self.progress_bar.value = done / total if total else 1
+        self.status_text.value = f"{done}/{total} registros"
+        if self.page:
+            self.update()
+
+    def on_done(self, result, error):
+        self.cancel_event = None
+        self.btn_export.disabled = False
+        if isinstance(error, export.ExportCancelled):
+            self.set_status("Exportação cancelada.", "grey")
+        elif error:
+            self.set_status(f"Erro ao exportar: {error}", "red")
+        else:
+            self.set_status(f"{sum(result.values())} registros exportados para {self.dest_dir}", AppTheme.primary)
+
+    def set_status(self, text, color):
+        self.status_text.value = text
+        self.status_text.color = color
+        if self.page:
+            self.update()
+
+    def cancel_or_close(self, e):
+        if self.cancel_event:
+            self.cancel_event.set()
+            return
+        self.open = False
+        self.page_ref.close_dialog()
+        self.page_ref.update()
@@ -1,8 +1,21 @@
 
 import flet as ft
 from src.theme import AppTheme
-from src.utils.pdf_parser import PDFParser
+import os
+import threading
+from src.utils.pdf_parser import BatchExtraction, PDFExtractionJob
+from src.utils.parse_cache import ParseCache, CACHE_DIR_NAME, content_key
+from src.utils.topic_merge import normalize_title
 import src.data.crud as crud
+from src.utils.events import bus, EventType
+
+
+def guess_subject(file_name, subject_names):
+    """Longest subject name contained in the file name ("Direito_Penal_2024.pdf"), or None."""
+    key = f" {normalize_title(os.path.splitext(file_name)[0].replace('_', ' '))} "
+    found = [name for name in subject_names if normalize_title(name) and f" {normalize_title(name)} " in key]
+    return max(found, key=len) if found else None
+
 
 class ImportSyllabusModal(ft.AlertDialog):
     def __init__(self, page: ft.Page, on_import_success=None):
@@ -16,13 +29,20 @@ class ImportSyllabusModal(ft.AlertDialog):
         # State
         self.selected_file = None
         self.extracted_topics = []
+        self.job = None
+        self.batch = None  # Per-file state when several PDFs are picked
+        self.batch_job = None
+        # Parsed editais, kept next to the database
+        self.cache = ParseCache(os.path.join(os.path.dirname(os.path.abspath(crud.db.DB_NAME)), CACHE_DIR_NAME))
         
         # Components
         self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
         self.page_ref.overlay.append(self.file_picker)
         
-        self.btn_pick = ft.ElevatedButton("Selecionar PDF", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: self.file_picker.pick_files())
+        self.btn_pick = ft.ElevatedButton("Selecionar PDF", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: self.file_picker.pick_files(allow_multiple=True))
         self.status_text = ft.Text("", color="grey", size=12)
+        self.progress_bar = ft.ProgressBar(value=0, color=AppTheme.primary, bgcolor="#2c2d3e", visible=False)
+        self.btn_cancel_extract = ft.TextButton("Cancelar leitura", on_click=self.cancel_extraction, visible=False)
         
         self.dropdown_subject = ft.Dropdown(
             label="Vincular a Disciplina",
@@ -33,16 +53,24 @@ class ImportSyllabusModal(ft.AlertDialog):
             border_radius=5
         )
         
+        self.check_merge = ft.Checkbox(
+            label="Mesclar com os tópicos existentes (edital retificado)", value=False,
+            tooltip="Atualiza os tópicos existentes e remove os que saíram do edital, "
+                    "exceto os concluídos, com material ou já estudados"
+        )
+        
         self.preview_container = ft.Column(scroll=ft.ScrollMode.AUTO, height=200)
         
         self.content = ft.Container(
             width=500,
             content=ft.Column([
-                ft.Text("Selecione um PDF do edital para extrair os tópicos automaticamente.", size=12, color="grey"),
+                ft.Text("Selecione um PDF do edital (ou um por disciplina) para extrair os tópicos automaticamente.", size=12, color="grey"),
                 ft.Container(height=10),
                 self.dropdown_subject,
+                self.check_merge,
                 ft.Container(height=10),
-                ft.Row([self.btn_pick, self.status_text]),
+                ft.Row([self.btn_pick, self.status_text, self.btn_cancel_extract]),
+                self.progress_bar,
                 ft.Divider(),
                 ft.Text("Pré-visualização dos Tópicos:", weight=ft.FontWeight.BOLD, color="white", size=12),
                 ft.Container(
@@ -54,9 +82,10 @@ class ImportSyllabusModal(ft.AlertDialog):
             ])
         )
         
+        self.btn_import = ft.ElevatedButton("Importar", on_click=self.save_topics, bgcolor=AppTheme.primary, color="white")
         self.actions = [
             ft.TextButton("Cancelar", on_click=self.close_modal),
-            ft.ElevatedButton("Importar", on_click=self.save_topics, bgcolor=AppTheme.primary, color="white")
+            self.btn_import
         ]
         
         self.load_subjects()
@@ -67,30 +96,205 @@ class ImportSyllabusModal(ft.AlertDialog):
         self.dropdown_subject.options = [ft.dropdown.Option(name) for name in self.subject_map.keys()]
 
     def on_file_picked(self, e):
-        if e.files:
+        if e.files and len(e.files) > 1:
+            self.start_batch(e.files)
+        elif e.files:
+            self.batch = None
+            self.dropdown_subject.visible = True
             file_path = e.files[0].path
             self.status_text.value = e.files[0].name
             self.status_text.color = "white"
-            self.status_text.update()
-            
-            # Parse
-            parser = PDFParser()
-            self.extracted_topics = parser.extract_topics(file_path)
+            self.cancel_extraction(None)
             
+            # Cache hit previews at once; otherwise parse in a worker
+            # process and stream pages back through its queue
+            self.extracted_topics = []
             self.preview_container.controls.clear()
-            if self.extracted_topics:
-                 count = len(self.extracted_topics)
-                 self.extract_count = count
-                 for t in self.extracted_topics[:20]: # Show first 20
-                     self.preview_container.controls.append(ft.Text(f"• {t}", size=12, color="grey"))
-                 if count > 20:
-                     self.preview_container.controls.append(ft.Text(f"... e mais {count-20} tópicos.", size=12, color=AppTheme.primary))
-            else:
-                 self.preview_container.controls.append(ft.Text("Nenhum tópico identificado. Tente outro formato.", color="red"))
+            self.more_text = None
+            self.progress_bar.value = 0
+            self.progress_bar.visible = True
+            self.btn_cancel_extract.visible = True
+            self.btn_import.disabled = True
+            self.update()
             
-            self.preview_container.update()
+            self.job = PDFExtractionJob(file_path)
+            threading.Thread(target=self.load_file, args=(self.job,), daemon=True, name="pdf-extract").start()
+
+    def load_file(self, job):
+        """Background thread: hash the file, use the cached topics or start the worker."""
+        try:
+            key = content_key(job.file_path)
+        except OSError:
+            key = None
+        cached = self.cache.get(key) if key else None
+        if job is not self.job:
+            return  # Replaced or cancelled while hashing
+        if cached is None:
+            self.consume_job(job.start(), key)
+            return
+        self.add_preview(cached)
+        self.status_text.value = f"{len(self.extracted_topics)} tópicos encontrados"
+        self.finish_extraction()
+
+    def finish_extraction(self):
+        self.job = None
+        self.progress_bar.visible = False
+        self.btn_cancel_extract.visible = False
+        self.btn_import.disabled = False
+        if self.page:
+            self.update()
+
+    def consume_job(self, job, cache_key=None):
+        """Background thread: apply worker messages to the dialog."""
+        for message in job.messages():
+            if job is not self.job:
+                return  # Replaced by another file
+            kind = message[0]
+            if kind == "page":
+                _, number, page_count, topics = message
+                self.add_preview(topics)
+                self.progress_bar.value = number / page_count if page_count else 1
+                self.status_text.value = f"Página {number}/{page_count} · {len(self.extracted_topics)} tópicos"
+            elif kind == "done":
+                self.status_text.value = f"{len(self.extracted_topics)} tópicos encontrados"
+                if not self.extracted_topics:
+                    self.preview_container.controls.append(ft.Text("Nenhum tópico identificado. Tente outro formato.", color="red"))
+                elif cache_key:
+                    self.cache.put(cache_key, self.extracted_topics)
+            elif kind == "cancelled":
+                self.extracted_topics = []
+                self.preview_container.controls.clear()
+                self.status_text.value = "Leitura cancelada"
+            else:
+                self.extracted_topics = []
+                self.status_text.value = f"Erro ao ler o PDF: {message[1]}"
+                self.status_text.color = "red"
+            if kind != "page":
+                self.finish_extraction()
+            elif self.page:
+                self.update()
+
+    def start_batch(self, files):
+        """Several PDFs: one row per file with its subject, parsed in a process pool."""
+        self.cancel_extraction(None)
+        self.extracted_topics = []
+        self.dropdown_subject.visible = False
+        names = list(self.subject_map.keys())
+        self.batch = []
+        for f in files:
+            item = {
+                "path": f.path,
+                "topics": None,
+                "dropdown": ft.Dropdown(
+                    options=[ft.dropdown.Option(name) for name in names], value=guess_subject(f.name, names),
+                    width=190, dense=True, text_style=ft.TextStyle(color="white", size=12), bgcolor="#25263a"
+                ),
+                "bar": ft.ProgressBar(value=0, width=80, color=AppTheme.primary, bgcolor="#2c2d3e"),
+                "status": ft.Text("Na fila", size=11, color="grey"),
+            }
+            self.batch.append(item)
+        self.preview_container.controls = [
+            ft.Row([
+                ft.Text(f.name, size=12, color="white", width=130, no_wrap=True, tooltip=f.name),
+                item["dropdown"], item["bar"], item["status"],
+            ])
+            for f, item in zip(files, self.batch)
+        ]
+        self.status_text.value = f"{len(files)} arquivos"
+        self.status_text.color = "white"
+        self.progress_bar.value = 0
+        self.progress_bar.visible = True
+        self.btn_cancel_extract.visible = True
+        self.btn_import.disabled = True
+        self.update()
+
+        self.batch_job = BatchExtraction([])
+        threading.Thread(target=self.run_batch, args=(self.batch, self.batch_job), daemon=True, name="pdf-batch").start()
+
+    def run_batch(self, batch, extraction):
+        """Background thread: cached files first, the rest in parallel."""
+        misses = []
+        for item in batch:
+            try:
+                item["key"] = content_key(item["path"])
+            except OSError:
+                item["key"] = None
+            cached = self.cache.get(item["key"]) if item["key"] else None
+            if cached is None:
+                misses.append(item)
+            else:
+                self.on_batch_file(item, ("done", cached), cache=False)
+
+        extraction.file_paths = [item["path"] for item in misses]
+        extraction.run(
+            on_page=lambda i, number, page_count: self.on_batch_page(misses[i], number, page_count),
+            on_file=lambda i, result: self.on_batch_file(misses[i], result),
+        )
+        if batch is not self.batch:
+            return
+        ready = [item for item in batch if item["topics"]]
+        self.status_text.value = f"{len(ready)}/{len(batch)} arquivos · {sum(len(i['topics']) for i in ready)} tópicos"
+        self.batch_job = None
+        self.finish_extraction()
+
+    def on_batch_page(self, item, number, page_count):
+        item["bar"].value = number / page_count if page_count else 1
+        item["status"].value = f"Pág. {number}/{page_count}"
+        self.refresh_batch_progress()
+
+    def on_batch_file(self, item, result, cache=True):
+        item["bar"].value = 1
+        if result[0] == "done":
+            item["topics"] = result[1]
+            item["status"].value = f"{len(result[1])} tópicos"
+            item["status"].color = AppTheme.primary if result[1] else "red"
+            if cache and result[1] and item["key"]:
+                self.cache.put(item["key"], result[1])
+        elif result[0] == "cancelled":
+            item["status"].value = "Cancelado"
+        else:
+            item["status"].value = "Erro"
+            item["status"].color = "red"
+            item["status"].tooltip = result[1]
+        self.refresh_batch_progress()
+
+    def refresh_batch_progress(self):
+        if self.batch:
+            self.progress_bar.value = sum(item["bar"].value or 0 for item in self.batch) / len(self.batch)
+        if self.page:
+            self.update()
+
+    def add_preview(self, topics):
+        self.extracted_topics.extend(topics)
+        shown = sum(1 for c in self.preview_container.controls if c is not self.more_text)
+        for t in topics[:max(0, 20 - shown)]: # Show first 20
+            self.preview_container.controls.append(ft.Text(f"• {t}", size=12, color="grey"))
+        count = len(self.extracted_topics)
+        if count > 20:
+            if self.more_text is None:
+                self.more_text = ft.Text("", size=12, color=AppTheme.primary)
+                self.preview_container.controls.append(self.more_text)
+            self.more_text.value = f"... e mais {count-20} tópicos."
+
+    def cancel_extraction(self, e):
+        if self.batch_job:
+            self.batch_job.cancel()
+        if self.job:
+            self.job.cancel()
+            if self.job.process is None:
+                # Still hashing: drop it before the worker starts
+                self.job = None
+                self.progress_bar.visible = False
+                self.btn_cancel_extract.visible = False
+                self.btn_import.disabled = False
+                self.status_text.value = "Leitura cancelada"
+                if self.page:
+                    self.update()
 
     def save_topics(self, e):
+        if self.batch:
+            self.save_batch(e)
+            return
         subj_name = self.dropdown_subject.value
         if not subj_name:
             self.page_ref.snack_bar = ft.SnackBar(ft.Text("Selecione uma disciplina!"))
@@ -102,16 +306,44 @@ class ImportSyllabusModal(ft.AlertDialog):
             return
 
         subj_id = self.subject_map[subj_name]
-        crud.add_topics_bulk(subj_id, self.extracted_topics)
-        
-        print(f"Imported {len(self.extracted_topics)} topics into {subj_name}")
+        if self.check_merge.value:
+            result = crud.merge_topics(subj_id, self.extracted_topics)
+            print(f"Merged edital into {subj_name}: {result}")
+        else:
+            crud.add_topics_bulk(subj_id, self.extracted_topics)
+            print(f"Imported {len(self.extracted_topics)} topics into {subj_name}")
+        bus.publish(EventType.PLAN_CHANGED, subject_ids=[subj_id])
         
         if self.on_import_success:
             self.on_import_success()
             
         self.close_modal(e)
 
+    def save_batch(self, e):
+        """All files' topics, grouped by subject, in one bulk transaction."""
+        ready = [item for item in self.batch if item["topics"]]
+        if not ready:
+            return
+        if any(not item["dropdown"].value for item in ready):
+            self.page_ref.snack_bar = ft.SnackBar(ft.Text("Selecione a disciplina de cada arquivo!"))
+            self.page_ref.snack_bar.open = True
+            self.page_ref.update()
+            return
+
+        topics_by_subject = {}
+        for item in ready:
+            topics_by_subject.setdefault(self.subject_map[item["dropdown"].value], []).extend(item["topics"])
+        crud.import_topics_bulk(topics_by_subject, merge=self.check_merge.value)
+        bus.publish(EventType.PLAN_CHANGED, subject_ids=list(topics_by_subject))
+        print(f"Imported {len(ready)} editais into {len(topics_by_subject)} subjects")
+
+        if self.on_import_success:
+            self.on_import_success()
+
+        self.close_modal(e)
+
     def close_modal(self, e):
+        self.cancel_extraction(e)
         self.open = False
         self.page_ref.close_dialog()
         self.page_ref.update()
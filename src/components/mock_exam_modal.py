@@ -139,15 +139,8 @@ class MockExamModal(ft.AlertDialog):
 
         # 2. Persist Data (Optimized)
         try:
-            # Insert Exam Header
-            cursor = crud.db.execute_query('''
-                INSERT INTO mock_exams (name, date, score, total_questions, time_spent, style, board)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (name, date, total_score, total_q, time, style, board))
-            exam_id = cursor.lastrowid
-            
-            # Bulk Insert Items
-            crud.add_mock_exam_items_bulk(exam_id, items_data)
+            # Header and items in one transaction (one undo step)
+            crud.save_mock_exam(name, date, total_score, total_q, time, style, board, items_data)
             
             # 3. UI Feedback
             self.close_modal(None)
@@ -1,6 +1,7 @@
 
 import flet as ft
 from src.theme import AppTheme
+from src.utils.events import bus, EventType
 
 class PlanModal(ft.AlertDialog):
     def __init__(self, page: ft.Page=None, on_save=None):
@@ -129,7 +130,8 @@ class PlanModal(ft.AlertDialog):
                  if ck.value:
                      selected_ids.append(ck.data)
 
-        crud.add_plan(name, obs, has_image=False, is_generic=is_generic, subject_ids=selected_ids)
+        plan_id = crud.add_plan(name, obs, has_image=False, is_generic=is_generic, subject_ids=selected_ids)
+        bus.publish(EventType.PLAN_CHANGED, ids=[plan_id], subject_ids=selected_ids)
         
         if self.page_ref:
              self.page_ref.snack_bar = ft.SnackBar(ft.Text(f"Plano '{name}' criado!"))
@@ -1,17 +1,36 @@
 
 import flet as ft
 from src.theme import AppTheme
+import src.data.crud as crud
+from src.utils.allocation import DEFAULT_KNOWLEDGE, DEFAULT_RELEVANCE, subject_priority
+from src.utils.events import bus, EventType
+from src.utils.study_cycle import WIZARD_DAYS, build_cycle, format_hours, parse_hours
 
 class PlanningWizard(ft.AlertDialog):
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, on_save=None):
         super().__init__()
         # self.page = page
+        self.on_save = on_save
         self.modal = True
         self.bgcolor = "#2c2d3e"
         self.shape = ft.RoundedRectangleBorder(radius=10)
         self.content_padding = 0
         self.current_step = 1
         
+        # Wizard state, seeded from what is saved
+        self.subjects = crud.get_all_subjects()
+        cycle_ids = {r['subject_id'] for r in crud.get_study_cycle()}
+        self.selected = cycle_ids or {s['id'] for s in self.subjects}
+        self.ratings = {
+            s['id']: (
+                s['relevance'] if s['relevance'] is not None else DEFAULT_RELEVANCE,
+                s['knowledge'] if s['knowledge'] is not None else DEFAULT_KNOWLEDGE,
+            )
+            for s in self.subjects
+        }
+        self.hours = crud.get_study_availability()
+        self.enabled = {day: hours > 0 for day, hours in self.hours.items()}
+        
         self.build_ui()
 
     def build_ui(self):
@@ -97,8 +116,7 @@ class PlanningWizard(ft.AlertDialog):
         ])
 
     def step_2_content(self):
-        import src.data.crud as crud
-        subjects = crud.get_all_subjects() # returns list of dicts
+        subjects = self.subjects
         
         if not subjects:
              return ft.Text("Nenhuma disciplina cadastrada. Vá em 'Disciplinas' para adicionar.", color="red")
@@ -112,29 +130,49 @@ class PlanningWizard(ft.AlertDialog):
             expand=True
         )
         for sub in subjects:
-            grid.controls.append(
-                ft.Container(
-                    content=ft.Text(sub['name'], size=10, text_align=ft.TextAlign.CENTER),
-                    border=ft.border.all(1, AppTheme.primary),
-                    border_radius=5,
-                    alignment=ft.Alignment(0,0),
-                    padding=5,
-                    bgcolor="#25263a" # Selected state simulation
-                    # on_click logic would go here to toggle selection
-                )
+            tile = ft.Container(
+                content=ft.Text(sub['name'], size=10, text_align=ft.TextAlign.CENTER),
+                border_radius=5,
+                alignment=ft.Alignment(0,0),
+                padding=5,
             )
+            tile.on_click = lambda e, sid=sub['id'], t=tile: self.toggle_subject(sid, t)
+            self.style_subject_tile(tile, sub['id'] in self.selected)
+            grid.controls.append(tile)
         return ft.Column([
             ft.Text("Selecione quais das suas disciplinas você deseja colocar no seu planejamento.", color="#ccc", size=14),
             ft.Container(height=10),
             ft.Container(content=grid, expand=True)
         ], expand=True)
 
+    def style_subject_tile(self, tile, selected):
+        tile.border = ft.border.all(1, AppTheme.primary if selected else "grey")
+        tile.bgcolor = "#25263a" if selected else None
+        tile.opacity = 1.0 if selected else 0.5
+
+    def toggle_subject(self, subject_id, tile):
+        self.selected ^= {subject_id}
+        self.style_subject_tile(tile, subject_id in self.selected)
+        tile.update()
+
+    def selected_subjects(self):
+        return [s for s in self.subjects if s['id'] in self.selected]
+
+    def priorities(self):
+        return {
+            s['id']: subject_priority(s['weight'], *self.ratings[s['id']])
+            for s in self.selected_subjects()
+        }
+
     def step_3_content(self):
-        import src.data.crud as crud
-        subjects = crud.get_all_subjects()
+        subjects = self.selected_subjects()
+        self.share_labels = {}
         
         col = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO, expand=True)
         for sub in subjects:
+            relevance, knowledge = self.ratings[sub['id']]
+            share = ft.Text("", color="black", weight=ft.FontWeight.BOLD)
+            self.share_labels[sub['id']] = share
             col.controls.append(
                 ft.Container(
                     bgcolor="#1e1e2d",
@@ -145,55 +183,105 @@ class PlanningWizard(ft.AlertDialog):
                             ft.Text(sub['name'], size=12, weight=ft.FontWeight.BOLD),
                             ft.Row([
                                 ft.Text("IMPORTÂNCIA", size=8, color="grey"),
-                                ft.Slider(min=0, max=5, divisions=5, value=3, height=20, expand=True)
+                                ft.Slider(min=0, max=5, divisions=5, value=relevance, height=20, expand=True,
+                                          on_change=lambda e, sid=sub['id']: self.set_rating(sid, relevance=e.control.value))
                             ]),
                             ft.Row([
                                 ft.Text("CONHECIMENTO", size=8, color="grey"),
-                                ft.Slider(min=0, max=5, divisions=5, value=2, height=20, expand=True)
+                                ft.Slider(min=0, max=5, divisions=5, value=knowledge, height=20, expand=True,
+                                          on_change=lambda e, sid=sub['id']: self.set_rating(sid, knowledge=e.control.value))
                             ])
                         ], expand=True),
-                        ft.Container(width=100, bgcolor="#ffcdd2", padding=5, border_radius=5, alignment=ft.Alignment(0,0), content=ft.Text("14%", color="black", weight=ft.FontWeight.BOLD))
+                        ft.Container(width=100, bgcolor="#ffcdd2", padding=5, border_radius=5, alignment=ft.Alignment(0,0), content=share)
                     ])
                 )
             )
+        self.refresh_shares(update=False)
         return ft.Column([
             ft.Text("Para cada disciplina, selecione a importância e seu grau de conhecimento:", color="#ccc", size=14),
             ft.Container(height=10),
             ft.Container(content=col, expand=True)
         ], expand=True)
 
+    def set_rating(self, subject_id, relevance=None, knowledge=None):
+        current = self.ratings[subject_id]
+        self.ratings[subject_id] = (
+            int(relevance) if relevance is not None else current[0],
+            int(knowledge) if knowledge is not None else current[1],
+        )
+        self.refresh_shares()
+
+    def refresh_shares(self, update=True):
+        """Share of the week each subject gets with the current ratings."""
+        priorities = self.priorities()
+        total = sum(priorities.values())
+        for sid, label in self.share_labels.items():
+            label.value = f"{int(round(priorities[sid] / total * 100)) if total else 0}%"
+            if update:
+                label.update()
+
     def step_4_content(self):
-         days = ["DOM", "SEG", "TER", "QUA", "QUI", "SEX", "SÁB"]
+         days = WIZARD_DAYS
          rows = []
          for i in range(0, len(days), 2):
              d1 = days[i]
-             row_controls = [self.create_day_input(d1)]
+             row_controls = [self.create_day_input(*d1)]
              if i+1 < len(days):
                  d2 = days[i+1]
-                 row_controls.append(self.create_day_input(d2))
+                 row_controls.append(self.create_day_input(*d2))
              rows.append(ft.Row(row_controls, alignment=ft.MainAxisAlignment.SPACE_BETWEEN))
          
+         self.week_total = ft.Text("", color=AppTheme.primary)
+         self.refresh_week_total(update=False)
          return ft.Column([
              ft.Text("Quais dias e quantas horas pretende estudar?", color="#ccc", size=14),
              ft.Column(rows, spacing=10),
              ft.Container(height=20),
              ft.Container(bgcolor="#1e1e2d", padding=10, border_radius=5, content=ft.Row([
-                 ft.Text("Total na Semana: 30h", color=AppTheme.primary)
+                 self.week_total
              ], alignment=ft.MainAxisAlignment.CENTER))
          ], scroll=ft.ScrollMode.AUTO)
 
-    def create_day_input(self, day):
-        # Using a simplified mock for the complex input
+    def create_day_input(self, label, weekday):
         return ft.Container(
             width=300,
             content=ft.Row([
-                ft.Checkbox(value=True),
-                ft.Container(bgcolor="grey", content=ft.Text(day, size=10, color="black"), padding=5, border_radius=3),
-                ft.TextField(value="06:00", width=80, text_size=12, height=30, content_padding=5),
+                ft.Checkbox(value=self.enabled[weekday], on_change=lambda e: self.set_day_enabled(weekday, e.control.value)),
+                ft.Container(bgcolor="grey", content=ft.Text(label, size=10, color="black"), padding=5, border_radius=3),
+                ft.TextField(value=format_hours(self.hours[weekday]), width=80, text_size=12, height=30, content_padding=5,
+                             on_change=lambda e: self.set_day_hours(weekday, e.control)),
                 ft.Text("horas diárias", size=12)
             ])
         )
 
+    def set_day_enabled(self, weekday, enabled):
+        self.enabled[weekday] = enabled
+        self.refresh_week_total()
+
+    def set_day_hours(self, weekday, field):
+        hours = parse_hours(field.value)
+        field.error_text = None if hours is not None else "hh:mm"
+        if hours is not None:
+            self.hours[weekday] = hours
+        field.update()
+        self.refresh_week_total()
+
+    def weekly_hours(self):
+        return {day: (hours if self.enabled[day] else 0) for day, hours in self.hours.items()}
+
+    def refresh_week_total(self, update=True):
+        total = sum(self.weekly_hours().values())
+        self.week_total.value = f"Total na Semana: {format_hours(total).replace(':', 'h')}"
+        if update:
+            self.week_total.update()
+
+    def save_plan(self):
+        """Generate the cycle from the wizard inputs and persist everything."""
+        hours = self.weekly_hours()
+        slots = build_cycle(self.priorities(), {day: round(h * 60) for day, h in hours.items()})
+        crud.save_study_plan(self.ratings, hours, slots)
+        bus.publish(EventType.PLAN_CHANGED, subject_ids=self.selected)
+
     def build_footer(self):
         return ft.Row([
             ft.OutlinedButton("Voltar", on_click=self.prev_step, style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=5), side=ft.BorderSide(1, AppTheme.primary), color=AppTheme.primary)) if self.current_step > 1 else ft.Container(),
@@ -206,7 +294,10 @@ class PlanningWizard(ft.AlertDialog):
             self.build_ui()
             self.update()
         else:
+            self.save_plan()
             self.close_modal(e)
+            if self.on_save:
+                self.on_save()
 
     def prev_step(self, e):
         if self.current_step > 1:
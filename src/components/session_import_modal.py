@@ -0,0 +1,111 @@
+
+import os
+import threading
+
+import flet as ft
+from src.theme import AppTheme
+from src.data.session_import import REVIEW_WINDOW_DAYS, SessionImporter, write_rejected_report
+from src.utils.events import bus, EventType
+
+# Rejected rows listed in the dialog (the full list goes to the report file)
+REJECTED_PREVIEW = 20
+
+
+class SessionImportModal(ft.AlertDialog):
+    """Import study sessions from a CSV file on a background thread."""
+
+    def __init__(self, page: ft.Page, on_import_success=None):
+        super().__init__()
+        self.page_ref = page
+        self.on_import_success = on_import_success
+        self.modal = True
+        self.bgcolor = AppTheme.surface
+        self.title = ft.Text("Importar Sessões (CSV)", color="white")
+        self.running = False
+
+        self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
+        self.page_ref.overlay.append(self.file_picker)
+
+        self.check_create = ft.Checkbox(label="Criar disciplinas que não existirem", value=False)
+        self.check_reviews = ft.Checkbox(
+            label=f"Gerar revisões a partir das sessões dos últimos {REVIEW_WINDOW_DAYS} dias", value=False,
+            tooltip="Sessões mais antigas são importadas sem gerar revisões",
+        )
+        self.btn_pick = ft.ElevatedButton(
+            "Selecionar CSV", icon=ft.Icons.UPLOAD_FILE,
+            on_click=lambda _: self.file_picker.pick_files(allowed_extensions=["csv"])
+        )
+        self.status_text = ft.Text("", color="grey", size=12)
+        self.rejected_col = ft.Column(scroll=ft.ScrollMode.AUTO, height=180)
+
+        self.content = ft.Container(
+            width=520,
+            content=ft.Column([
+                ft.Text("Colunas reconhecidas: disciplina, tópico, data, duração, tipo, acertos, erros.", size=12, color="grey"),
+                ft.Container(height=10),
+                self.check_create,
+                self.check_reviews,
+                ft.Row([self.btn_pick, self.status_text]),
+                ft.Divider(),
+                ft.Text("Linhas rejeitadas:", weight=ft.FontWeight.BOLD, color="white", size=12),
+                ft.Container(bgcolor="#1e1e2d", padding=10, border_radius=5, content=self.rejected_col)
+            ], tight=True)
+        )
+
+        self.actions = [ft.TextButton("Fechar", on_click=self.close_modal)]
+
+    def on_file_picked(self, e):
+        if not e.files or self.running:
+            return
+        path = e.files[0].path
+        self.running = True
+        self.btn_pick.disabled = True
+        self.rejected_col.controls.clear()
+        self.set_status(f"Importando {e.files[0].name}...", "grey")
+        importer = SessionImporter(
+            create_subjects=self.check_create.value,
+            schedule_reviews=self.check_reviews.value,
+        )
+        threading.Thread(target=self.run_import, args=(importer, path), daemon=True, name="session-import").start()
+
+    def run_import(self, importer, path):
+        try:
+            result = importer.import_file(path, on_progress=self.on_progress)
+        except Exception as ex:
+            self.finish(f"Erro ao importar: {ex}", "red")
+            return
+
+        if result.imported:
+            bus.publish(EventType.SESSION_ADDED, subject_ids=result.subject_ids)
+            if self.on_import_success:
+                self.on_import_success()
+        message = f"{result.imported} sessões importadas, {len(result.rejected)} rejeitadas."
+        if result.rejected:
+            report = os.path.splitext(path)[0] + "_rejeitadas.csv"
+            write_rejected_report(result.rejected, report)
+            message += f" Relatório: {report}"
+            for r in result.rejected[:REJECTED_PREVIEW]:
+                self.rejected_col.controls.append(ft.Text(f"Linha {r.line}: {r.reason}", size=12, color="grey"))
+            if len(result.rejected) > REJECTED_PREVIEW:
+                self.rejected_col.controls.append(
+                    ft.Text(f"... e mais {len(result.rejected) - REJECTED_PREVIEW}.", size=12, color=AppTheme.primary))
+        self.finish(message, AppTheme.primary if result.imported else "grey")
+
+    def on_progress(self, lines_read, imported):
+        self.set_status(f"{imported} sessões importadas ({lines_read} linhas lidas)...", "grey")
+
+    def finish(self, text, color):
+        self.running = False
+        self.btn_pick.disabled = False
+        self.set_status(text, color)
+
+    def set_status(self, text, color):
+        self.status_text.value = text
+        self.status_text.color = color
+        if self.page:
+            self.update()
+
+    def close_modal(self, e):
+        self.open = False
+        self.page_ref.close_dialog()
+        self.page_ref.update()
@@ -1,6 +1,7 @@
 
 import flet as ft
 from src.theme import AppTheme
+from src.utils.events import bus, EventType
 import datetime
 
 class StudyModal(ft.AlertDialog):
@@ -33,7 +34,7 @@ class StudyModal(ft.AlertDialog):
         # --- Checkboxes ---
         self.check_theory = ft.Checkbox(label="TEORIA FINALIZADA", value=False, check_color=AppTheme.background, active_color="white", label_style=ft.TextStyle(color="white", size=12))
         self.check_planning = ft.Checkbox(label="CONTABILIZAR NO PLANEJAMENTO", value=True, check_color=AppTheme.background, active_color=AppTheme.primary, label_style=ft.TextStyle(color="white", size=12))
-        self.check_review = ft.Checkbox(label="PROGRAMAR REVISÕES", value=False, check_color=AppTheme.background, active_color="white", label_style=ft.TextStyle(color="white", size=12))
+        self.check_review = ft.Checkbox(label="PROGRAMAR REVISÕES", value=True, check_color=AppTheme.background, active_color="white", label_style=ft.TextStyle(color="white", size=12))
         
 
         # --- Stats Group ---
@@ -191,7 +192,7 @@ class StudyModal(ft.AlertDialog):
         video_start = get_stat_value(self.stats_video, 1)
         video_end = get_stat_value(self.stats_video, 2)
 
-        crud.add_study_session(
+        session_id = crud.add_study_session(
             subj_id,
             topic,
             duration,
@@ -202,12 +203,12 @@ class StudyModal(ft.AlertDialog):
             pages_end=pages_end_val,
             video_start=video_start,
             video_end=video_end,
+            schedule_review=bool(self.check_review.value),
         )
         print(f"Saved session: {subj_name} - {duration}s")
         
         # Publish event
-        if self.page:
-             self.page.pubsub.send_all("study_saved")
+        bus.publish(EventType.SESSION_ADDED, ids=[session_id], subject_ids=[subj_id])
         
         if self.save_new_check.value:
             self._reset_form()
@@ -2,6 +2,8 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
+from src.data.topic_editor import TopicEditSession
+from src.utils.events import bus, EventType
 
 class SubjectEditModal(ft.AlertDialog):
     def __init__(self, page: ft.Page, plan_id, subject_data, on_save=None):
@@ -38,7 +40,10 @@ class SubjectEditModal(ft.AlertDialog):
         self.build_color_picker()
         
         # --- Topics ---
-        self.topics_container = ft.Column(scroll=ft.ScrollMode.AUTO, height=300)
+        # All topic edits are staged in the session and saved together on "Salvar"
+        self.session = TopicEditSession(self.subject_id)
+        self.topics_container = ft.ReorderableListView(on_reorder=self.on_reorder, height=300)
+        self.new_topic_row = ft.Container(visible=False)
         self.load_topics()
         
         self.content = ft.Container(
@@ -54,7 +59,8 @@ class SubjectEditModal(ft.AlertDialog):
                     ft.Text("Tópicos / Assuntos", size=14, weight=ft.FontWeight.BOLD, color="white"),
                     ft.IconButton(ft.Icons.ADD_CIRCLE, icon_color=AppTheme.primary, on_click=self.add_topic_ui)
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                self.topics_container
+                self.topics_container,
+                self.new_topic_row
             ])
         )
         
@@ -94,20 +100,21 @@ class SubjectEditModal(ft.AlertDialog):
         control.update()
 
     def load_topics(self):
-        self.topics_container.controls = []
-        topics = crud.get_topics_by_subject(self.subject_id)
-        for t in topics:
-            self.topics_container.controls.append(self.create_topic_item(t))
-        if self.page_ref: self.topics_container.update()
+        self.topics_container.controls = [self.create_topic_item(item) for item in self.session.items]
+        if self.topics_container.page: self.topics_container.update()
 
-    def create_topic_item(self, topic):
+    def on_reorder(self, e):
+        self.session.move(e.old_index, e.new_index)
+        self.load_topics()
+
+    def create_topic_item(self, item):
         # View Mode
-        text_view = ft.Text(topic['title'], size=12, color="white", expand=True)
+        text_view = ft.Text(item['title'], size=12, color="white", expand=True)
         
         def save_edit(e, input_ctrl):
             new_title = input_ctrl.value
             if new_title:
-                crud.update_topic(topic['id'], new_title)
+                self.session.rename(item, new_title)
                 text_view.value = new_title
                 edit_group.visible = False
                 view_group.visible = True
@@ -124,11 +131,11 @@ class SubjectEditModal(ft.AlertDialog):
             self.topics_container.update()
 
         def delete_t(e):
-            crud.delete_topic(topic['id'])
+            self.session.delete(item)
             self.load_topics()
 
         # Edit Mode Controls
-        edit_input = ft.TextField(value=topic['title'], height=30, text_style=ft.TextStyle(size=12), content_padding=5, expand=True)
+        edit_input = ft.TextField(value=item['title'], height=30, text_style=ft.TextStyle(size=12), content_padding=5, expand=True)
         edit_group = ft.Row([
             edit_input,
             ft.IconButton(ft.Icons.CHECK, icon_size=16, icon_color="green", on_click=lambda e: save_edit(e, edit_input)),
@@ -136,7 +143,7 @@ class SubjectEditModal(ft.AlertDialog):
         ], visible=False)
 
         view_group = ft.Row([
-            ft.Icon(ft.Icons.DRAG_HANDLE, size=16, color="grey"), # Placeholder for drag
+            ft.Icon(ft.Icons.DRAG_HANDLE, size=16, color="grey"),
             text_view,
             ft.IconButton(ft.Icons.EDIT, icon_size=16, icon_color="grey", on_click=enable_edit),
             ft.IconButton(ft.Icons.DELETE_OUTLINE, icon_size=16, icon_color="red", on_click=delete_t)
@@ -151,29 +158,36 @@ class SubjectEditModal(ft.AlertDialog):
         )
 
     def add_topic_ui(self, e):
-        # Add a temporary input at the top or bottom
-        # Let's simple add to DB using a minimal dialog or just append a blank editable row?
-        # Appending blank editable row:
-        
+        # Inline input below the list; the topic is only staged, not saved yet
         def confirm_add(e):
             if input_new.value:
-                crud.add_topic(self.subject_id, input_new.value)
+                self.session.add(input_new.value)
+                hide_input(e)
                 self.load_topics()
+
+        def hide_input(e):
+            self.new_topic_row.visible = False
+            self.new_topic_row.update()
         
-        input_new = ft.TextField(hint_text="Novo Tópico", height=30, text_style=ft.TextStyle(size=12), content_padding=5, expand=True, autofocus=True)
-        row = ft.Row([
+        input_new = ft.TextField(hint_text="Novo Tópico", height=30, text_style=ft.TextStyle(size=12), content_padding=5, expand=True, autofocus=True, on_submit=confirm_add)
+        self.new_topic_row.content = ft.Row([
             input_new,
             ft.IconButton(ft.Icons.CHECK, icon_size=16, icon_color="green", on_click=confirm_add),
-            ft.IconButton(ft.Icons.DELETE, icon_size=16, icon_color="red", on_click=lambda e: self.load_topics()) # Cancel reloads
+            ft.IconButton(ft.Icons.DELETE, icon_size=16, icon_color="red", on_click=hide_input)
         ])
-        
-        self.topics_container.controls.append(ft.Container(content=row, bgcolor="#333", padding=5, border_radius=5))
-        self.topics_container.update()
+        self.new_topic_row.bgcolor = "#333"
+        self.new_topic_row.padding = 5
+        self.new_topic_row.border_radius = 5
+        self.new_topic_row.visible = True
+        self.new_topic_row.update()
 
     def save_changes(self, e):
         # Save Subject Name/Color
         new_name = self.name_input.value
         crud.update_subject_details(self.subject_id, new_name, self.selected_color)
+        # Save staged topic edits (add/rename/delete/reorder) in one transaction
+        if self.session.commit():
+            bus.publish(EventType.PLAN_CHANGED, ids=[self.plan_id], subject_ids=[self.subject_id])
         
         if self.on_save:
             self.on_save()
@@ -183,6 +197,7 @@ class SubjectEditModal(ft.AlertDialog):
         if not self.plan_id:
             return
         crud.remove_subject_from_plan(self.plan_id, self.subject_id)
+        bus.publish(EventType.PLAN_CHANGED, ids=[self.plan_id], subject_ids=[self.subject_id])
         if self.on_save:
             self.on_save()
         self.close_modal(e)
@@ -205,10 +220,13 @@ class SubjectEditModal(ft.AlertDialog):
         self.page_ref.update()
 
     def delete_subject(self):
+        from src.components.undo_snackbar import show_undo_snackbar
         crud.delete_subject(self.subject_id)
+        bus.publish(EventType.PLAN_CHANGED, ids=[self.plan_id], subject_ids=[self.subject_id])
         if self.on_save:
             self.on_save()
         self.close_modal(None)
+        show_undo_snackbar(self.page_ref, "Disciplina excluída.", on_undone=self.on_save)
 
     def close_modal(self, e):
         self.open = False
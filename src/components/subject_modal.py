@@ -2,6 +2,7 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
+from src.utils.events import bus, EventType
 
 class SubjectModal(ft.AlertDialog):
     def __init__(self, page: ft.Page, plan_id=None, on_save=None):
@@ -83,6 +84,7 @@ class SubjectModal(ft.AlertDialog):
         # 2. Link to Plan (if plan_id provided)
         if self.plan_id:
             crud.add_subject_to_plan(self.plan_id, new_sub_id)
+            bus.publish(EventType.PLAN_CHANGED, ids=[self.plan_id], subject_ids=[new_sub_id])
             
         if self.on_save:
             self.on_save()
@@ -0,0 +1,96 @@
+
+import threading
+
+import flet as ft
+from src.theme import AppTheme
+from src.data import sync
+from src.utils.events import bus, EventType
+
+
+class SyncModal(ft.AlertDialog):
+    """Sync with other machines through a shared folder (e.g. a synced drive)."""
+
+    def __init__(self, page: ft.Page, on_sync_done=None):
+        super().__init__()
+        self.page_ref = page
+        self.on_sync_done = on_sync_done
+        self.modal = True
+        self.bgcolor = AppTheme.surface
+        self.title = ft.Text("Sincronizar", color="white")
+        self.folder = sync.get_state("folder")
+        self.running = False
+
+        self.dir_picker = ft.FilePicker(on_result=self.on_dir_picked)
+        self.page_ref.overlay.append(self.dir_picker)
+
+        self.dir_text = ft.Text(self.folder or "Nenhuma pasta selecionada", color="white" if self.folder else "grey", size=12)
+        self.status_text = ft.Text("", color="grey", size=12)
+
+        self.content = ft.Container(
+            width=450,
+            content=ft.Column([
+                ft.Text("Use a mesma pasta em todos os computadores. Só as alterações novas são trocadas.", size=12, color="grey"),
+                ft.Container(height=10),
+                ft.Row([
+                    ft.ElevatedButton("Escolher Pasta", icon=ft.Icons.FOLDER_OPEN, on_click=lambda _: self.dir_picker.get_directory_path()),
+                    self.dir_text
+                ]),
+                ft.Container(height=10),
+                self.status_text,
+            ], tight=True)
+        )
+
+        self.btn_sync = ft.ElevatedButton("Sincronizar agora", icon=ft.Icons.SYNC, on_click=self.start_sync,
+                                          bgcolor=AppTheme.primary, color="white")
+        self.actions = [
+            ft.TextButton("Fechar", on_click=self.close_modal),
+            self.btn_sync
+        ]
+
+    def on_dir_picked(self, e):
+        if e.path:
+            self.folder = e.path
+            self.dir_text.value = e.path
+            self.dir_text.color = "white"
+            self.dir_text.update()
+
+    def start_sync(self, e):
+        if not self.folder:
+            self.set_status("Selecione a pasta compartilhada.", "red")
+            return
+        if self.running:
+            return
+        self.running = True
+        self.btn_sync.disabled = True
+        self.set_status("Sincronizando...", "grey")
+        threading.Thread(target=self.run_sync, daemon=True, name="folder-sync").start()
+
+    def run_sync(self):
+        try:
+            result = sync.sync_folder(self.folder)
+        except Exception as ex:
+            self.finish(f"Erro ao sincronizar: {ex}", "red")
+            return
+        if result.applied:
+            # Anything may have changed: let every page rebuild
+            bus.publish(EventType.SESSION_ADDED)
+            bus.publish(EventType.PLAN_CHANGED)
+            if self.on_sync_done:
+                self.on_sync_done()
+        self.finish(f"{result.applied} alterações recebidas, {result.exported} enviadas.", AppTheme.primary)
+
+    def finish(self, text, color):
+        self.running = False
+        self.btn_sync.disabled = False
+        self.set_status(text, color)
+
+    def set_status(self, text, color):
+        self.status_text.value = text
+        self.status_text.color = color
+        if self.page:
+            self.update()
+
+    def close_modal(self, e):
+        self.open = False
+        self.page_ref.close_dialog()
+        self.page_ref.update()
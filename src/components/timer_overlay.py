@@ -1,16 +1,22 @@
 
 import flet as ft
 from src.theme import AppTheme
-import time
-import threading
+from src.utils.events import bus, EventType
+from src.utils.stopwatch import Stopwatch, ticker, format_hms
+from src.utils.date_utils import format_datetime_db, format_datetime_display
 
 
 class TimerOverlay(ft.Container):
     """
-    Thread-safe timer overlay for study sessions.
-    Uses threading.Lock for synchronization and safe UI updates.
+    Timer overlay for study sessions.
+    Elapsed time comes from a monotonic Stopwatch; the display is refreshed
+    by the shared ticker only while the overlay is visible.
+    While running, the state is checkpointed to the database every
+    CHECKPOINT_EVERY seconds so a crash loses at most that much time.
     """
     
+    CHECKPOINT_EVERY = 30  # ticks (seconds)
+    
     def __init__(self, page: ft.Page):
         super().__init__()
         print("Initializing TimerOverlay (Fresh)...")
@@ -21,11 +27,11 @@ class TimerOverlay(ft.Container):
         self.alignment = ft.Alignment(0, 0)
         self.blur = ft.Blur(10, 10, ft.BlurTileMode.MIRROR)
         
-        # Thread synchronization
-        self._lock = threading.Lock()
-        self._timer_running = False
-        self._seconds = 0
-        self._stop_event = threading.Event()
+        self._stopwatch = Stopwatch()
+        # Checkpoint state (wall-clock, survives restarts)
+        self._started_at = None
+        self._paused_spans = []  # [[paused_at, resumed_at or None], ...]
+        self._ticks_since_checkpoint = 0
         
         self.topic = "Tópico Desconhecido"
         self.subject_id = None
@@ -81,70 +87,141 @@ class TimerOverlay(ft.Container):
 
     @property
     def timer_running(self):
-        with self._lock:
-            return self._timer_running
-    
-    @timer_running.setter
-    def timer_running(self, value):
-        with self._lock:
-            self._timer_running = value
+        return self._stopwatch.running
 
     @property
     def seconds(self):
-        with self._lock:
-            return self._seconds
-    
-    @seconds.setter
-    def seconds(self, value):
-        with self._lock:
-            self._seconds = value
+        return int(self._stopwatch.elapsed())
 
     def show(self, topic="Controle Externo e Legislação Institucional", subject_id=None):
-        self.topic = topic
-        self.subject_id = subject_id
-        self.topic_display.value = topic
+        # Don't switch subjects under a session that is already being timed
+        in_progress = self.timer_running or self.seconds > 0
+        if not in_progress:
+            self.topic = topic
+            self.subject_id = subject_id
+            self.topic_display.value = topic
+        self.time_display.value = format_hms(self.seconds)
         self.visible = True
+        ticker.add(self._on_tick)
         self._safe_update(self)
+        if in_progress and (topic, subject_id) != (self.topic, self.subject_id):
+            self._show_snackbar(
+                f"Já existe uma sessão de \"{self.topic}\" em andamento. "
+                "Finalize-a para cronometrar outra disciplina."
+            )
 
     def hide(self, e=None):
-        self._stop_event.set()
-        self.timer_running = False
+        # The stopwatch keeps running; only the display refresh stops
+        ticker.remove(self._on_tick)
         self.visible = False
         self._safe_update(self)
 
     def toggle_timer(self, e):
+        now = format_datetime_db()
         if self.timer_running:
-            # Pause
-            self.timer_running = False
-            self._stop_event.set()
+            self._stopwatch.pause()
+            self._paused_spans.append([now, None])
+            ticker.remove(self._checkpoint_tick)
         else:
-            # Start/Resume
-            self.timer_running = True
-            self._stop_event.clear()
-            threading.Thread(target=self._run_timer, daemon=True).start()
+            self._stopwatch.start()
+            if self._started_at is None:
+                self._started_at = now
+            elif self._paused_spans and self._paused_spans[-1][1] is None:
+                self._paused_spans[-1][1] = now
+            ticker.add(self._checkpoint_tick)
+        self._checkpoint()
         
         self.btn_play.icon = ft.Icons.PAUSE if self.timer_running else ft.Icons.PLAY_ARROW
-        self._safe_update(self.btn_play)
+        self.time_display.value = format_hms(self.seconds)
+        self._safe_update(self)
 
-    def _run_timer(self):
-        """Thread-safe timer loop."""
-        while not self._stop_event.is_set():
-            with self._lock:
-                if not self._timer_running:
-                    break
-                self._seconds += 1
-                secs = self._seconds
-            
-            mins, s = divmod(secs, 60)
-            hours, mins = divmod(mins, 60)
-            
-            self.time_display.value = "{:02d}:{:02d}:{:02d}".format(hours, mins, s)
-            
+    def _checkpoint_tick(self):
+        """Called by the shared ticker while the timer runs (visible or not)."""
+        self._ticks_since_checkpoint += 1
+        if self._ticks_since_checkpoint >= self.CHECKPOINT_EVERY:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        import src.data.crud as crud
+        self._ticks_since_checkpoint = 0
+        try:
+            crud.save_timer_checkpoint(
+                self.subject_id, self.topic, self._started_at,
+                self.seconds, self._paused_spans, self.timer_running
+            )
+        except Exception as ex:
+            print(f"Timer checkpoint failed: {ex}")
+
+    def _clear_checkpoint(self):
+        import src.data.crud as crud
+        ticker.remove(self._checkpoint_tick)
+        self._started_at = None
+        self._paused_spans = []
+        try:
+            crud.clear_timer_checkpoint()
+        except Exception as ex:
+            print(f"Timer checkpoint cleanup failed: {ex}")
+
+    def prompt_recovery(self):
+        """On startup, offer to recover a session left by a crash or sleep."""
+        import src.data.crud as crud
+        checkpoint = crud.get_timer_checkpoint()
+        if not checkpoint:
+            return
+        if not checkpoint['accumulated_seconds']:
+            crud.clear_timer_checkpoint()
+            return
+
+        def recover(_):
+            self._page_ref.close_dialog()
+            self.restore_checkpoint(checkpoint)
+
+        def discard(_):
+            self._page_ref.close_dialog()
+            self._clear_checkpoint()
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Sessão não finalizada"),
+            content=ft.Text(
+                f"Encontramos um cronômetro de \"{checkpoint['topic']}\" com "
+                f"{format_hms(checkpoint['accumulated_seconds'])} registrados "
+                f"(último salvamento em {format_datetime_display(checkpoint['updated_at'])}). "
+                "Deseja recuperar esta sessão?"
+            ),
+            actions=[
+                ft.TextButton("Descartar", on_click=discard),
+                ft.ElevatedButton("Recuperar", bgcolor=AppTheme.primary, color="white", on_click=recover),
+            ],
+        )
+        self._page_ref.dialog = dialog
+        dialog.open = True
+        self._page_ref.update()
+
+    def restore_checkpoint(self, checkpoint):
+        """Load a checkpoint into the (paused) timer and show it."""
+        self._stopwatch.reset(checkpoint['accumulated_seconds'])
+        self._started_at = checkpoint['started_at']
+        self._paused_spans = checkpoint['paused_spans']
+        if checkpoint['running']:
+            # Interrupted while running: the gap until now counts as a pause
+            self._paused_spans.append([checkpoint['updated_at'], None])
+        self.topic = checkpoint['topic'] or self.topic
+        self.subject_id = checkpoint['subject_id']
+        self.topic_display.value = self.topic
+        self.btn_play.icon = ft.Icons.PLAY_ARROW
+        self._checkpoint()
+        self.show(self.topic, self.subject_id)
+
+    def _on_tick(self):
+        """Called by the shared ticker while the overlay is visible."""
+        if not self.timer_running:
+            return
+        value = format_hms(self.seconds)
+        if value != self.time_display.value:
+            self.time_display.value = value
             if not self._safe_update(self.time_display):
-                break  # Page closed or control unmounted
-            
-            # Wait with stop event check (more responsive than time.sleep)
-            self._stop_event.wait(timeout=1.0)
+                ticker.remove(self._on_tick)  # Page closed or control unmounted
 
     def _safe_update(self, control):
         """
@@ -160,15 +237,16 @@ class TimerOverlay(ft.Container):
         return False
 
     def stop_timer(self, e):
+        # Stop the timer
+        self._stopwatch.pause()
         current_seconds = self.seconds
         
         if current_seconds == 0:
+            self._clear_checkpoint()
             self.hide()
             return
         
-        # Stop the timer
-        self._stop_event.set()
-        self.timer_running = False
+        self.time_display.value = format_hms(current_seconds)
         
         # Save session
         import src.data.crud as crud
@@ -183,15 +261,15 @@ class TimerOverlay(ft.Container):
                     break
         
         if sid:
-            crud.add_study_session(sid, "Estudo Cronometrado", current_seconds, "TEORIA", 0, 0)
+            session_id = crud.add_study_session(sid, "Estudo Cronometrado", current_seconds, "TEORIA", 0, 0, date=self._started_at)
             self._show_snackbar(f"Sessão de {self.time_display.value} salva!")
-            if self._page_ref:
-                self._page_ref.pubsub.send_all("study_saved")
+            bus.publish(EventType.SESSION_ADDED, ids=[session_id], subject_ids=[sid])
         else:
             self._show_snackbar("Erro: Disciplina não identificada para salvar.")
         
         # Reset
-        self.seconds = 0
+        self._stopwatch.reset()
+        self._clear_checkpoint()
         self.time_display.value = "00:00:00"
         self.btn_play.icon = ft.Icons.PLAY_ARROW
         self._safe_update(self)
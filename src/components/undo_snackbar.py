@@ -0,0 +1,39 @@
+
+import flet as ft
+import src.data.crud as crud
+from src.utils.events import bus, EventType
+
+
+def apply_undo(redo=False):
+    """Undo (or redo) the last write and let every page refresh; returns its label or None."""
+    label = crud.redo() if redo else crud.undo()
+    if label:
+        # Any table may have changed: sessions, topics, subjects...
+        bus.publish(EventType.SESSION_ADDED)
+        bus.publish(EventType.PLAN_CHANGED)
+    return label
+
+
+def show_undo_snackbar(page: ft.Page, message, on_undone=None):
+    """Snack bar with a "Desfazer" action for the write just made."""
+    def on_action(e):
+        if apply_undo() and on_undone:
+            on_undone()
+
+    page.snack_bar = ft.SnackBar(ft.Text(message), action="Desfazer", on_action=on_action)
+    page.snack_bar.open = True
+    page.update()
+
+
+def handle_undo_shortcut(page: ft.Page, e):
+    """Ctrl+Z undoes, Ctrl+Shift+Z / Ctrl+Y redo. Returns True when the key was handled."""
+    key = (e.key or "").upper()
+    if not e.ctrl or key not in ("Z", "Y"):
+        return False
+    redo = key == "Y" or e.shift
+    label = apply_undo(redo=redo)
+    text = f"{'Refeito' if redo else 'Desfeito'}: {label}" if label else ("Nada para refazer" if redo else "Nada para desfazer")
+    page.snack_bar = ft.SnackBar(ft.Text(text))
+    page.snack_bar.open = True
+    page.update()
+    return True
@@ -1,5 +1,10 @@
 
 from src.data.database import db
+from src.utils.date_utils import format_datetime_db, normalize_datetime_db, parse_datetime
+from src.utils.spaced_repetition import ReviewState, next_state, quality_from_accuracy
+from src.utils.topic_tree import SEGMENT_WIDTH, build_tree, make_path, subtree_bounds
+from src.utils.topic_merge import FUZZY_THRESHOLD, diff_topics
+from src.data.undo import history as undo_history, undoable
 from datetime import datetime, timedelta
 
 # --- Subjects ---
@@ -14,14 +19,19 @@ def get_subject_progress(subject_id):
     return 0
 
 # --- Study Sessions ---
-def add_study_session(subject_id, topic, duration_seconds, type_label, correct=0, wrong=0, date=None, pages_start=0, pages_end=0, video_start="", video_end=""):
+@undoable("Registrar sessão")
+def add_study_session(subject_id, topic, duration_seconds, type_label, correct=0, wrong=0, date=None, pages_start=0, pages_end=0, video_start="", video_end="", schedule_review=False):
     if not date:
         date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    db.execute_query('''
+    cursor = db.execute_query('''
         INSERT INTO study_sessions (subject_id, topic, date, duration_seconds, type, questions_correct, questions_wrong, pages_start, pages_end, video_start, video_end)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (subject_id, topic, date, duration_seconds, type_label, correct, wrong, pages_start, pages_end, video_start, video_end))
+    session_id = cursor.lastrowid
+    if schedule_review:
+        schedule_reviews_bulk([(subject_id, topic, correct, wrong, date)])
+    return session_id
 
 
 def get_recent_sessions(limit=5):
@@ -157,10 +167,38 @@ def get_topics_stats():
     ''')
 
 # --- Mock Exams ---
+@undoable("Registrar simulado")
 def add_mock_exam(name, date, score, total, time_spent):
     db.execute_query("INSERT INTO mock_exams (name, date, score, total_questions, time_spent) VALUES (?, ?, ?, ?, ?)",
                      (name, date, score, total, time_spent))
 
+@undoable("Registrar simulado")
+def save_mock_exam(name, date, score, total, time_spent, style, board, items_data):
+    """
+    Insert a simulado and its per-subject items in ONE transaction, so it is
+    also one undo step. items_data = [(subject_id, weight, correct, wrong, blank), ...]
+    Returns the new exam id.
+    """
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.execute('''
+            INSERT INTO mock_exams (name, date, score, total_questions, time_spent, style, board)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (name, date, score, total, time_spent, style, board))
+        exam_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO mock_exam_items (mock_exam_id, subject_id, weight, correct, wrong, blank)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(exam_id, *item) for item in items_data])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return exam_id
+
+@undoable("Registrar simulado")
 def add_mock_exam_items_bulk(exam_id, items_data):
     # items_data = [(subject_id, weight, correct, wrong, blank), ...]
     data = [(exam_id, *item) for item in items_data]
@@ -176,20 +214,175 @@ def get_mock_exams():
     return db.fetch_all("SELECT * FROM mock_exams ORDER BY date DESC")
 
 # --- Topics (Syllabus) ---
+def _append_topic_tree(cursor, subject_id, topics_list):
+    """Insert edital lines after the subject's topics, inside the caller's transaction."""
+    cursor.execute(f'''
+        SELECT MAX(order_index) as max_idx, MAX(substr(path, 1, {SEGMENT_WIDTH})) as max_root, MAX(id) as max_id
+        FROM topics WHERE subject_id = ?
+    ''', (subject_id,))
+    res = cursor.fetchone()
+    start = res['max_idx'] + TOPIC_ORDER_GAP if res['max_idx'] is not None else 0
+    first_root = int(res['max_root']) + 1 if res['max_root'] else 1
+    nodes = build_tree(topics_list, first_root=first_root)
+    data = [(subject_id, n.title, 0, start + i * TOPIC_ORDER_GAP, n.path) for i, n in enumerate(nodes)]
+    cursor.executemany("INSERT INTO topics (subject_id, title, completed, order_index, path) VALUES (?, ?, ?, ?, ?)", data)
+    # Resolve parent ids through the paths just written
+    cursor.execute("SELECT id, path FROM topics WHERE subject_id = ? AND id > ?", (subject_id, res['max_id'] or 0))
+    ids = {r['path']: r['id'] for r in cursor.fetchall()}
+    cursor.executemany("UPDATE topics SET parent_id = ? WHERE id = ?",
+                       [(ids[nodes[n.parent].path], ids[n.path]) for n in nodes if n.parent is not None])
+
+
+def _merge_topic_tree(cursor, subject_id, topics_list, threshold=FUZZY_THRESHOLD):
+    """Apply the merge diff of merge_topics inside the caller's transaction; returns its counts."""
+    cursor.execute("""
+        SELECT t.id, t.title, t.order_index, t.path,
+               (t.completed = 1 OR COALESCE(t.material_link, '') != ''
+                OR EXISTS (SELECT 1 FROM study_sessions ss WHERE ss.subject_id = t.subject_id AND ss.topic = t.title)
+                OR EXISTS (SELECT 1 FROM review_schedule r WHERE r.subject_id = t.subject_id AND r.topic = t.title)
+               ) as has_progress
+        FROM topics t WHERE t.subject_id = ? ORDER BY t.order_index, t.id
+    """, (subject_id,))
+    existing = cursor.fetchall()
+    nodes = build_tree(topics_list)
+    diff = diff_topics([(t['id'], t['title']) for t in existing], [n.title for n in nodes], threshold)
+    stored = {t['id']: t for t in existing}
+    # Topics with progress or study history are never dropped: they move
+    # after the new edital as top-level topics instead
+    kept = [tid for tid in diff.deletes if stored[tid]['has_progress']]
+    deletes = [tid for tid in diff.deletes if not stored[tid]['has_progress']]
+
+    updates = []
+    for tid, index in diff.matches:
+        node = nodes[index]
+        row = stored[tid]
+        order = index * TOPIC_ORDER_GAP
+        if (row['title'], row['order_index'], row['path']) != (node.title, order, node.path):
+            updates.append((node.title, order, node.path, tid))
+    inserts = [(subject_id, nodes[i].title, 0, i * TOPIC_ORDER_GAP, nodes[i].path) for i in diff.inserts]
+    last_root = max((int(n.path[:SEGMENT_WIDTH]) for n in nodes), default=0)
+    moves = [(stored[tid]['title'], (len(nodes) + k) * TOPIC_ORDER_GAP, make_path([last_root + 1 + k]), tid)
+             for k, tid in enumerate(kept)]
+
+    if deletes:
+        cursor.executemany("DELETE FROM topics WHERE id = ?", [(tid,) for tid in deletes])
+    if updates or moves:
+        cursor.executemany("UPDATE topics SET title = ?, order_index = ?, path = ? WHERE id = ?", updates + moves)
+    if inserts:
+        cursor.executemany("INSERT INTO topics (subject_id, title, completed, order_index, path) VALUES (?, ?, ?, ?, ?)", inserts)
+    # Rebuild parent links from the new paths
+    cursor.execute("SELECT id, path FROM topics WHERE subject_id = ? AND path IS NOT NULL", (subject_id,))
+    ids = {r['path']: r['id'] for r in cursor.fetchall()}
+    cursor.execute("UPDATE topics SET parent_id = NULL WHERE subject_id = ?", (subject_id,))
+    cursor.executemany("UPDATE topics SET parent_id = ? WHERE id = ?",
+                       [(ids[nodes[n.parent].path], ids[n.path]) for n in nodes if n.parent is not None])
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "kept": len(kept),
+        "unchanged": len(diff.matches) - len(updates),
+    }
+
+
+@undoable("Importar edital")
+def import_topics_bulk(topics_by_subject, merge=False):
+    """
+    Import several editais at once - {subject_id: [lines]} - in ONE
+    transaction, appending (add_topics_bulk) or merging (merge_topics) per
+    subject. Nothing is written if any subject fails.
+    Returns {subject_id: merge counts} when merging, else {}.
+    """
+    results = {}
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        for subject_id, topics_list in topics_by_subject.items():
+            if merge:
+                results[subject_id] = _merge_topic_tree(cursor, subject_id, topics_list)
+            else:
+                _append_topic_tree(cursor, subject_id, topics_list)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    for subject_id in topics_by_subject:
+        _update_subject_stats(subject_id)
+    return results
+
+
+@undoable("Importar edital")
 def add_topics_bulk(subject_id, topics_list):
-    # topics_list is a list of strings
-    data = [(subject_id, t, 0, i) for i, t in enumerate(topics_list)]
+    """
+    Append edital lines (strings) after the existing topics in ONE transaction.
+    Their numbering becomes a tree (parent_id + path, see src.utils.topic_tree);
+    new top-level sections are numbered after the subject's existing ones.
+    """
+    import_topics_bulk({subject_id: topics_list})
+
+@undoable("Mesclar edital")
+def merge_topics(subject_id, topics_list, threshold=FUZZY_THRESHOLD):
+    """
+    Re-import an updated edital over the subject's topics in ONE transaction.
+    Incoming lines are matched to stored topics (see src.utils.topic_merge):
+    matches keep their id, completion and material link and take the new
+    title and position; unmatched lines are inserted. Stored topics missing
+    from the new edital are deleted, unless they are completed, have a
+    material link or were studied/reviewed: those are kept, moved after the
+    new topics.
+    Returns {"inserted", "updated", "deleted", "kept", "unchanged"} counts.
+    """
     conn = db.get_connection()
     cursor = conn.cursor()
-    cursor.executemany("INSERT INTO topics (subject_id, title, completed, order_index) VALUES (?, ?, ?, ?)", data)
-    conn.commit()
+    try:
+        cursor.execute("BEGIN")
+        result = _merge_topic_tree(cursor, subject_id, topics_list, threshold)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    _update_subject_stats(subject_id)
+    return result
+
+def get_subtree_progress(subject_id, path):
+    """
+    Topic count and completed count of a section and everything under it,
+    as one range scan on (subject_id, path).
+    """
+    lower, upper = subtree_bounds(path)
+    return db.fetch_one('''
+        SELECT COUNT(*) as total, COALESCE(SUM(completed), 0) as completed
+        FROM topics
+        WHERE subject_id = ? AND (path = ? OR (path > ? AND path < ?))
+    ''', (subject_id, path, lower, upper))
+
+
+def get_section_progress(subject_id):
+    """{top-level path: (total, completed)} for every section of a subject."""
+    rows = db.fetch_all(f'''
+        SELECT substr(path, 1, {SEGMENT_WIDTH}) as section, COUNT(*) as total, COALESCE(SUM(completed), 0) as completed
+        FROM topics
+        WHERE subject_id = ? AND path IS NOT NULL
+        GROUP BY section
+    ''', (subject_id,))
+    return {r['section']: (r['total'], r['completed']) for r in rows}
+
 
 def get_topics_by_subject(subject_id):
     return db.fetch_all("SELECT * FROM topics WHERE subject_id = ? ORDER BY order_index", (subject_id,))
 
+# Completing stamps completed_at (kept if already set); un-completing clears it
+_TOPIC_COMPLETE_UPDATE = (
+    "UPDATE topics SET completed = ?, "
+    "completed_at = CASE WHEN ? THEN COALESCE(completed_at, ?) ELSE NULL END "
+    "WHERE id = ?"
+)
+
+@undoable("Marcar tópico")
 def toggle_topic_complete(topic_id, completed):
     val = 1 if completed else 0
-    db.execute_query("UPDATE topics SET completed = ? WHERE id = ?", (val, topic_id))
+    db.execute_query(_TOPIC_COMPLETE_UPDATE, (val, val, format_datetime_db(), topic_id))
     
     # Update subject stats
     # Get subject_id
@@ -203,19 +396,85 @@ def toggle_topic_complete(topic_id, completed):
         
         db.execute_query("UPDATE subjects SET total_topics = ?, completed_topics = ? WHERE id = ?", (total, done, sub_id))
 
+@undoable("Marcar tópicos")
+def toggle_topics_bulk(changes):
+    """
+    Apply many topic completion changes in ONE transaction.
+    changes: {topic_id: completed}
+    Subject stats are recounted once per affected subject.
+    Returns: set of affected subject ids.
+    """
+    if not changes:
+        return set()
+    now = format_datetime_db()
+    data = [(int(bool(completed)), int(bool(completed)), now, topic_id) for topic_id, completed in changes.items()]
+    topic_ids = list(changes.keys())
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.executemany(_TOPIC_COMPLETE_UPDATE, data)
+
+        placeholders = ",".join("?" * len(topic_ids))
+        cursor.execute(f"SELECT DISTINCT subject_id FROM topics WHERE id IN ({placeholders})", topic_ids)
+        subject_ids = {row['subject_id'] for row in cursor.fetchall()}
+
+        cursor.executemany('''
+            UPDATE subjects SET
+                total_topics = (SELECT COUNT(*) FROM topics WHERE subject_id = subjects.id),
+                completed_topics = (SELECT COALESCE(SUM(completed), 0) FROM topics WHERE subject_id = subjects.id)
+            WHERE id = ?
+        ''', [(sid,) for sid in subject_ids])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return subject_ids
+
 
 # --- Reminders ---
+@undoable("Criar lembrete")
 def add_reminder(content, category, date_time):
+    # Stored as "YYYY-MM-DD HH:MM:SS" so due/late checks and ordering work in SQL
     db.execute_query("INSERT INTO reminders (content, category, date_time) VALUES (?, ?, ?)", 
-                     (content, category, date_time))
+                     (content, category, normalize_datetime_db(date_time)))
 
-def get_reminders(limit=5):
-    return db.fetch_all("SELECT * FROM reminders WHERE status = 0 ORDER BY date_time ASC LIMIT ?", (limit,))
+def get_reminders(limit=5, include_reviews=True):
+    if include_reviews:
+        return db.fetch_all("SELECT * FROM reminders WHERE status = 0 ORDER BY date_time ASC LIMIT ?", (limit,))
+    # Generated reviews have their own dashboard block
+    return db.fetch_all("SELECT * FROM reminders WHERE status = 0 AND category IS NOT 'Revisão' ORDER BY date_time ASC LIMIT ?", (limit,))
 
+@undoable("Excluir lembrete")
 def delete_reminder(reminder_id):
     db.execute_query("DELETE FROM reminders WHERE id = ?", (reminder_id,))
 
+# --- Timer Checkpoint ---
+def save_timer_checkpoint(subject_id, topic, started_at, accumulated_seconds, paused_spans, running):
+    """Upsert the running timer state. A single-row write, cheap enough to call every few seconds."""
+    import json
+    db.execute_query('''
+        INSERT OR REPLACE INTO timer_checkpoint
+            (id, subject_id, topic, started_at, accumulated_seconds, paused_spans, running, updated_at)
+        VALUES (1, ?, ?, ?, ?, ?, ?, ?)
+    ''', (subject_id, topic, started_at, int(accumulated_seconds), json.dumps(paused_spans),
+          1 if running else 0, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+def get_timer_checkpoint():
+    """Return the orphaned timer state as a dict, or None."""
+    import json
+    row = db.fetch_one("SELECT * FROM timer_checkpoint WHERE id = 1")
+    if not row:
+        return None
+    data = dict(row)
+    data['paused_spans'] = json.loads(data['paused_spans']) if data['paused_spans'] else []
+    return data
+
+def clear_timer_checkpoint():
+    db.execute_query("DELETE FROM timer_checkpoint WHERE id = 1")
+
 # --- Plans ---
+@undoable("Criar plano")
 def add_plan(name, obs, has_image=False, is_generic=False, subject_ids=None):
     """Create a new plan and optionally associate subjects."""
     if subject_ids is None:
@@ -249,10 +508,168 @@ def get_reviews():
     # Return all reminders with category 'Revisão'
     return db.fetch_all("SELECT * FROM reminders WHERE category = 'Revisão' ORDER BY date_time ASC")
 
+@undoable("Atualizar lembrete")
 def update_reminder_status(rid, status):
     # status: 0=Pending, 1=Done, 2=Ignored
     db.execute_query("UPDATE reminders SET status = ? WHERE id = ?", (status, rid))
 
+# --- Spaced Repetition ---
+REVIEW_CATEGORY = "Revisão"
+
+def schedule_reviews_bulk(sessions, not_before=None, quality=None):
+    """
+    Advance the SM-2 state of each (subject, topic) and (re)generate its next review.
+    sessions: [(subject_id, topic, correct, wrong, studied_at)] in chronological order;
+    several sessions of the same topic are applied one after another.
+    With `not_before` (datetime), earlier due dates are moved up to it, so
+    past sessions do not land straight in the overdue list. `quality` (0-5)
+    grades every session instead of their question accuracy, for self-graded
+    reviews.
+    Everything is written with executemany in ONE transaction.
+    Returns: number of (subject, topic) pairs scheduled.
+    """
+    if not sessions:
+        return 0
+    subject_ids = sorted({s[0] for s in sessions})
+    placeholders = ",".join("?" * len(subject_ids))
+    
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.execute(f"SELECT * FROM review_schedule WHERE subject_id IN ({placeholders})", subject_ids)
+        states = {(r['subject_id'], r['topic']): ReviewState(r['repetitions'], r['ease'], r['interval_days'])
+                  for r in cursor.fetchall()}
+        cursor.execute(f"SELECT id, name FROM subjects WHERE id IN ({placeholders})", subject_ids)
+        names = {r['id']: r['name'] for r in cursor.fetchall()}
+        
+        scheduled = {}  # (subject_id, topic) -> (state, due_at, quality)
+        for subject_id, topic, correct, wrong, studied_at in sessions:
+            key = (subject_id, topic)
+            grade = quality_from_accuracy(correct, wrong) if quality is None else quality
+            state = next_state(states.get(key), grade)
+            states[key] = state
+            due = parse_datetime(studied_at) + timedelta(days=state.interval_days)
+            if not_before is not None:
+                due = max(due, not_before)
+            scheduled[key] = (state, format_datetime_db(due), grade)
+        
+        now_str = format_datetime_db()
+        cursor.executemany('''
+            INSERT INTO review_schedule (subject_id, topic, repetitions, ease, interval_days, due_at, last_quality, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(subject_id, topic) DO UPDATE SET
+                repetitions = excluded.repetitions, ease = excluded.ease, interval_days = excluded.interval_days,
+                due_at = excluded.due_at, last_quality = excluded.last_quality, updated_at = excluded.updated_at
+        ''', [(sid, topic, st.repetitions, st.ease, st.interval_days, due, q, now_str)
+              for (sid, topic), (st, due, q) in scheduled.items()])
+        # Only one pending generated review per topic: replace the previous one
+        cursor.executemany(
+            "DELETE FROM reminders WHERE subject_id = ? AND topic = ? AND category = ? AND status = 0",
+            [(sid, topic, REVIEW_CATEGORY) for sid, topic in scheduled]
+        )
+        cursor.executemany(
+            "INSERT INTO reminders (content, category, date_time, status, subject_id, topic) VALUES (?, ?, ?, 0, ?, ?)",
+            [(f"{names.get(sid, '')}: {topic}", REVIEW_CATEGORY, due, sid, topic)
+             for (sid, topic), (st, due, q) in scheduled.items()]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(scheduled)
+
+def get_due_reviews(now=None, limit=20):
+    """
+    Pending reviews due by `now`, most urgent first (priority-queue order):
+    days overdue relative to the review interval, then lowest ease.
+    LIMIT lets SQLite keep only the top rows instead of sorting the whole backlog.
+    """
+    return db.fetch_all('''
+        SELECT r.*, rs.ease, rs.interval_days,
+               (julianday(:now) - julianday(r.date_time)) / MAX(COALESCE(rs.interval_days, 1), 1) as overdue_ratio
+        FROM reminders r
+        LEFT JOIN review_schedule rs ON rs.subject_id = r.subject_id AND rs.topic = r.topic
+        WHERE r.category = 'Revisão' AND r.status = 0 AND r.date_time <= :now
+        ORDER BY overdue_ratio DESC, COALESCE(rs.ease, 2.5) ASC, r.date_time ASC
+        LIMIT :limit
+    ''', {"now": format_datetime_db(now), "limit": limit})
+
+@undoable("Concluir revisão")
+def complete_review(reminder_id, quality=None, now=None):
+    """
+    Mark a review done; generated reviews schedule their next repetition,
+    graded by `quality` (0-5, see REVIEW_GRADES): a forgotten topic (< 3)
+    comes back the next day. Without a grade it counts as a review without
+    questions (NO_QUESTIONS_QUALITY).
+    """
+    update_reminder_status(reminder_id, 1)
+    r = db.fetch_one("SELECT subject_id, topic FROM reminders WHERE id = ?", (reminder_id,))
+    if r and r['subject_id'] is not None and r['topic'] is not None:
+        schedule_reviews_bulk([(r['subject_id'], r['topic'], 0, 0, format_datetime_db(now))], quality=quality)
+
+@undoable("Ignorar revisão")
+def ignore_review(reminder_id):
+    """
+    Mark a review ignored. A generated review's topic goes back to
+    INITIAL_STATE (its schedule row is dropped), so the next study session
+    with review scheduling starts its cycle from the first interval.
+    """
+    update_reminder_status(reminder_id, 2)
+    r = db.fetch_one("SELECT subject_id, topic FROM reminders WHERE id = ?", (reminder_id,))
+    if r and r['subject_id'] is not None and r['topic'] is not None:
+        db.execute_query("DELETE FROM review_schedule WHERE subject_id = ? AND topic = ?", (r['subject_id'], r['topic']))
+
+# Reviews page tabs -> (WHERE clause, ORDER BY). "now" is bound as :now.
+# A review due exactly now is late, as in get_due_reviews.
+REVIEW_TABS = {
+    "PROGRAMADAS": ("status = 0 AND date_time > :now", "date_time ASC, id"),
+    "ATRASADAS": ("status = 0 AND date_time <= :now", "date_time ASC, id"),
+    "CONCLUÍDAS": ("status = 1", "date_time DESC, id DESC"),
+    "IGNORADAS": ("status = 2", "date_time DESC, id DESC"),
+}
+
+def _review_window(params, start=None, end=None):
+    """Extra WHERE terms (and params) for a date window [start, end)."""
+    where = ""
+    if start is not None:
+        where += " AND date_time >= :start"
+        params["start"] = format_datetime_db(start)
+    if end is not None:
+        where += " AND date_time < :end"
+        params["end"] = format_datetime_db(end)
+    return where
+
+def get_review_counts(now=None, start=None, end=None):
+    """
+    Count reviews per tab in a SINGLE aggregate query, optionally limited
+    to the same date window [start, end) as get_reviews_page.
+    Returns: {tab_name: count}
+    """
+    params = {"now": format_datetime_db(now)}
+    window = _review_window(params, start, end)
+    columns = ",\n".join(
+        f"COALESCE(SUM(CASE WHEN {where} THEN 1 ELSE 0 END), 0) as \"{tab}\""
+        for tab, (where, _) in REVIEW_TABS.items()
+    )
+    row = db.fetch_one(f"SELECT {columns} FROM reminders WHERE category = 'Revisão'{window}", params)
+    return {tab: row[tab] for tab in REVIEW_TABS}
+
+def get_reviews_page(tab, now=None, limit=50, offset=0, start=None, end=None):
+    """
+    One page of reviews for a tab, optionally limited to a date window [start, end).
+    Late/scheduled split is done in SQL against `now`.
+    """
+    where, order_by = REVIEW_TABS[tab]
+    params = {"now": format_datetime_db(now), "limit": limit, "offset": offset}
+    where += _review_window(params, start, end)
+    return db.fetch_all(f'''
+        SELECT * FROM reminders
+        WHERE category = 'Revisão' AND {where}
+        ORDER BY {order_by}
+        LIMIT :limit OFFSET :offset
+    ''', params)
+
 # --- Plan Extensions ---
 def get_plan_by_id(plan_id):
     return db.fetch_one("SELECT * FROM plans WHERE id = ?", (plan_id,))
@@ -264,15 +681,18 @@ def get_subjects_by_plan(plan_id):
         FROM subjects s
         JOIN plan_subjects ps ON s.id = ps.subject_id
         WHERE ps.plan_id = ?
+        ORDER BY s.name
     ''', (plan_id,))
 
 # --- Subjects (Extended) ---
+@undoable("Criar disciplina")
 def add_subject_return_id(name, category, color):
     # Check if exists by name?
     # For now, simplistic insert
     cursor = db.execute_query("INSERT INTO subjects (name, category, color) VALUES (?, ?, ?)", (name, category, color))
     return cursor.lastrowid
 
+@undoable("Vincular disciplina")
 def add_subject_to_plan(plan_id, subject_id):
     """Link a subject to a plan, ignoring if already linked."""
     import sqlite3
@@ -281,21 +701,44 @@ def add_subject_to_plan(plan_id, subject_id):
     except sqlite3.IntegrityError:
         pass  # Already linked (PRIMARY KEY constraint)
 
+@undoable("Editar disciplina")
 def update_subject_details(subject_id, name, color):
     db.execute_query("UPDATE subjects SET name = ?, color = ? WHERE id = ?", (name, color, subject_id))
 
+@undoable("Desvincular disciplina")
 def remove_subject_from_plan(plan_id, subject_id):
     db.execute_query("DELETE FROM plan_subjects WHERE plan_id = ? AND subject_id = ?", (plan_id, subject_id))
 
 # --- Topic Management ---
+# order_index values are spaced by TOPIC_ORDER_GAP so a topic can be moved
+# between two neighbours by rewriting only its own row.
+TOPIC_ORDER_GAP = 1024
+
+def order_index_between(before, after):
+    """
+    Pick an order_index strictly between two neighbours (None = list edge).
+    Returns None when there is no free slot left and the list must be renumbered.
+    """
+    if before is None and after is None:
+        return 0
+    if before is None:
+        return after - TOPIC_ORDER_GAP
+    if after is None:
+        return before + TOPIC_ORDER_GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+@undoable("Criar tópico")
 def add_topic(subject_id, title, material_link=""):
     # Get max order
     res = db.fetch_one("SELECT MAX(order_index) as max_idx FROM topics WHERE subject_id = ?", (subject_id,))
-    idx = (res['max_idx'] + 1) if res['max_idx'] is not None else 0
+    idx = (res['max_idx'] + TOPIC_ORDER_GAP) if res['max_idx'] is not None else 0
     
     db.execute_query("INSERT INTO topics (subject_id, title, order_index, material_link) VALUES (?, ?, ?, ?)", (subject_id, title, idx, material_link))
     _update_subject_stats(subject_id)
 
+@undoable("Editar tópico")
 def update_topic(topic_id, title=None, material_link=None):
     if title is not None and material_link is not None:
          db.execute_query("UPDATE topics SET title = ?, material_link = ? WHERE id = ?", (title, material_link, topic_id))
@@ -304,13 +747,50 @@ def update_topic(topic_id, title=None, material_link=None):
     elif material_link is not None:
          db.execute_query("UPDATE topics SET material_link = ? WHERE id = ?", (material_link, topic_id))
 
+@undoable("Excluir tópico")
 def delete_topic(topic_id):
     # Get sub id before delete for stats
     t = db.fetch_one("SELECT subject_id FROM topics WHERE id = ?", (topic_id,))
     if t:
         db.execute_query("DELETE FROM topics WHERE id = ?", (topic_id,))
+        db.execute_query("UPDATE topics SET parent_id = NULL WHERE parent_id = ?", (topic_id,))
         _update_subject_stats(t['subject_id'])
 
+@undoable("Editar tópicos")
+def save_topic_edits(subject_id, added=(), updated=(), deleted=()):
+    """
+    Commit a staged topic edit session in ONE transaction.
+    added: [(title, order_index)]
+    updated: [(topic_id, title, order_index)] - only rows that changed
+    deleted: [topic_id]
+    Subject stats are recounted once at the end.
+    """
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        if deleted:
+            cursor.executemany("DELETE FROM topics WHERE id = ? AND subject_id = ?",
+                               [(tid, subject_id) for tid in deleted])
+            cursor.executemany("UPDATE topics SET parent_id = NULL WHERE parent_id = ?",
+                               [(tid,) for tid in deleted])
+        if updated:
+            cursor.executemany("UPDATE topics SET title = ?, order_index = ? WHERE id = ? AND subject_id = ?",
+                               [(title, idx, tid, subject_id) for tid, title, idx in updated])
+        if added:
+            cursor.executemany("INSERT INTO topics (subject_id, title, completed, order_index) VALUES (?, ?, 0, ?)",
+                               [(subject_id, title, idx) for title, idx in added])
+        cursor.execute('''
+            UPDATE subjects SET
+                total_topics = (SELECT COUNT(*) FROM topics WHERE subject_id = subjects.id),
+                completed_topics = (SELECT COALESCE(SUM(completed), 0) FROM topics WHERE subject_id = subjects.id)
+            WHERE id = ?
+        ''', (subject_id,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
 def _update_subject_stats(subject_id):
     res = db.fetch_one("SELECT COUNT(*) as total, SUM(completed) as done FROM topics WHERE subject_id = ?", (subject_id,))
     total = res['total']
@@ -322,10 +802,12 @@ def get_subject_by_id(subject_id):
     """Retrieve a single subject by ID."""
     return db.fetch_one("SELECT * FROM subjects WHERE id = ?", (subject_id,))
 
+@undoable("Excluir sessão")
 def delete_study_session(session_id):
     """Delete a study session by ID."""
     db.execute_query("DELETE FROM study_sessions WHERE id = ?", (session_id,))
 
+@undoable("Excluir disciplina")
 def delete_subject(subject_id):
     """Delete a subject and related records."""
     conn = db.get_connection()
@@ -336,6 +818,9 @@ def delete_subject(subject_id):
         cursor.execute("DELETE FROM study_sessions WHERE subject_id = ?", (subject_id,))
         cursor.execute("DELETE FROM topics WHERE subject_id = ?", (subject_id,))
         cursor.execute("DELETE FROM plan_subjects WHERE subject_id = ?", (subject_id,))
+        cursor.execute("DELETE FROM review_schedule WHERE subject_id = ?", (subject_id,))
+        cursor.execute("DELETE FROM study_cycle_slots WHERE subject_id = ?", (subject_id,))
+        cursor.execute("DELETE FROM reminders WHERE subject_id = ?", (subject_id,))
         cursor.execute("DELETE FROM subjects WHERE id = ?", (subject_id,))
         conn.commit()
     except Exception:
@@ -351,6 +836,7 @@ def get_mock_exam_items(exam_id):
         WHERE mei.mock_exam_id = ?
     ''', (exam_id,))
 
+@undoable("Excluir simulado")
 def delete_mock_exam(exam_id):
     """Delete a mock exam and all its items."""
     db.execute_query("DELETE FROM mock_exam_items WHERE mock_exam_id = ?", (exam_id,))
@@ -435,6 +921,59 @@ def get_all_plans_with_subjects(archived=0):
     return result
 
 
+def get_topics_by_plan(plan_id):
+    """
+    Get the topics of every subject in a plan in a SINGLE ordered query.
+    Eliminates N+1 when rendering a plan's full syllabus.
+    Returns: {subject_id: [topics]} in subject name, then order_index order.
+    """
+    rows = db.fetch_all('''
+        SELECT t.*
+        FROM plan_subjects ps
+        JOIN subjects s ON s.id = ps.subject_id
+        JOIN topics t ON t.subject_id = ps.subject_id
+        WHERE ps.plan_id = ?
+        ORDER BY s.name, t.subject_id, t.order_index
+    ''', (plan_id,))
+    
+    grouped = {}
+    for t in rows:
+        grouped.setdefault(t['subject_id'], []).append(t)
+    return grouped
+
+
+# Whitelisted ORDER BY clauses for get_topics_page
+TOPIC_SORT_ORDERS = {
+    "edital": "s.name, t.subject_id, t.order_index",
+    "title": "t.title COLLATE NOCASE, t.id",
+    "pending": "t.completed, s.name, t.subject_id, t.order_index",
+}
+
+
+def get_topics_page(subject_id=None, sort="edital", limit=50, offset=0):
+    """
+    Get one page of topics across subjects (or a single subject) in a SINGLE query.
+    Filtering, sorting and pagination are done in SQL.
+    Returns: (rows with subject_name/subject_color, total matching rows)
+    """
+    order_by = TOPIC_SORT_ORDERS.get(sort, TOPIC_SORT_ORDERS["edital"])
+    where = "WHERE t.subject_id = ?" if subject_id else ""
+    params = (subject_id,) if subject_id else ()
+    
+    rows = db.fetch_all(f'''
+        SELECT t.*, s.name as subject_name, s.color as subject_color,
+               COUNT(*) OVER () as total_count
+        FROM topics t
+        JOIN subjects s ON s.id = t.subject_id
+        {where}
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    ''', params + (limit, offset))
+    
+    total = rows[0]['total_count'] if rows else 0
+    return rows, total
+
+
 def get_subjects_with_stats():
     """
     Get all subjects with aggregated study stats in a SINGLE query.
@@ -469,6 +1008,164 @@ def get_dashboard_stats():
     ''')
 
 
+def get_completion_pace(windows, today=None, subject_ids=None):
+    """
+    Topic counters plus topics completed in each rolling window, per
+    subject, in a SINGLE query. Only the last max(windows) days of
+    completions are scanned. Columns: subject_id, total_topics,
+    completed_topics and done_<n> for each n in `windows`.
+    """
+    today = today or datetime.now()
+    # Windows end today: a 7-day window is today plus the 6 days before
+    starts = {n: (today - timedelta(days=n - 1)).strftime("%Y-%m-%d") for n in windows}
+    columns = ",\n            ".join(
+        f"COALESCE(SUM(t.completed_at >= :w{n}), 0) as done_{n}" for n in windows
+    )
+    params = {f"w{n}": start for n, start in starts.items()}
+    params["oldest"] = min(starts.values())
+    where = ""
+    if subject_ids is not None:
+        ids = list(subject_ids)
+        if not ids:
+            return []
+        where = "WHERE s.id IN (%s)" % ",".join(f":s{i}" for i in range(len(ids)))
+        params.update({f"s{i}": sid for i, sid in enumerate(ids)})
+    return db.fetch_all(f'''
+        SELECT
+            s.id as subject_id, s.total_topics, s.completed_topics,
+            {columns}
+        FROM subjects s
+        LEFT JOIN topics t ON t.subject_id = s.id AND t.completed = 1 AND t.completed_at >= :oldest
+        {where}
+        GROUP BY s.id
+    ''', params)
+
+
+DEFAULT_DAILY_HOURS = 2.0
+ACCURACY_WINDOW_DAYS = 30
+
+def get_daily_hours(weekday):
+    """Hours available on a weekday (0 = Monday); default when never configured."""
+    row = db.fetch_one("SELECT hours FROM study_availability WHERE weekday = ?", (weekday,))
+    return row['hours'] if row and row['hours'] is not None else DEFAULT_DAILY_HOURS
+
+
+def get_study_availability():
+    """Hours for all seven weekdays: {weekday: hours}."""
+    hours = {day: DEFAULT_DAILY_HOURS for day in range(7)}
+    for r in db.fetch_all("SELECT weekday, hours FROM study_availability"):
+        hours[r['weekday']] = r['hours'] or 0
+    return hours
+
+
+_AVAILABILITY_UPSERT = (
+    "INSERT INTO study_availability (weekday, hours) VALUES (?, ?) "
+    "ON CONFLICT(weekday) DO UPDATE SET hours = excluded.hours"
+)
+
+def set_study_availability(hours_by_weekday):
+    """Store {weekday: hours} for the weekdays given."""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.executemany(_AVAILABILITY_UPSERT,
+                           [(int(day), float(hours or 0)) for day, hours in hours_by_weekday.items()])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@undoable("Salvar planejamento")
+def save_study_plan(ratings, hours_by_weekday, slots):
+    """
+    Persist the planning wizard in ONE transaction: subject ratings
+    {subject_id: (relevance, knowledge)}, weekly availability and the
+    generated cycle (CycleSlot list), which replaces the previous one.
+    """
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.executemany("UPDATE subjects SET relevance = ?, knowledge = ? WHERE id = ?",
+                           [(int(rel), int(kno), sid) for sid, (rel, kno) in ratings.items()])
+        cursor.executemany(_AVAILABILITY_UPSERT,
+                           [(int(day), float(hours or 0)) for day, hours in hours_by_weekday.items()])
+        cursor.execute("DELETE FROM study_cycle_slots")
+        cursor.executemany(
+            "INSERT INTO study_cycle_slots (weekday, position, subject_id, duration_minutes) VALUES (?, ?, ?, ?)",
+            [(s.weekday, s.position, s.subject_id, s.minutes) for s in slots],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_study_cycle():
+    """Persisted cycle with subject name/color, ordered by weekday and position."""
+    return db.fetch_all('''
+        SELECT c.weekday, c.position, c.subject_id, c.duration_minutes, s.name, s.color
+        FROM study_cycle_slots c
+        JOIN subjects s ON s.id = c.subject_id
+        ORDER BY c.weekday, c.position
+    ''')
+
+
+def get_cycle_goals(weekday):
+    """
+    Minutes the cycle plans per subject on `weekday`, as {subject_id: seconds}.
+    Subjects in the cycle but not on that day map to 0; empty when no cycle.
+    """
+    rows = db.fetch_all('''
+        SELECT subject_id, SUM(CASE WHEN weekday = ? THEN duration_minutes ELSE 0 END) * 60 as seconds
+        FROM study_cycle_slots
+        GROUP BY subject_id
+    ''', (weekday,))
+    return {r['subject_id']: r['seconds'] for r in rows}
+
+
+def get_allocation_inputs(today=None):
+    """
+    Everything the daily plan needs per subject in a SINGLE query:
+    weight, ratings, time studied today and questions from the last
+    ACCURACY_WINDOW_DAYS days.
+    """
+    today = today or datetime.now()
+    day_start = today.strftime("%Y-%m-%d")
+    window_start = (today - timedelta(days=ACCURACY_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    return db.fetch_all('''
+        SELECT
+            s.id, s.name, s.weight, s.relevance, s.knowledge,
+            COALESCE(SUM(CASE WHEN ss.date >= :day THEN ss.duration_seconds END), 0) as today_seconds,
+            COALESCE(SUM(ss.questions_correct), 0) as recent_correct,
+            COALESCE(SUM(ss.questions_wrong), 0) as recent_wrong
+        FROM subjects s
+        LEFT JOIN study_sessions ss ON ss.subject_id = s.id AND ss.date >= :window
+        GROUP BY s.id
+        ORDER BY s.name
+    ''', {"day": day_start, "window": window_start})
+
+
+def get_today_seconds(subject_ids, today=None):
+    """Time studied today for just these subjects: {subject_id: seconds}."""
+    subject_ids = list(subject_ids)
+    if not subject_ids:
+        return {}
+    day_start = (today or datetime.now()).strftime("%Y-%m-%d")
+    placeholders = ",".join("?" * len(subject_ids))
+    rows = db.fetch_all(f'''
+        SELECT subject_id, COALESCE(SUM(duration_seconds), 0) as seconds
+        FROM study_sessions
+        WHERE subject_id IN ({placeholders}) AND date >= ?
+        GROUP BY subject_id
+    ''', (*subject_ids, day_start))
+    result = {sid: 0 for sid in subject_ids}
+    result.update({r['subject_id']: r['seconds'] for r in rows})
+    return result
+
+
 def get_mock_exams_with_stats():
     """
     Get all mock exams with aggregated item stats in a SINGLE query.
@@ -505,3 +1202,13 @@ def get_reviews_grouped():
             grouped[status].append(dict(r))
     
     return grouped
+
+
+# --- Undo / Redo ---
+def undo():
+    """Revert the last recorded write; returns its label (None when there is nothing to undo)."""
+    return undo_history.undo()
+
+def redo():
+    """Re-apply the last undone write; returns its label or None."""
+    return undo_history.redo()
@@ -0,0 +1,163 @@
+"""
+Persisted dashboard view-model.
+
+The dashboard needs several aggregate queries before it can show anything.
+The last computed view-model is kept in a small JSON file next to the
+database so the next start can paint from it immediately and reconcile
+with the live data in the background.
+
+The daily plan is the one part that is patched rather than rebuilt: goals
+are fixed for the day once allocated, and a saved session only refreshes
+the studied time of the subjects it touched.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import src.data.crud as crud
+from src.data.forecast import forecast
+from src.utils.allocation import allocate, subject_priority
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_FILE = "dashboard_snapshot.json"
+
+# Sizes shown on the dashboard
+RECENT_SESSIONS = 3
+REMINDERS = 5
+DUE_REVIEWS = 3
+
+
+def snapshot_path():
+    """Snapshot lives next to the database file."""
+    db_dir = os.path.dirname(os.path.abspath(crud.db.DB_NAME))
+    return os.path.join(db_dir, SNAPSHOT_FILE)
+
+
+def build_daily_plan(today=None):
+    """
+    Today's goal per subject: what the saved study cycle plans for this
+    weekday, or, without a cycle, the day's hours allocated by priority
+    (see src.utils.allocation).
+    """
+    today = today or datetime.now()
+    rows = crud.get_allocation_inputs(today)
+
+    cycle_goals = crud.get_cycle_goals(today.weekday())
+    if cycle_goals:
+        goals = {r['id']: cycle_goals.get(r['id'], 0) for r in rows}
+        available = sum(goals.values())
+    else:
+        available = int(crud.get_daily_hours(today.weekday()) * 3600)
+        priorities = {}
+        for r in rows:
+            answered = r['recent_correct'] + r['recent_wrong']
+            accuracy = r['recent_correct'] / answered if answered else None
+            priorities[r['id']] = subject_priority(r['weight'], r['relevance'], r['knowledge'], accuracy)
+        goals = allocate(available, priorities)
+
+    return {
+        "date": today.strftime("%Y-%m-%d"),
+        "available_seconds": available,
+        "items": [
+            {
+                "subject_id": r['id'],
+                "name": r['name'],
+                "goal_seconds": goals[r['id']],
+                "studied_seconds": r['today_seconds'],
+            }
+            for r in rows
+        ],
+    }
+
+
+def patch_daily_plan(plan, subject_ids, today=None):
+    """Copy of `plan` with today's studied time re-read for `subject_ids` only."""
+    studied = crud.get_today_seconds(subject_ids, today)
+    return dict(plan, items=[
+        dict(item, studied_seconds=studied[item['subject_id']]) if item['subject_id'] in studied else item
+        for item in plan['items']
+    ])
+
+
+def build_view_model(previous=None, changed_subject_ids=None, today=None):
+    """
+    Run the dashboard queries and return plain, JSON-serializable data.
+    With a `previous` view-model from the same day and the subject ids a
+    change touched, the daily plan is patched instead of reallocated.
+    """
+    today = today or datetime.now()
+    plan = previous.get("plan") if previous else None
+    if plan and plan['date'] == today.strftime("%Y-%m-%d") and changed_subject_ids is not None:
+        plan = patch_daily_plan(plan, changed_subject_ids, today)
+    else:
+        plan = build_daily_plan(today)
+
+    stats = crud.get_dashboard_stats()
+    topics = crud.get_topics_stats()
+    outlook = forecast.forecast(today=today)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "computed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "stats": {
+            "total_seconds": stats['total_seconds'] if stats else 0,
+            "total_correct": stats['total_correct'] if stats else 0,
+            "total_wrong": stats['total_wrong'] if stats else 0,
+        },
+        "topics": {
+            "total": topics['total_topics'] if topics else 0,
+            "completed": topics['completed_topics'] if topics else 0,
+        },
+        "forecast": {
+            "pending": outlook.pending,
+            "per_day": round(outlook.per_day, 3),
+            "ready_on": outlook.ready_on.strftime("%Y-%m-%d") if outlook.ready_on else None,
+        },
+        "weekly": [[label, hours] for label, hours in crud.get_weekly_study_data()],
+        "plan": plan,
+        "reminders": [
+            {"id": r['id'], "content": r['content'], "date_time": r['date_time']}
+            for r in crud.get_reminders(REMINDERS, include_reviews=False)
+        ],
+        "reviews_due": {
+            "count": crud.get_review_counts()["ATRASADAS"],
+            "items": [{"id": r['id'], "content": r['content']} for r in crud.get_due_reviews(limit=DUE_REVIEWS)],
+        },
+        "recent": [
+            {"subject_name": s['subject_name'], "duration_seconds": s['duration_seconds']}
+            for s in crud.get_recent_sessions(RECENT_SESSIONS)
+        ],
+    }
+
+
+def same_data(a, b):
+    """Compare two view-models ignoring when they were computed."""
+    if a is None or b is None:
+        return False
+    strip = lambda vm: {k: v for k, v in vm.items() if k != "computed_at"}
+    return strip(a) == strip(b)
+
+
+def load_snapshot(path=None):
+    """Return the stored view-model, or None if missing, corrupt or outdated."""
+    path = path or snapshot_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            vm = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(vm, dict) or vm.get("version") != SNAPSHOT_VERSION:
+        return None
+    return vm
+
+
+def save_snapshot(vm, path=None):
+    """Write the view-model atomically (temp file + rename)."""
+    path = path or snapshot_path()
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(vm, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as ex:
+        print(f"Could not save dashboard snapshot: {ex}")
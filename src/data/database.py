@@ -2,6 +2,45 @@
 import sqlite3
 import threading
 import atexit
+import uuid
+
+# Tables replicated through the changelog (see src.data.sync), parents
+# first, with their foreign keys: column -> referenced table. Rows are
+# identified across machines by a random `uid`; foreign keys travel as the
+# referenced row's uid.
+SYNC_TABLES = {
+    "subjects": {},
+    "mock_exams": {},
+    "topics": {"subject_id": "subjects", "parent_id": "topics"},
+    "study_sessions": {"subject_id": "subjects"},
+    "mock_exam_items": {"mock_exam_id": "mock_exams", "subject_id": "subjects"},
+    "reminders": {"subject_id": "subjects"},
+}
+
+# Local-only tables still journaled in the changelog, so undo can restore
+# them (e.g. a deleted subject's plan links); they are never synced.
+JOURNAL_TABLES = ("plan_subjects", "review_schedule", "study_cycle_slots")
+
+# (name, category, total_topics, completed_topics) seeded into a new
+# database; subject n gets the uid "seed-n" on every machine
+SEED_SUBJECTS = [
+    ("Administração Financeira e Orçamentária", "Administração", 120, 10),
+    ("Auditoria do Setor Público", "Auditoria", 80, 5),
+    ("Controle Externo e Legislação Institucional", "Direito", 60, 20),
+    ("Direito Administrativo", "Direito", 150, 45),
+    ("Direito Constitucional", "Direito", 100, 30),
+    ("Português", "Básicas", 200, 100),
+    ("Informática", "Básicas", 50, 5)
+]
+
+# Undo command being recorded on this thread (see src.data.undo). Every
+# connection exposes it to the changelog triggers as changelog_command(),
+# so each entry is tagged with the command of the thread that wrote it.
+command_scope = threading.local()
+
+
+def _current_command():
+    return getattr(command_scope, "id", None)
 
 
 class DatabaseManager:
@@ -9,6 +48,8 @@ class DatabaseManager:
     Thread-safe SQLite database manager.
     Uses thread-local connections to ensure each thread has its own connection.
     Implements proper connection lifecycle management.
+    The schema/migration pass runs lazily on the first connection request
+    (or explicitly via init_db), so importing this module stays cheap.
     """
     
     DB_NAME = "estudei.db"
@@ -26,14 +67,21 @@ class DatabaseManager:
         # Register cleanup on exit
         atexit.register(self.close_all)
         
-        # Initialize schema (thread-safe)
-        self.init_db()
+        # Schema is initialized on first use (see get_connection)
 
     def get_connection(self):
         """
         Get a thread-local database connection.
         Each thread gets its own connection (thread-safe).
+        The first call initializes the schema; later calls skip the lock.
         """
+        conn = self._connect()
+        if not self._initialized:
+            self.init_db()
+        return conn
+
+    def _connect(self):
+        """Open (or reuse) this thread's connection without touching the schema."""
         if not hasattr(self._local, 'conn') or self._local.conn is None:
             conn = sqlite3.connect(self.DB_NAME, timeout=30.0)
             conn.row_factory = sqlite3.Row
@@ -41,6 +89,7 @@ class DatabaseManager:
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("PRAGMA foreign_keys=ON")
             conn.execute("PRAGMA busy_timeout=30000")
+            conn.create_function("changelog_command", 0, _current_command)
             self._local.conn = conn
             
             # Track connection for cleanup
@@ -78,7 +127,7 @@ class DatabaseManager:
             if self._initialized:
                 return
             
-            conn = self.get_connection()
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Subjects Table
@@ -90,7 +139,9 @@ class DatabaseManager:
                     total_topics INTEGER DEFAULT 0,
                     completed_topics INTEGER DEFAULT 0,
                     weight REAL DEFAULT 1.0,
-                    color TEXT DEFAULT '#00bfa5'
+                    color TEXT DEFAULT '#00bfa5',
+                    relevance INTEGER DEFAULT 3,
+                    knowledge INTEGER DEFAULT 2
                 )
             ''')
 
@@ -151,6 +202,9 @@ class DatabaseManager:
                     completed INTEGER DEFAULT 0,
                     order_index INTEGER DEFAULT 0,
                     material_link TEXT,
+                    completed_at TEXT,
+                    parent_id INTEGER,
+                    path TEXT,
                     FOREIGN KEY(subject_id) REFERENCES subjects(id) ON DELETE CASCADE
                 )
             ''')
@@ -162,7 +216,9 @@ class DatabaseManager:
                     content TEXT,
                     category TEXT,
                     date_time TEXT,
-                    status INTEGER DEFAULT 0
+                    status INTEGER DEFAULT 0,
+                    subject_id INTEGER,
+                    topic TEXT
                 )
             ''')
 
@@ -190,6 +246,56 @@ class DatabaseManager:
                 )
             ''')
 
+            # Running timer checkpoint (single row, rewritten in place)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS timer_checkpoint (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    subject_id INTEGER,
+                    topic TEXT,
+                    started_at TEXT,
+                    accumulated_seconds INTEGER DEFAULT 0,
+                    paused_spans TEXT,
+                    running INTEGER DEFAULT 0,
+                    updated_at TEXT
+                )
+            ''')
+
+            # Hours available for study per weekday (0 = Monday)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS study_availability (
+                    weekday INTEGER PRIMARY KEY CHECK (weekday BETWEEN 0 AND 6),
+                    hours REAL DEFAULT 0
+                )
+            ''')
+
+            # Generated weekly study cycle (see src.utils.study_cycle)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS study_cycle_slots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+                    position INTEGER NOT NULL,
+                    subject_id INTEGER NOT NULL,
+                    duration_minutes INTEGER NOT NULL,
+                    FOREIGN KEY(subject_id) REFERENCES subjects(id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Spaced-repetition state per (subject, topic)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS review_schedule (
+                    subject_id INTEGER NOT NULL,
+                    topic TEXT NOT NULL,
+                    repetitions INTEGER DEFAULT 0,
+                    ease REAL DEFAULT 2.5,
+                    interval_days INTEGER DEFAULT 0,
+                    due_at TEXT,
+                    last_quality INTEGER,
+                    updated_at TEXT,
+                    PRIMARY KEY (subject_id, topic),
+                    FOREIGN KEY(subject_id) REFERENCES subjects(id) ON DELETE CASCADE
+                )
+            ''')
+
             # --- Schema Migrations ---
             self._run_migrations(cursor)
 
@@ -209,6 +315,27 @@ class DatabaseManager:
         if 'status' not in columns:
             cursor.execute("ALTER TABLE reminders ADD COLUMN status INTEGER DEFAULT 0")
             print("Migration: Added 'status' column to reminders table.")
+        # Reminders: link generated reviews to their subject/topic
+        for col_name, col_def in [('subject_id', 'INTEGER'), ('topic', 'TEXT')]:
+            if col_name not in columns:
+                cursor.execute(f"ALTER TABLE reminders ADD COLUMN {col_name} {col_def}")
+                print(f"Migration: Added '{col_name}' column to reminders table.")
+        
+        # Topics: completion timestamp (pace/forecast), edital tree (parent/path)
+        cursor.execute("PRAGMA table_info(topics)")
+        columns = [col[1] for col in cursor.fetchall()]
+        for col_name, col_def in [('completed_at', 'TEXT'), ('parent_id', 'INTEGER'), ('path', 'TEXT')]:
+            if col_name not in columns:
+                cursor.execute(f"ALTER TABLE topics ADD COLUMN {col_name} {col_def}")
+                print(f"Migration: Added '{col_name}' column to topics table.")
+
+        # Subjects: planning ratings (0-5)
+        cursor.execute("PRAGMA table_info(subjects)")
+        columns = [col[1] for col in cursor.fetchall()]
+        for col_name, col_def in [('relevance', 'INTEGER DEFAULT 3'), ('knowledge', 'INTEGER DEFAULT 2')]:
+            if col_name not in columns:
+                cursor.execute(f"ALTER TABLE subjects ADD COLUMN {col_name} {col_def}")
+                print(f"Migration: Added '{col_name}' column to subjects table.")
         
         # Mock exams: add style and board columns
         cursor.execute("PRAGMA table_info(mock_exams)")
@@ -234,7 +361,175 @@ class DatabaseManager:
                 print(f"Migration: Added '{col_name}' column to study_sessions table.")
 
         self._normalize_study_session_types(cursor)
+        self._normalize_reminder_dates(cursor)
         self._ensure_cascade_tables(cursor)
+        self._ensure_indexes(cursor)
+        self._ensure_changelog(cursor)
+
+    def _ensure_indexes(self, cursor):
+        """Create indexes used by grouped/ordered queries (after table rebuilds)."""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_subject_order ON topics(subject_id, order_index)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reminders_category_status_date ON reminders(category, status, date_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reminders_subject_topic ON reminders(subject_id, topic)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_study_sessions_subject_date ON study_sessions(subject_id, date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_study_cycle_slots_day ON study_cycle_slots(weekday, position)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_subject_completed_at ON topics(subject_id, completed_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_subject_path ON topics(subject_id, path)")
+
+    def _ensure_changelog(self, cursor):
+        """
+        Append-only changelog filled by triggers on SYNC_TABLES and
+        JOURNAL_TABLES, so every write (including cascaded deletes) is
+        captured without touching crud.
+        `clock` is a Lamport clock: one more than the highest clock seen,
+        local or received. Triggers are silent while sync_state has an
+        'applying' row, so replicated changes are not logged twice.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS changelog (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                clock INTEGER NOT NULL,
+                device TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                uid TEXT NOT NULL,
+                op TEXT NOT NULL CHECK (op IN ('U', 'D')),
+                data TEXT,
+                row_id INTEGER,
+                before TEXT,
+                command TEXT
+            )
+        ''')
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_changelog_device_clock ON changelog(device, clock)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changelog_clock ON changelog(clock)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changelog_row ON changelog(table_name, uid, clock)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+        cursor.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('device_id', ?)", (uuid.uuid4().hex,))
+        cursor.execute("DELETE FROM sync_state WHERE key = 'applying'")
+
+        cursor.execute("PRAGMA table_info(changelog)")
+        columns = [col[1] for col in cursor.fetchall()]
+        for col_name, col_def in [('row_id', 'INTEGER'), ('before', 'TEXT'), ('command', 'TEXT')]:
+            if col_name not in columns:
+                cursor.execute(f"ALTER TABLE changelog ADD COLUMN {col_name} {col_def}")
+                print(f"Migration: Added '{col_name}' column to changelog table.")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changelog_command ON changelog(command) WHERE command IS NOT NULL")
+
+        for table, references in SYNC_TABLES.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [col[1] for col in cursor.fetchall()]
+            if 'uid' not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN uid TEXT")
+                print(f"Migration: Added 'uid' column to {table} table.")
+                columns.append('uid')
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table}(uid)")
+            self._create_log_triggers(cursor, table, columns, references)
+            if table == "subjects":
+                # Seeded subjects of existing installs take the same uids as
+                # fresh ones, or the first sync would duplicate them
+                cursor.executemany('''
+                    UPDATE subjects SET uid = ?
+                    WHERE id = (SELECT MIN(id) FROM subjects WHERE name = ? AND uid IS NULL)
+                      AND NOT EXISTS (SELECT 1 FROM subjects WHERE uid = ?)
+                ''', [(f"seed-{n}", name, f"seed-{n}") for n, (name, *_) in enumerate(SEED_SUBJECTS, start=1)])
+            # Rows from before the changelog get their uid here; the update
+            # trigger logs them, so the first sync carries the existing data
+            cursor.execute(f"UPDATE {table} SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL")
+        for table in JOURNAL_TABLES:
+            cursor.execute(f"PRAGMA table_info({table})")
+            self._create_log_triggers(cursor, table, [col[1] for col in cursor.fetchall()], None)
+        self._prune_changelog(cursor)
+
+    def _prune_changelog(self, cursor):
+        """
+        Drop what no one can need any more, once per start (the undo history
+        only lives in memory, so it is empty here): journal entries, entries
+        superseded by a later change of the same row - sync only ever sends
+        the last change of each row, and the last one is kept so stale
+        changes still lose against it - and the before-images undo used.
+        Per row, seq order is (clock, device) order: received changes are
+        only logged when newer than what is there.
+        """
+        cursor.execute(f"DELETE FROM changelog WHERE table_name IN ({', '.join('?' * len(JOURNAL_TABLES))})",
+                       JOURNAL_TABLES)
+        cursor.execute('''
+            DELETE FROM changelog WHERE EXISTS (
+                SELECT 1 FROM changelog later
+                WHERE later.table_name = changelog.table_name AND later.uid = changelog.uid
+                  AND later.seq > changelog.seq
+            )
+        ''')
+        cursor.execute('''
+            UPDATE changelog SET before = NULL, command = NULL
+            WHERE before IS NOT NULL OR command IS NOT NULL
+        ''')
+
+    def _create_log_triggers(self, cursor, table, columns, references):
+        """
+        Changelog triggers for one table. Every entry keeps the rowid, the
+        row before the change (raw local values) and the undo command of the
+        writing thread, which is all undo needs.
+        Synced tables (`references` given) also log the row after the change
+        with foreign keys as uids; JOURNAL_TABLES log no data and use the
+        rowid as their uid.
+        """
+        log_values = (
+            "(SELECT COALESCE(MAX(clock), 0) + 1 FROM changelog), "
+            "(SELECT value FROM sync_state WHERE key = 'device_id')"
+        )
+        not_applying = "NOT EXISTS (SELECT 1 FROM sync_state WHERE key = 'applying')"
+        # REAL values go through text with 17 digits: json_object keeps only 15,
+        # and column affinity turns the text back into the exact float
+        cursor.execute(f"PRAGMA table_info({table})")
+        real_columns = {col[1] for col in cursor.fetchall() if "REAL" in (col[2] or "").upper()}
+        old_fields = [
+            f"'{col}', CASE WHEN typeof(OLD.{col}) = 'real' THEN printf('%!.17g', OLD.{col}) ELSE OLD.{col} END"
+            if col in real_columns else f"'{col}', OLD.{col}"
+            for col in columns
+        ]
+        old_json = f"json_object({', '.join(old_fields)})"
+
+        # Recreated on every start so they follow column migrations
+        for suffix in ("uid", "log_insert", "log_update", "log_delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_{suffix}")
+
+        if references is None:
+            new_uid, old_uid, new_when, old_when, new_json = "CAST(NEW.rowid AS TEXT)", "CAST(OLD.rowid AS TEXT)", "", "", "NULL"
+        else:
+            fields = []
+            for col in columns:
+                if col in ('id', 'uid'):
+                    continue
+                if col in references:
+                    fields.append(f"'{col}', (SELECT uid FROM {references[col]} WHERE id = NEW.{col})")
+                else:
+                    fields.append(f"'{col}', NEW.{col}")
+            new_json = f"json_object({', '.join(fields)})"
+            new_uid, old_uid = "NEW.uid", "OLD.uid"
+            new_when, old_when = "NEW.uid IS NOT NULL AND", "OLD.uid IS NOT NULL AND"
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_uid AFTER INSERT ON {table} WHEN NEW.uid IS NULL
+                BEGIN
+                    UPDATE {table} SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id;
+                END
+            ''')
+
+        for event, suffix, before in (("INSERT", "log_insert", "NULL"), ("UPDATE", "log_update", old_json)):
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_{suffix} AFTER {event} ON {table}
+                WHEN {new_when} {not_applying}
+                BEGIN
+                    INSERT INTO changelog (clock, device, table_name, uid, op, data, row_id, before, command)
+                    VALUES ({log_values}, '{table}', {new_uid}, 'U', {new_json}, NEW.rowid, {before}, changelog_command());
+                END
+            ''')
+        cursor.execute(f'''
+            CREATE TRIGGER {table}_log_delete AFTER DELETE ON {table}
+            WHEN {old_when} {not_applying}
+            BEGIN
+                INSERT INTO changelog (clock, device, table_name, uid, op, data, row_id, before, command)
+                VALUES ({log_values}, '{table}', {old_uid}, 'D', NULL, OLD.rowid, {old_json}, changelog_command());
+            END
+        ''')
 
     def _normalize_study_session_types(self, cursor):
         """Normalize legacy study session type labels."""
@@ -252,6 +547,23 @@ class DatabaseManager:
             WHERE type IN ('QUESTOES', 'QUESTAO', 'QUESTAOES', 'VIDEOAULA', 'VIDEO AULA', 'REVISAO')
         """)
 
+    def _normalize_reminder_dates(self, cursor):
+        """Rewrite legacy reminder dates (DD/MM/YYYY [HH:MM], YYYY-MM-DD [HH:MM]) as YYYY-MM-DD HH:MM:SS."""
+        cursor.execute("UPDATE reminders SET status = 0 WHERE status IS NULL")
+        cursor.execute("""
+            UPDATE reminders
+            SET date_time = substr(date_time, 7, 4) || '-' || substr(date_time, 4, 2) || '-' || substr(date_time, 1, 2)
+                || ' ' || CASE WHEN length(date_time) = 16 THEN substr(date_time, 12, 5) || ':00' ELSE '00:00:00' END
+            WHERE date_time GLOB '[0-3][0-9]/[0-1][0-9]/[0-9][0-9][0-9][0-9]'
+               OR date_time GLOB '[0-3][0-9]/[0-1][0-9]/[0-9][0-9][0-9][0-9] [0-2][0-9]:[0-5][0-9]'
+        """)
+        cursor.execute("""
+            UPDATE reminders
+            SET date_time = date_time || CASE WHEN length(date_time) = 10 THEN ' 00:00:00' ELSE ':00' END
+            WHERE date_time GLOB '[0-9][0-9][0-9][0-9]-[0-1][0-9]-[0-3][0-9]'
+               OR date_time GLOB '[0-9][0-9][0-9][0-9]-[0-1][0-9]-[0-3][0-9] [0-2][0-9]:[0-5][0-9]'
+        """)
+
     def _ensure_cascade_tables(self, cursor):
         """Rebuild tables to ensure ON DELETE CASCADE in existing databases."""
         cursor.execute("PRAGMA foreign_keys=OFF")
@@ -327,6 +639,9 @@ class DatabaseManager:
                     completed INTEGER DEFAULT 0,
                     order_index INTEGER DEFAULT 0,
                     material_link TEXT,
+                    completed_at TEXT,
+                    parent_id INTEGER,
+                    path TEXT,
                     FOREIGN KEY(subject_id) REFERENCES subjects(id) ON DELETE CASCADE
                 )
             ''',
@@ -337,6 +652,9 @@ class DatabaseManager:
                 "completed",
                 "order_index",
                 "material_link",
+                "completed_at",
+                "parent_id",
+                "path",
             ],
         )
         self._ensure_cascade_for_table(
@@ -375,18 +693,10 @@ class DatabaseManager:
 
     def seed_data(self, cursor):
         """Insert initial seed data."""
-        subjects = [
-            ("Administração Financeira e Orçamentária", "Administração", 120, 10),
-            ("Auditoria do Setor Público", "Auditoria", 80, 5),
-            ("Controle Externo e Legislação Institucional", "Direito", 60, 20),
-            ("Direito Administrativo", "Direito", 150, 45),
-            ("Direito Constitucional", "Direito", 100, 30),
-            ("Português", "Básicas", 200, 100),
-            ("Informática", "Básicas", 50, 5)
-        ]
+        # Fixed uids: every machine seeds the same subjects, so sync must not duplicate them
         cursor.executemany(
-            "INSERT INTO subjects (name, category, total_topics, completed_topics) VALUES (?, ?, ?, ?)",
-            subjects
+            "INSERT INTO subjects (name, category, total_topics, completed_topics, uid) VALUES (?, ?, ?, ?, ?)",
+            [s + (f"seed-{n}",) for n, s in enumerate(SEED_SUBJECTS, start=1)]
         )
         print("Database seeded with initial subjects.")
 
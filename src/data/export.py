@@ -0,0 +1,168 @@
+"""
+Streaming export of the study data to CSV or JSON Lines.
+
+Rows are read with `fetchmany` in chunks and written straight to the
+output file, so memory stays flat whatever the size of the database.
+Each table goes to its own file (`<table>.csv` / `<table>.jsonl`). Every
+table is first written under a staging name, and the files only take their
+final names once all tables are done: a cancelled or failed export leaves
+neither partial files nor a mix with the previous export's files.
+`start_export` runs the whole export on a background thread with progress
+and cancellation.
+"""
+
+import csv
+import json
+import os
+import threading
+
+import src.data.crud as crud
+
+# Parents first, so a later import can resolve references in order
+EXPORT_TABLES = [
+    "subjects",
+    "topics",
+    "study_sessions",
+    "mock_exams",
+    "mock_exam_items",
+    "reminders",
+]
+
+FORMATS = {"csv": ".csv", "jsonl": ".jsonl"}
+CHUNK_SIZE = 1000
+STAGING_SUFFIX = ".part"
+
+
+class ExportCancelled(Exception):
+    """Raised inside the export when its cancel event is set."""
+
+
+def count_rows(table):
+    return crud.db.fetch_one(f"SELECT COUNT(*) as c FROM {table}")['c']
+
+
+def iter_chunks(table, chunk_size=CHUNK_SIZE):
+    """Yield (columns, rows) chunks of `table` in rowid order."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    cursor = crud.db.get_connection().cursor()
+    try:
+        cursor.execute(f"SELECT * FROM {table} ORDER BY rowid")
+        columns = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield columns, rows
+    finally:
+        cursor.close()
+
+
+def _table_columns(table):
+    cursor = crud.db.get_connection().execute(f"SELECT * FROM {table} LIMIT 0")
+    return [d[0] for d in cursor.description]
+
+
+def export_table(table, path, fmt="csv", chunk_size=CHUNK_SIZE, on_rows=None, cancel=None):
+    """
+    Stream one table into `path`. `on_rows(n)` is called after each chunk.
+    Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    tmp_path = path + ".tmp"
+    written = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = None
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(_table_columns(table))
+            for columns, rows in iter_chunks(table, chunk_size):
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelled()
+                if writer:
+                    writer.writerows(tuple(row) for row in rows)
+                else:
+                    f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+                written += len(rows)
+                if on_rows:
+                    on_rows(len(rows))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def export_tables(dest_dir, fmt="csv", tables=None, chunk_size=CHUNK_SIZE, on_progress=None, cancel=None):
+    """
+    Export `tables` (default EXPORT_TABLES) into `dest_dir`, all or nothing.
+    `on_progress(done_rows, total_rows)` follows the whole export.
+    Returns {table: rows written}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    tables = tables or EXPORT_TABLES
+    os.makedirs(dest_dir, exist_ok=True)
+    total = sum(count_rows(t) for t in tables)
+    done = 0
+
+    def advance(n):
+        nonlocal done
+        done += n
+        if on_progress:
+            on_progress(done, total)
+
+    result = {}
+    paths = {table: os.path.join(dest_dir, table + FORMATS[fmt]) for table in tables}
+    try:
+        for table in tables:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            result[table] = export_table(table, paths[table] + STAGING_SUFFIX, fmt, chunk_size, advance, cancel)
+    except BaseException:
+        for table in result:  # This run's finished tables
+            staged = paths[table] + STAGING_SUFFIX
+            if os.path.exists(staged):
+                os.remove(staged)
+        raise
+    for table in tables:
+        os.replace(paths[table] + STAGING_SUFFIX, paths[table])
+    if on_progress:
+        on_progress(total, total)
+    return result
+
+
+def start_export(dest_dir, fmt="csv", on_progress=None, on_done=None, tables=None):
+    """
+    Run `export_tables` on a daemon thread. `on_done(result, error)` gets
+    the row counts, or the exception (ExportCancelled when cancelled).
+    Returns the cancel event.
+    """
+    cancel = threading.Event()
+
+    def run():
+        try:
+            result = export_tables(dest_dir, fmt, tables, on_progress=on_progress, cancel=cancel)
+        except Exception as ex:
+            print(f"Export failed: {ex}")
+            if on_done:
+                on_done(None, ex)
+            return
+        if on_done:
+            on_done(result, None)
+
+    threading.Thread(target=run, daemon=True, name="export").start()
+    return cancel
+
+
+def read_export(path):
+    """Stream rows back from an exported file as dicts (CSV values are strings)."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(FORMATS["csv"]):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                yield json.loads(line)
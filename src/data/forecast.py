@@ -0,0 +1,99 @@
+"""
+Edital completion forecast.
+
+Pending topics come from the per-subject counters (subjects.total_topics /
+completed_topics); the pace is the number of topics completed per day over
+rolling windows of topics.completed_at. The per-subject figures are cached
+and only the subjects named by TOPIC_TOGGLED / PLAN_CHANGED events are
+re-read; everything is reloaded once a day, when the windows move.
+"""
+
+import math
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import src.data.crud as crud
+from src.utils.events import bus, EventType
+
+# Rolling windows in days: the short one reacts to a change of pace,
+# the long one keeps a single slow week from hiding steady progress
+WINDOWS = (7, 30)
+
+SubjectPace = namedtuple("SubjectPace", ["pending", "per_day"])
+Forecast = namedtuple("Forecast", ["pending", "per_day", "ready_on"])
+
+
+def pace_from_row(row, windows=WINDOWS):
+    """Pending topics and blended topics/day from a crud.get_completion_pace row."""
+    pending = max(0, (row['total_topics'] or 0) - (row['completed_topics'] or 0))
+    per_day = sum(row[f"done_{n}"] / n for n in windows) / len(windows)
+    return SubjectPace(pending, per_day)
+
+
+def project(pending, per_day, today):
+    """Date all pending topics are done at `per_day`; None without any pace."""
+    if pending <= 0:
+        return today
+    if per_day <= 0:
+        return None
+    return today + timedelta(days=math.ceil(pending / per_day))
+
+
+class CompletionForecast:
+    """Cached per-subject pace, refreshed per subject on events."""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = windows
+        self._lock = threading.Lock()
+        self._pace = {}  # subject_id -> SubjectPace
+        self._day = None  # date the cache was loaded for
+        self._dirty = set()
+
+    def invalidate(self, subject_ids=None):
+        """Mark subjects for re-reading; None drops the whole cache."""
+        with self._lock:
+            if subject_ids is None:
+                self._day = None
+            else:
+                self._dirty.update(subject_ids)
+
+    def on_events(self, events):
+        for ev in events:
+            # An event without subjects (e.g. a plan rename) may touch anything
+            self.invalidate(ev.subject_ids or None)
+
+    def _refresh_locked(self, today, subject_ids):
+        if self._day != today.date():
+            rows = crud.get_completion_pace(self.windows, today)
+            self._pace = {r['subject_id']: pace_from_row(r, self.windows) for r in rows}
+            self._day = today.date()
+            self._dirty.clear()
+            return
+        stale = self._dirty | {sid for sid in subject_ids if sid not in self._pace}
+        if stale:
+            # Deleted subjects come back without a row: their old pace must not count
+            for sid in stale:
+                self._pace.pop(sid, None)
+            for r in crud.get_completion_pace(self.windows, today, stale):
+                self._pace[r['subject_id']] = pace_from_row(r, self.windows)
+            self._dirty.clear()
+
+    def forecast(self, subject_ids=None, today=None):
+        """
+        Forecast for a group of subjects (a plan), or every subject.
+        `ready_on` is a date, or None when nothing is being completed.
+        """
+        today = today or datetime.now()
+        with self._lock:
+            wanted = list(subject_ids) if subject_ids is not None else []
+            self._refresh_locked(today, wanted)
+            paces = [self._pace[sid] for sid in wanted if sid in self._pace] \
+                if subject_ids is not None else list(self._pace.values())
+        pending = sum(p.pending for p in paces)
+        per_day = sum(p.per_day for p in paces)
+        return Forecast(pending, per_day, project(pending, per_day, today.date()))
+
+
+forecast = CompletionForecast()
+bus.subscribe(forecast.on_events, types=[EventType.TOPIC_TOGGLED, EventType.PLAN_CHANGED])
@@ -0,0 +1,276 @@
+"""
+Bulk import of study sessions from CSV.
+
+Spreadsheet headers are matched to study_sessions fields through a table of
+aliases (Portuguese and English, accents and case ignored), subjects are
+resolved through an in-memory name -> id index, and valid rows are written
+with `executemany` in chunked transactions while the file is still being
+read. Rows that cannot be imported are collected with the reason instead of
+aborting the import. Review scheduling is opt-in and runs once at the end
+instead of once per row, only over sessions from the last
+REVIEW_WINDOW_DAYS, with due dates no earlier than the import: years of
+history would otherwise fill the overdue list at once.
+"""
+
+import csv
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import src.data.crud as crud
+from src.utils.date_utils import format_datetime_db, parse_datetimes
+
+CHUNK_SIZE = 500
+REVIEW_WINDOW_DAYS = 30
+
+# field -> accepted headers (already folded: no accents, lower case, "_" for spaces)
+COLUMN_ALIASES = {
+    "subject": ["disciplina", "materia", "subject", "subject_name"],
+    "subject_id": ["subject_id", "id_disciplina"],
+    "topic": ["topico", "assunto", "conteudo", "topic"],
+    "date": ["data", "data_hora", "date", "datetime"],
+    "duration": ["duracao", "tempo", "tempo_de_estudo", "duration"],
+    "duration_seconds": ["duration_seconds", "duracao_segundos", "segundos"],
+    "type": ["tipo", "categoria", "type"],
+    "correct": ["acertos", "correct", "questions_correct"],
+    "wrong": ["erros", "wrong", "questions_wrong"],
+    "pages_start": ["pagina_inicial", "pages_start"],
+    "pages_end": ["pagina_final", "pages_end"],
+    "video_start": ["video_inicio", "video_start"],
+    "video_end": ["video_fim", "video_end"],
+}
+
+# Folded spellings of the labels StudyModal writes
+SESSION_TYPES = {
+    "TEORIA": "TEORIA",
+    "QUESTOES": "QUESTÕES",
+    "QUESTAO": "QUESTÕES",
+    "VIDEOAULA": "VÍDEOAULA",
+    "VIDEO AULA": "VÍDEOAULA",
+    "REVISAO": "REVISÃO",
+}
+DEFAULT_TYPE = "TEORIA"
+
+RejectedRow = namedtuple("RejectedRow", ["line", "reason", "row"])
+ImportResult = namedtuple("ImportResult", ["imported", "rejected", "subject_ids"])
+
+_DURATION_RE = re.compile(r"^(?:(\d+)\s*h)?\s*(?:(\d+)\s*(?:min|m)?)?$")
+
+
+def fold(text):
+    """Lower-case, accent-free, single-underscore key for matching names."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[\s\-]+", "_", text.strip().lower())
+
+
+def map_columns(header):
+    """{field: column index} for the header cells we recognise."""
+    lookup = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for index, name in enumerate(header):
+        field = lookup.get(fold(name))
+        if field and field not in mapping:
+            mapping[field] = index
+    return mapping
+
+
+def parse_duration(text):
+    """
+    Seconds from "01:30:00", "1:30", "1h30", "1h", "90min" or a bare
+    number of minutes. None when invalid or not positive.
+    """
+    text = (text or "").strip().lower()
+    if not text:
+        return None
+    try:
+        if ":" in text:
+            parts = [int(p) for p in text.split(":")]
+            if len(parts) == 2:
+                parts.append(0)
+            if len(parts) != 3:
+                return None
+            seconds = parts[0] * 3600 + parts[1] * 60 + parts[2]
+        elif text.endswith("s") and not text.endswith("min"):
+            seconds = int(float(text[:-1].replace(",", ".")))
+        else:
+            match = _DURATION_RE.match(text)
+            if match and (match.group(1) or match.group(2)):
+                seconds = int(match.group(1) or 0) * 3600 + int(match.group(2) or 0) * 60
+            else:
+                seconds = int(float(text.replace(",", ".")) * 60)
+    except ValueError:
+        return None
+    return seconds if seconds > 0 else None
+
+
+def _int_or_zero(text):
+    text = (text or "").strip()
+    return int(float(text.replace(",", "."))) if text else 0
+
+
+def _normalize_type(text):
+    key = fold(text).upper().replace("_", " ")
+    if not key:
+        return DEFAULT_TYPE
+    return SESSION_TYPES.get(key, SESSION_TYPES.get(key.replace(" ", ""), (text or "").strip().upper()))
+
+
+class SessionImporter:
+    """
+    One import run. `subject_index` maps folded subject names to ids;
+    with `create_subjects` unknown names become new subjects instead of
+    rejected rows.
+    """
+
+    def __init__(self, create_subjects=False, schedule_reviews=False, chunk_size=CHUNK_SIZE, now=None):
+        self.create_subjects = create_subjects
+        self.schedule_reviews = schedule_reviews
+        self.chunk_size = chunk_size
+        self.now = now or datetime.now()
+        self.review_since = format_datetime_db(self.now - timedelta(days=REVIEW_WINDOW_DAYS))
+        self.subjects = crud.get_all_subjects()
+        self.subject_index = {fold(s['name']): s['id'] for s in self.subjects}
+        self.subject_ids = {s['id'] for s in self.subjects}
+
+    def resolve_subject(self, name, subject_id):
+        if subject_id:
+            try:
+                sid = int(subject_id)
+            except ValueError:
+                sid = None
+            if sid in self.subject_ids:
+                return sid
+        key = fold(name)
+        if not key:
+            return None
+        sid = self.subject_index.get(key)
+        if sid is None and self.create_subjects:
+            sid = crud.add_subject_return_id(name.strip(), "Importado", "#00bfa5")
+            self.subject_index[key] = sid
+            self.subject_ids.add(sid)
+        return sid
+
+    def _convert_chunk(self, lines, mapping, rejected):
+        """Validate a chunk of (line_number, cells); return insert tuples."""
+        get = lambda cells, field: cells[mapping[field]] if field in mapping and mapping[field] < len(cells) else ""
+        dates = parse_datetimes([get(cells, "date").strip() for _, cells in lines])
+        rows = []
+        for (line, cells), date in zip(lines, dates):
+            subject_id = self.resolve_subject(get(cells, "subject"), get(cells, "subject_id").strip())
+            if subject_id is None:
+                rejected.append(RejectedRow(line, f"Disciplina desconhecida: {get(cells, 'subject')!r}", cells))
+                continue
+            if date is None:
+                rejected.append(RejectedRow(line, f"Data inválida: {get(cells, 'date')!r}", cells))
+                continue
+            if "duration_seconds" in mapping:
+                raw = get(cells, "duration_seconds").strip()
+                duration = int(raw) if raw.isdigit() and int(raw) > 0 else None
+            else:
+                duration = parse_duration(get(cells, "duration"))
+            if duration is None:
+                rejected.append(RejectedRow(line, "Duração inválida", cells))
+                continue
+            try:
+                numbers = [_int_or_zero(get(cells, f)) for f in ("correct", "wrong", "pages_start", "pages_end")]
+            except ValueError:
+                rejected.append(RejectedRow(line, "Número inválido em acertos/erros/páginas", cells))
+                continue
+            if any(n < 0 for n in numbers):
+                rejected.append(RejectedRow(line, "Valores negativos não são permitidos", cells))
+                continue
+            correct, wrong, pages_start, pages_end = numbers
+            rows.append((
+                subject_id, get(cells, "topic").strip(), format_datetime_db(date), duration,
+                _normalize_type(get(cells, "type")), correct, wrong, pages_start, pages_end,
+                get(cells, "video_start").strip(), get(cells, "video_end").strip(),
+            ))
+        return rows
+
+    def _insert_chunk(self, rows):
+        conn = crud.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            cursor.executemany('''
+                INSERT INTO study_sessions (subject_id, topic, date, duration_seconds, type, questions_correct, questions_wrong, pages_start, pages_end, video_start, video_end)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def import_rows(self, reader, on_progress=None):
+        """
+        Import from an iterator of cell lists whose first item is the header.
+        `on_progress(lines_read, imported)` is called after each chunk.
+        """
+        header = next(reader, None)
+        if header is None:
+            return ImportResult(0, [], set())
+        mapping = map_columns(header)
+        if "subject" not in mapping and "subject_id" not in mapping:
+            raise ValueError("Coluna de disciplina não encontrada no cabeçalho")
+        if "date" not in mapping:
+            raise ValueError("Coluna de data não encontrada no cabeçalho")
+        if "duration" not in mapping and "duration_seconds" not in mapping:
+            raise ValueError("Coluna de duração não encontrada no cabeçalho")
+
+        imported = 0
+        rejected = []
+        subject_ids = set()
+        review_input = []
+        chunk = []
+        line = 1
+
+        def flush():
+            nonlocal imported
+            rows = self._convert_chunk(chunk, mapping, rejected)
+            if rows:
+                self._insert_chunk(rows)
+                imported += len(rows)
+                subject_ids.update(r[0] for r in rows)
+                if self.schedule_reviews:
+                    review_input.extend((r[0], r[1], r[5], r[6], r[2]) for r in rows
+                                        if r[1] and r[2] >= self.review_since)
+            chunk.clear()
+            if on_progress:
+                on_progress(line, imported)
+
+        for cells in reader:
+            line += 1
+            if not any(c.strip() for c in cells):
+                continue
+            chunk.append((line, cells))
+            if len(chunk) >= self.chunk_size:
+                flush()
+        flush()
+
+        # Aggregates once for the whole file: SM-2 state in date order
+        if review_input:
+            review_input.sort(key=lambda s: s[4])
+            crud.schedule_reviews_bulk(review_input, not_before=self.now)
+        return ImportResult(imported, rejected, subject_ids)
+
+    def import_file(self, path, on_progress=None):
+        """Import a CSV file; the delimiter (',' or ';') is detected."""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            return self.import_rows(csv.reader(f, dialect), on_progress)
+
+
+def write_rejected_report(rejected, path):
+    """CSV with line number, reason and the original cells of each rejected row."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["linha", "motivo", "conteudo"])
+        for r in rejected:
+            writer.writerow([r.line, r.reason, " | ".join(r.row)])
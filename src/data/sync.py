@@ -0,0 +1,208 @@
+"""
+Serverless sync between machines through a shared folder.
+
+Every write to SYNC_TABLES is captured by triggers into `changelog` (see
+DatabaseManager._ensure_changelog) with a Lamport clock and the device id.
+`export_changes` writes the local entries made since the previous export
+as one gzipped JSON Lines batch, named "<device>-<first clock>-<last clock>",
+keeping only the last change of each row. `import_changes` reads the other
+devices' batches past their recorded watermark and applies them in one
+transaction.
+
+Merges are last-writer-wins per row, ordered by (clock, device): every
+machine applying the same set of changes ends with the same rows, whatever
+order the batches arrive in. Received entries are kept in the changelog so
+later local writes get higher clocks than anything already seen; only the
+last entry of each row has to stay, the older ones are pruned at start
+(see DatabaseManager._prune_changelog).
+"""
+
+import gzip
+import json
+import os
+import re
+from collections import namedtuple
+
+import src.data.crud as crud
+from src.data.database import SYNC_TABLES
+
+BATCH_SUFFIX = ".jsonl.gz"
+_BATCH_NAME = re.compile(r"^(?P<device>[0-9a-f]+)-(?P<first>\d+)-(?P<last>\d+)\.jsonl\.gz$")
+
+SyncResult = namedtuple("SyncResult", ["exported", "applied", "skipped"])
+
+
+def get_state(key, default=None):
+    row = crud.db.fetch_one("SELECT value FROM sync_state WHERE key = ?", (key,))
+    return row['value'] if row else default
+
+
+def set_state(key, value):
+    crud.db.execute_query("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def device_id():
+    return get_state("device_id")
+
+
+def local_changes(since_seq=0):
+    """This device's entries after `since_seq`, compacted to the last change per row."""
+    tables = ", ".join("?" * len(SYNC_TABLES))
+    rows = crud.db.fetch_all(f'''
+        SELECT seq, clock, table_name, uid, op, data FROM changelog
+        WHERE device = ? AND seq > ? AND table_name IN ({tables})
+        ORDER BY seq
+    ''', (device_id(), since_seq, *SYNC_TABLES))
+    latest = {}
+    for r in rows:
+        latest[(r['table_name'], r['uid'])] = r
+    return sorted(latest.values(), key=lambda r: r['clock']), (rows[-1]['seq'] if rows else since_seq)
+
+
+def export_changes(folder):
+    """Write the changes made since the last export; returns how many were written."""
+    since = int(get_state("exported_seq", 0))
+    changes, last_seq = local_changes(since)
+    if not changes:
+        return 0
+    device = device_id()
+    name = f"{device}-{changes[0]['clock']:012d}-{changes[-1]['clock']:012d}{BATCH_SUFFIX}"
+    path = os.path.join(folder, name)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for r in changes:
+            f.write(json.dumps({
+                "clock": r['clock'], "device": device, "table": r['table_name'], "uid": r['uid'],
+                "op": r['op'], "data": json.loads(r['data']) if r['data'] else None,
+            }, ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp_path, path)
+    set_state("exported_seq", last_seq)
+    return len(changes)
+
+
+def read_batch(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def pending_batches(folder):
+    """[(path, device, last clock)] of other devices' batches not imported yet."""
+    me = device_id()
+    batches = []
+    for name in sorted(os.listdir(folder)):
+        match = _BATCH_NAME.match(name)
+        if not match or match.group("device") == me:
+            continue
+        device, last = match.group("device"), int(match.group("last"))
+        if last > int(get_state(f"peer:{device}", 0)):
+            batches.append((os.path.join(folder, name), device, last))
+    return batches
+
+
+def _apply_row(cursor, table, uid, data, columns):
+    """Upsert one row by uid; returns False if a referenced row is not here (yet)."""
+    references = SYNC_TABLES[table]
+    values = {}
+    resolved = True
+    for col, value in data.items():
+        if col not in columns:
+            continue  # Column the other machine has and this one does not
+        if col in references and value is not None:
+            cursor.execute(f"SELECT id FROM {references[col]} WHERE uid = ?", (value,))
+            row = cursor.fetchone()
+            resolved = resolved and row is not None
+            value = row['id'] if row else None
+        values[col] = value
+    cursor.execute(f"SELECT id FROM {table} WHERE uid = ?", (uid,))
+    existing = cursor.fetchone()
+    if existing:
+        if values:
+            assignments = ", ".join(f"{col} = ?" for col in values)
+            cursor.execute(f"UPDATE {table} SET {assignments} WHERE id = ?", (*values.values(), existing['id']))
+    else:
+        names = ["uid", *values]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            (uid, *values.values()),
+        )
+    return resolved
+
+
+def apply_changes(changes):
+    """
+    Apply received changes in ONE transaction, in (clock, device) order.
+    A change wins only over an older change of the same row; duplicates
+    and stale changes are skipped. Returns (applied, skipped).
+    Batches are compacted, so a child row can come before the last change
+    of its parent: rows whose references were missing are applied again
+    once the whole batch is in.
+    """
+    applied = skipped = 0
+    conn = crud.db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        cursor.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('applying', '1')")
+        columns = {}
+        for table in SYNC_TABLES:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns[table] = {col[1] for col in cursor.fetchall()} - {"id", "uid"}
+        unresolved = []
+        for c in sorted(changes, key=lambda c: (c["clock"], c["device"])):
+            if c["table"] not in SYNC_TABLES:
+                skipped += 1
+                continue
+            cursor.execute('''
+                SELECT clock, device FROM changelog WHERE table_name = ? AND uid = ?
+                ORDER BY clock DESC, device DESC LIMIT 1
+            ''', (c["table"], c["uid"]))
+            latest = cursor.fetchone()
+            if latest and (latest['clock'], latest['device']) >= (c["clock"], c["device"]):
+                skipped += 1
+                continue
+            cursor.execute('''
+                INSERT INTO changelog (clock, device, table_name, uid, op, data) VALUES (?, ?, ?, ?, ?, ?)
+            ''', (c["clock"], c["device"], c["table"], c["uid"], c["op"],
+                  json.dumps(c["data"], ensure_ascii=False) if c["data"] is not None else None))
+            if c["op"] == "D":
+                cursor.execute(f"DELETE FROM {c['table']} WHERE uid = ?", (c["uid"],))
+            elif not _apply_row(cursor, c["table"], c["uid"], c["data"] or {}, columns[c["table"]]):
+                unresolved.append(c)
+            applied += 1
+        for c in unresolved:
+            cursor.execute(f"SELECT 1 FROM {c['table']} WHERE uid = ?", (c["uid"],))
+            if cursor.fetchone():  # Not deleted by a later change
+                _apply_row(cursor, c["table"], c["uid"], c["data"] or {}, columns[c["table"]])
+        cursor.execute("DELETE FROM sync_state WHERE key = 'applying'")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied, skipped
+
+
+def import_changes(folder):
+    """Apply the other devices' new batches from `folder`; returns (applied, skipped)."""
+    batches = pending_batches(folder)
+    if not batches:
+        return 0, 0
+    changes = [c for path, _, _ in batches for c in read_batch(path)]
+    result = apply_changes(changes)
+    watermarks = {}
+    for _, device, last in batches:
+        watermarks[device] = max(last, watermarks.get(device, 0))
+    for device, last in watermarks.items():
+        set_state(f"peer:{device}", last)
+    return result
+
+
+def sync_folder(folder):
+    """Import what the other machines wrote, then export what this one changed."""
+    os.makedirs(folder, exist_ok=True)
+    applied, skipped = import_changes(folder)
+    exported = export_changes(folder)
+    set_state("folder", folder)
+    return SyncResult(exported, applied, skipped)
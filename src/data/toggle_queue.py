@@ -0,0 +1,126 @@
+"""
+Write-coalescing queue for topic completion toggles.
+
+Checkboxes update the UI immediately and enqueue the change here; after a
+short quiet period every pending toggle is written in a single transaction
+(crud.toggle_topics_bulk) and one TOPIC_TOGGLED event is published. A failed
+write is queued again and retried with a growing delay (up to
+MAX_RETRY_DELAY), so the optimistic UI state still reaches the database.
+"""
+
+import atexit
+import threading
+import time
+
+import src.data.crud as crud
+from src.utils.events import bus, EventType
+
+MAX_RETRY_DELAY = 30.0
+
+
+class TopicToggleQueue:
+    """
+    Debounced topic toggle writer.
+
+    Toggling the same topic several times before a flush keeps only the
+    last value, and a topic toggled back to its original state is not
+    written at all. `max_delay` caps how long continuous clicking can
+    postpone the write.
+    """
+
+    def __init__(self, delay=0.4, max_delay=2.0, event_bus=bus):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.event_bus = event_bus
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # topic_id -> completed (latest value)
+        self._original = {}  # topic_id -> completed before the first queued toggle
+        self._timer = None
+        self._burst_started = None
+        self._failures = 0  # Consecutive failed flushes, for the retry backoff
+
+    def toggle(self, topic_id, completed, previous=None):
+        """
+        Queue a completion change. `previous` (the value shown before the
+        click) lets a toggle that is undone before the flush be dropped.
+        """
+        completed = bool(completed)
+        with self._lock:
+            if topic_id not in self._original and previous is not None:
+                self._original[topic_id] = bool(previous)
+            if self._original.get(topic_id) == completed:
+                # Back to the stored value: nothing to write
+                self._pending.pop(topic_id, None)
+                self._original.pop(topic_id, None)
+            else:
+                self._pending[topic_id] = completed
+            self._schedule_locked()
+
+    def pending(self, topic_id):
+        """Value waiting to be written for a topic, or None."""
+        with self._lock:
+            return self._pending.get(topic_id)
+
+    def flush(self):
+        """Write all pending toggles now. Returns the affected subject ids."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                self._burst_started = None
+                changes = self._pending
+                originals = self._original
+                self._pending = {}
+                self._original = {}
+
+            if not changes:
+                return set()
+
+            try:
+                subject_ids = crud.toggle_topics_bulk(changes)
+            except Exception as ex:
+                print(f"Error saving topic toggles: {ex}")
+                with self._lock:
+                    # Retry later unless the user changed them again meanwhile
+                    for topic_id, completed in changes.items():
+                        self._pending.setdefault(topic_id, completed)
+                    for topic_id, completed in originals.items():
+                        self._original.setdefault(topic_id, completed)
+                    self._failures += 1
+                    self._schedule_locked()
+                return set()
+            with self._lock:
+                self._failures = 0
+
+        self.event_bus.publish(EventType.TOPIC_TOGGLED, ids=changes.keys(), subject_ids=subject_ids)
+        return subject_ids
+
+    def _schedule_locked(self):
+        if not self._pending:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._burst_started = None
+            return
+        now = time.monotonic()
+        if self._burst_started is None:
+            self._burst_started = now
+        if self._timer:
+            self._timer.cancel()
+        if self._failures:
+            wait = min(self.delay * 2 ** self._failures, MAX_RETRY_DELAY)
+        else:
+            remaining = self.max_delay - (now - self._burst_started)
+            wait = max(0.0, min(self.delay, remaining))
+        self._timer = threading.Timer(wait, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+
+# Singleton instance
+toggle_queue = TopicToggleQueue()
+
+# Don't lose the last clicks when the window is closed mid-debounce
+atexit.register(toggle_queue.flush)
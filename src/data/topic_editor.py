@@ -0,0 +1,91 @@
+"""
+Staged editing of a subject's topics.
+
+SubjectEditModal works on a TopicEditSession: renames, additions, deletions
+and drag-reorders only touch the in-memory list, and `commit()` writes the
+net result in a single transaction (crud.save_topic_edits).
+"""
+
+import src.data.crud as crud
+
+
+class TopicEditSession:
+    """
+    In-memory copy of a subject's topics plus the pending changes.
+
+    Items are dicts with `id` (None for new topics), `title` and
+    `order_index`, kept in display order. Reordering gives the moved item an
+    order_index between its new neighbours, so a move rewrites one row; the
+    list is only renumbered when two neighbours have no gap left.
+    """
+
+    def __init__(self, subject_id, topics=None):
+        self.subject_id = subject_id
+        if topics is None:
+            topics = crud.get_topics_by_subject(subject_id)
+        self.items = [{"id": t['id'], "title": t['title'], "order_index": t['order_index']} for t in topics]
+        self._original = {item["id"]: (item["title"], item["order_index"]) for item in self.items}
+        self._deleted = set()
+
+    def __len__(self):
+        return len(self.items)
+
+    # --- Staging ---
+    def add(self, title):
+        """Append a new topic at the end. Returns the staged item."""
+        last = self.items[-1]["order_index"] if self.items else None
+        item = {"id": None, "title": title, "order_index": crud.order_index_between(last, None)}
+        self.items.append(item)
+        return item
+
+    def rename(self, item, title):
+        item["title"] = title
+
+    def delete(self, item):
+        self.items.remove(item)
+        if item["id"] is not None:
+            self._deleted.add(item["id"])
+
+    def move(self, old_index, new_index):
+        """Move the item at `old_index` so it ends up at `new_index`."""
+        if old_index == new_index:
+            return
+        item = self.items.pop(old_index)
+        self.items.insert(new_index, item)
+
+        before = self.items[new_index - 1]["order_index"] if new_index > 0 else None
+        after = self.items[new_index + 1]["order_index"] if new_index + 1 < len(self.items) else None
+        idx = crud.order_index_between(before, after)
+        if idx is None:
+            self._renumber()
+        else:
+            item["order_index"] = idx
+
+    def _renumber(self):
+        for i, item in enumerate(self.items):
+            item["order_index"] = i * crud.TOPIC_ORDER_GAP
+
+    # --- Commit ---
+    def changes(self):
+        """Net changes as (added, updated, deleted), ready for crud.save_topic_edits."""
+        added = [(item["title"], item["order_index"]) for item in self.items if item["id"] is None]
+        updated = [
+            (item["id"], item["title"], item["order_index"])
+            for item in self.items
+            if item["id"] is not None and self._original.get(item["id"]) != (item["title"], item["order_index"])
+        ]
+        return added, updated, sorted(self._deleted)
+
+    @property
+    def dirty(self):
+        return any(self.changes())
+
+    def commit(self):
+        """Write all staged changes in one transaction. Returns True if anything was saved."""
+        added, updated, deleted = self.changes()
+        if not (added or updated or deleted):
+            return False
+        crud.save_topic_edits(self.subject_id, added=added, updated=updated, deleted=deleted)
+        # Start a fresh session from the committed state
+        self.__init__(self.subject_id)
+        return True
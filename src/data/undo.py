@@ -0,0 +1,140 @@
+"""
+Undo/redo on top of the changelog.
+
+The changelog triggers already store, for every row written, its rowid and
+the row as it was before the change (see DatabaseManager._create_log_triggers).
+While a command runs, its thread's connection tags those entries with the
+command id (database.command_scope), so a command is just the entries
+carrying its id: writes from other threads in the meantime - the toggle
+flush timer, imports, sync - keep their own tags. Undoing a command walks
+its entries backwards and writes the inverse of each one - delete what was
+inserted, restore what was updated or deleted, cascaded rows included. The
+inverse writes are tagged as a new command, which is the redo command, and
+undoing that is redo.
+
+Only (label, command id) is kept in memory, in bounded deques.
+"""
+
+import functools
+import json
+import threading
+import uuid
+from collections import deque, namedtuple
+
+import src.data.database as database
+
+UNDO_LIMIT = 50
+
+Command = namedtuple("Command", ["label", "command_id"])
+
+
+class UndoStack:
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+        self._lock = threading.Lock()
+
+    def _wrote(self, command_id):
+        row = database.db.fetch_one("SELECT EXISTS (SELECT 1 FROM changelog WHERE command = ?) as wrote", (command_id,))
+        return bool(row['wrote'])
+
+    def command(self, label):
+        """Decorator: record everything the function writes as one undoable step."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if getattr(database.command_scope, "id", None) is not None:
+                    return func(*args, **kwargs)  # Nested: part of the outer command
+                command_id = uuid.uuid4().hex
+                database.command_scope.id = command_id
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    database.command_scope.id = None
+                if self._wrote(command_id):
+                    with self._lock:
+                        self.undo_stack.append(Command(label, command_id))
+                        self.redo_stack.clear()
+                return result
+            return wrapper
+        return decorate
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        """Revert the last command; returns its label, or None if there is nothing to undo."""
+        return self._move(self.undo_stack, self.redo_stack)
+
+    def redo(self):
+        """Re-apply the last undone command; returns its label or None."""
+        return self._move(self.redo_stack, self.undo_stack)
+
+    def clear(self):
+        with self._lock:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+
+    def _move(self, source, target):
+        with self._lock:
+            if not source:
+                return None
+            command = source.pop()
+            try:
+                inverse = self._invert(command)
+            except Exception:
+                source.append(command)
+                raise
+            target.append(inverse)
+            return command.label
+
+    def _invert(self, command):
+        """Write the inverse of every entry of `command`, newest first, in ONE transaction."""
+        inverse_id = uuid.uuid4().hex
+        previous = getattr(database.command_scope, "id", None)
+        conn = database.db.get_connection()
+        cursor = conn.cursor()
+        database.command_scope.id = inverse_id
+        try:
+            cursor.execute("BEGIN")
+            cursor.execute('''
+                SELECT table_name, op, row_id, before FROM changelog
+                WHERE command = ? AND row_id IS NOT NULL
+                  AND device = (SELECT value FROM sync_state WHERE key = 'device_id')
+                ORDER BY seq DESC
+            ''', (command.command_id,))
+            columns = {}
+            for entry in cursor.fetchall():
+                table = entry['table_name']
+                if table not in columns:
+                    cursor.execute(f"PRAGMA table_info({table})")
+                    columns[table] = {col[1] for col in cursor.fetchall()}
+                before = json.loads(entry['before']) if entry['before'] else None
+                if before is None or ('uid' in before and before['uid'] is None):
+                    # The row was inserted (synced rows get their uid right after)
+                    cursor.execute(f"DELETE FROM {table} WHERE rowid = ?", (entry['row_id'],))
+                    continue
+                values = {col: value for col, value in before.items() if col in columns[table]}
+                if entry['op'] == 'D':
+                    cursor.execute(
+                        f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                        tuple(values.values()),
+                    )
+                else:
+                    values.pop('id', None)
+                    assignments = ", ".join(f"{col} = ?" for col in values)
+                    cursor.execute(f"UPDATE {table} SET {assignments} WHERE rowid = ?", (*values.values(), entry['row_id']))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            database.command_scope.id = previous
+        return Command(command.label, inverse_id)
+
+
+history = UndoStack()
+undoable = history.command
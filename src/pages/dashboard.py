@@ -4,6 +4,10 @@ from src.theme import AppTheme
 from src.components.stat_card import StatCard, PerformanceCard
 from src.components.heatmap import ConsistencyHeatmap
 from src.components.charts import StudyChart
+from src.data import dashboard_snapshot
+from src.utils.events import bus, EventType
+from src.utils.date_utils import format_datetime_display
+import threading
 
 class DashboardPage(ft.Container):
     def __init__(self, page: ft.Page = None):
@@ -12,57 +16,117 @@ class DashboardPage(ft.Container):
         self.padding = 30
         self.expand = True
         self._subscribed = False
+        # Refreshes come from event threads and the reconcile thread
+        self._lock = threading.Lock()
+        self._generation = 0
         
         # Subscribe to events (will unsubscribe when navigating away)
         self._subscribe_to_events()
-             
-        self.build_ui()
+        
+        # Paint from the last snapshot when there is one, then reconcile
+        self.view_model = dashboard_snapshot.load_snapshot()
+        if self.view_model:
+            self.build_ui(self.view_model)
+            threading.Thread(target=self.reconcile, daemon=True, name="dashboard-reconcile").start()
+        else:
+            self.refresh_view_model(always_render=True)
     
     def _subscribe_to_events(self):
-        """Subscribe to pubsub events."""
-        if self.page_ref and not self._subscribed:
-            self.page_ref.pubsub.subscribe(self.on_message)
+        """Subscribe to event bus (held weakly by the bus)."""
+        if not self._subscribed:
+            bus.subscribe(self.on_events, types=[
+                EventType.SESSION_ADDED,
+                EventType.SESSION_DELETED,
+                EventType.SESSION_EDITED,
+                EventType.TOPIC_TOGGLED,
+            ])
             self._subscribed = True
     
     def _unsubscribe_from_events(self):
-        """Unsubscribe from pubsub events to prevent memory leaks."""
-        if self.page_ref and self._subscribed:
-            try:
-                self.page_ref.pubsub.unsubscribe(self.on_message)
-            except Exception:
-                pass  # May fail if already unsubscribed
+        """Unsubscribe from the event bus once the page leaves the screen."""
+        if self._subscribed:
+            bus.unsubscribe(self.on_events)
             self._subscribed = False
     
     def will_unmount(self):
         """Called when page is being replaced - cleanup subscriptions."""
         self._unsubscribe_from_events()
         
-    def on_message(self, message):
-        if message == "study_saved":
-            print("Dashboard received study_saved. Reloading...")
-            self.reload_data()
-            if self.page:
+    def on_events(self, events):
+        # A burst (e.g. several sessions saved) arrives here as one call
+        print(f"Dashboard received {[ev.type.value for ev in events]}. Reloading...")
+        # Session events say which subjects changed, so the daily plan is
+        # patched; anything else (topic toggles) leaves today's times alone
+        session_types = (EventType.SESSION_ADDED, EventType.SESSION_DELETED, EventType.SESSION_EDITED)
+        changed = set()
+        for ev in events:
+            if ev.type in session_types:
+                if not ev.subject_ids:
+                    changed = None  # unknown subject: reallocate from scratch
+                    break
+                changed.update(ev.subject_ids)
+        self.reload_data(changed_subject_ids=changed)
+
+    def refresh_view_model(self, changed_subject_ids=None, always_render=False):
+        """
+        Query the live database, persist the result for the next start and
+        rebuild the controls (always, or only when the data changed).
+        Each refresh takes a generation number: one overtaken by a newer
+        refresh while querying (e.g. the startup reconcile vs. an event) is
+        dropped instead of overwriting the newer state.
+        Returns True when the controls were rebuilt.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            base = self.view_model
+        fresh = dashboard_snapshot.build_view_model(base, changed_subject_ids)
+        with self._lock:
+            if generation != self._generation:
+                return False
+            changed = not dashboard_snapshot.same_data(fresh, self.view_model)
+            self.view_model = fresh
+            if changed:
+                dashboard_snapshot.save_snapshot(fresh)
+            if changed or always_render:
+                self.build_ui(fresh)
+                return True
+        return False
+
+    def reconcile(self):
+        """Background check of the snapshot against the database."""
+        try:
+            if self.refresh_view_model() and self.page:
                 self.update()
+        except Exception as ex:
+            print(f"Dashboard reconcile failed: {ex}")
 
-    def build_ui(self):
+    def build_ui(self, vm):
         # Section 1: Top Stats
-        import src.data.crud as crud
-        stats = crud.get_dashboard_stats()
-        total_time_sec = stats['total_seconds'] if stats else 0
+        stats = vm['stats']
+        total_time_sec = stats['total_seconds']
         hours = int(total_time_sec // 3600)
         mins = int((total_time_sec % 3600) // 60)
         time_str = f"{hours}h{mins}min"
         
-        correct = stats['total_correct'] if stats else 0
-        wrong = stats['total_wrong'] if stats else 0
+        correct = stats['total_correct']
+        wrong = stats['total_wrong']
         total = correct + wrong
         pct = int((correct / total) * 100) if total > 0 else 0
         
+        topics_total = vm['topics']['total']
+        topics_done = vm['topics']['completed']
+        topics_progress = topics_done / topics_total if topics_total > 0 else 0
+        topics_subtext = f"{topics_total - topics_done} Tópicos Pendentes"
+        ready_on = vm['forecast']['ready_on']
+        if ready_on and topics_total > topics_done:
+            topics_subtext += f" · Previsão {format_datetime_display(ready_on, '%d/%m/%Y')}"
+        
         self.top_stats = ft.Row(
             controls=[
                 ft.Column(controls=[StatCard("Tempo de Estudo", time_str)]),
                 ft.Column(controls=[PerformanceCard("Desempenho", str(pct)+"%", correct, wrong)]),
-                ft.Column(controls=[StatCard("Progresso no Edital", "1%", subtext="542 Tópicos Pendentes", progress=0.01, color="#888")]),
+                ft.Column(controls=[StatCard("Progresso no Edital", f"{int(topics_progress * 100)}%", subtext=topics_subtext, progress=topics_progress, color="#888")]),
                 ft.Column(controls=[StatCard("Faça sua sorte!", "", subtext="", color=None)]), # Placeholder for quote
             ],
             spacing=20
@@ -77,7 +141,7 @@ class DashboardPage(ft.Container):
             content=ft.Column([
                 ft.Text("PLANEJAMENTO DO DIA", weight=ft.FontWeight.BOLD, size=12, color="grey"),
                 ft.Divider(height=10, color="transparent"),
-                self.build_todays_plan()
+                self.build_todays_plan(vm['plan'])
             ])
         )
         
@@ -91,10 +155,7 @@ class DashboardPage(ft.Container):
                     content=ft.Column([
                         ft.Text("REVISÕES", weight=ft.FontWeight.BOLD, size=12, color="grey"),
                         ft.Container(height=10),
-                        ft.Row([
-                            ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE, color="green"),
-                            ft.Text("Você não tem revisões para hoje!", size=12, expand=True)
-                        ], alignment=ft.MainAxisAlignment.CENTER)
+                        self.build_due_reviews(vm['reviews_due'])
                     ])
                 ),
                 # Reminders Block
@@ -106,7 +167,7 @@ class DashboardPage(ft.Container):
                              ft.IconButton(ft.Icons.ADD, icon_size=16, tooltip="Novo Lembrete", on_click=self.open_reminder_modal)
                          ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                          ft.Container(height=5),
-                         self.build_reminders_list()
+                         self.build_reminders_list(vm['reminders'])
                     ])
                 ),
                 # Recent Activity Block
@@ -114,7 +175,7 @@ class DashboardPage(ft.Container):
                     bgcolor="#1e1e2d", padding=20, border_radius=10,
                     content=ft.Column([
                         ft.Text("ÚLTIMAS ATIVIDADES", weight=ft.FontWeight.BOLD, size=12, color="grey"),
-                        self.build_recent_activity()
+                        self.build_recent_activity(vm['recent'])
                     ])
                 )
             ]
@@ -127,6 +188,8 @@ class DashboardPage(ft.Container):
                 ft.Container(height=10),
                 self.heatmap,
                 ft.Container(height=10),
+                StudyChart(data=vm['weekly']),
+                ft.Container(height=10),
                 ft.Row(
                     controls=[self.planning_section, self.sidebar_section],
                     vertical_alignment=ft.CrossAxisAlignment.START,
@@ -135,32 +198,33 @@ class DashboardPage(ft.Container):
             ]
         )
 
-    def reload_data(self):
-        self.build_ui()
-        if self.page:
+    def reload_data(self, changed_subject_ids=None):
+        if self.refresh_view_model(changed_subject_ids, always_render=True) and self.page:
             self.update()
         
-    def build_todays_plan(self):
-        # Reusing similar logic to old Subject Panel but simplified for "Today"
+    def build_todays_plan(self, plan):
         list_col = ft.Column(spacing=10)
-        import src.data.crud as crud
-        subjects = crud.get_all_subjects()
         
-        if not subjects:
+        if not plan['items']:
              return ft.Text("Nenhuma disciplina cadastrada.", color="grey")
+        if plan['available_seconds'] <= 0:
+             return ft.Text("Dia livre: nenhuma hora disponível para hoje.", color="grey")
              
-        for sub in subjects:
-            # Mock daily goal calculation (e.g. 2 hours per sub)
-            # Real logic would check if subject is in today's schedule
-            prog = 0.0
-            if sub['weight'] > 0: prog = 0.3 # Fake progress for demo
+        # Subjects with a goal first, biggest goal on top
+        items = sorted(plan['items'], key=lambda i: (-i['goal_seconds'], i['name']))
+        for item in items:
+            goal = item['goal_seconds']
+            studied = item['studied_seconds']
+            if goal <= 0 and studied <= 0:
+                continue
+            prog = min(1.0, studied / goal) if goal > 0 else 1.0
             
             list_col.controls.append(
                 ft.Container(
                     content=ft.Column([
                         ft.Row([
-                            ft.Text(sub['name'], size=12, weight=ft.FontWeight.BOLD, expand=True),
-                            ft.Text(f"0h00 / 2h00", size=10, color="grey") # Mock goal
+                            ft.Text(item['name'], size=12, weight=ft.FontWeight.BOLD, expand=True),
+                            ft.Text(f"{self.format_hm(studied)} / {self.format_hm(goal)}", size=10, color="grey")
                         ]),
                         ft.ProgressBar(value=prog, color=AppTheme.primary, bgcolor="#2c2d3e", height=5)
                     ])
@@ -168,9 +232,29 @@ class DashboardPage(ft.Container):
             )
         return list_col
 
-    def build_reminders_list(self):
-        import src.data.crud as crud
-        reminders = crud.get_reminders()
+    @staticmethod
+    def format_hm(seconds):
+        minutes = int(seconds) // 60
+        return f"{minutes // 60}h{minutes % 60:02d}"
+
+    def build_due_reviews(self, due):
+        if not due['items']:
+            return ft.Row([
+                ft.Icon(ft.Icons.CHECK_CIRCLE_OUTLINE, color="green"),
+                ft.Text("Você não tem revisões para hoje!", size=12, expand=True)
+            ], alignment=ft.MainAxisAlignment.CENTER)
+        
+        # Most urgent first (priority order from crud.get_due_reviews)
+        col = ft.Column(spacing=5)
+        col.controls.append(ft.Text(f"{due['count']} revisões atrasadas", size=12, color=AppTheme.secondary))
+        for r in due['items']:
+            col.controls.append(ft.Row([
+                ft.Icon(ft.Icons.REPLAY, size=12, color=AppTheme.primary),
+                ft.Text(r['content'], size=12, expand=True, no_wrap=True, tooltip=r['content'])
+            ]))
+        return col
+
+    def build_reminders_list(self, reminders):
         col = ft.Column(spacing=5)
         
         if not reminders:
@@ -201,9 +285,7 @@ class DashboardPage(ft.Container):
         crud.delete_reminder(rid)
         self.reload_data()
 
-    def build_recent_activity(self):
-        import src.data.crud as crud
-        sessions = crud.get_recent_sessions(3)
+    def build_recent_activity(self, sessions):
         if not sessions:
             return ft.Text("Nenhuma atividade recente.", size=12, color="grey")
             
@@ -2,7 +2,8 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
-from datetime import datetime
+from src.utils.events import bus, EventType
+from src.utils.date_utils import format_datetimes
 
 class HistoryPage(ft.Container):
     def __init__(self, page: ft.Page):
@@ -19,7 +20,17 @@ class HistoryPage(ft.Container):
 
         self.content = ft.Column(
             controls=[
-                ft.Text("Histórico de Estudos", size=30, weight=ft.FontWeight.BOLD, color="white"),
+                ft.Row([
+                    ft.Text("Histórico de Estudos", size=30, weight=ft.FontWeight.BOLD, color="white"),
+                    ft.Row([
+                        ft.OutlinedButton("Importar CSV", icon=ft.Icons.UPLOAD, on_click=self.open_import_modal,
+                                          style=ft.ButtonStyle(color=AppTheme.primary, side=ft.BorderSide(1, AppTheme.primary))),
+                        ft.OutlinedButton("Exportar", icon=ft.Icons.DOWNLOAD, on_click=self.open_export_modal,
+                                          style=ft.ButtonStyle(color=AppTheme.primary, side=ft.BorderSide(1, AppTheme.primary))),
+                        ft.OutlinedButton("Sincronizar", icon=ft.Icons.SYNC, on_click=self.open_sync_modal,
+                                          style=ft.ButtonStyle(color=AppTheme.primary, side=ft.BorderSide(1, AppTheme.primary)))
+                    ])
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Container(height=20),
                 self.indicators_row,
                 ft.Container(height=20),
@@ -31,6 +42,32 @@ class HistoryPage(ft.Container):
         )
         self.load_data()
 
+    def open_export_modal(self, e):
+        from src.components.export_modal import ExportModal
+        self.export_modal = ExportModal(self.page_ref)
+        self.page_ref.dialog = self.export_modal
+        self.export_modal.open = True
+        self.page_ref.update()
+
+    def open_import_modal(self, e):
+        from src.components.session_import_modal import SessionImportModal
+        self.import_modal = SessionImportModal(self.page_ref, on_import_success=self.reload)
+        self.page_ref.dialog = self.import_modal
+        self.import_modal.open = True
+        self.page_ref.update()
+
+    def open_sync_modal(self, e):
+        from src.components.sync_modal import SyncModal
+        self.sync_modal = SyncModal(self.page_ref, on_sync_done=self.reload)
+        self.page_ref.dialog = self.sync_modal
+        self.sync_modal.open = True
+        self.page_ref.update()
+
+    def reload(self):
+        self.load_data()
+        if self.page:
+            self.update()
+
     def load_data(self):
         self.update_indicators()
         self.load_history_list()
@@ -88,16 +125,12 @@ class HistoryPage(ft.Container):
         
         current_date = None
         
-        for s in sessions:
-            # Date Parsing
-            try:
-                dt = datetime.strptime(s['date'], "%Y-%m-%d %H:%M:%S")
-                date_str = dt.strftime("%d de %B, %Y")
-                time_str = dt.strftime("%H:%M")
-            except:
-                date_str = s['date']
-                time_str = ""
-                
+        # Convert the whole date column at once (cached per distinct value)
+        raw_dates = [s['date'] for s in sessions]
+        date_strs = format_datetimes(raw_dates, "%d de %B, %Y")
+        time_strs = format_datetimes(raw_dates, "%H:%M", fallback="")
+        
+        for s, date_str, time_str in zip(sessions, date_strs, time_strs):
             if date_str != current_date:
                 self.list_container.controls.append(ft.Container(
                     content=ft.Text(date_str, weight=ft.FontWeight.BOLD, color=AppTheme.primary),
@@ -130,8 +163,12 @@ class HistoryPage(ft.Container):
             ))
 
     def delete_session(self, sid):
-        crud.db.execute_query("DELETE FROM study_sessions WHERE id = ?", (sid,))
+        from src.components.undo_snackbar import show_undo_snackbar
+        crud.delete_study_session(sid)
+        bus.publish(EventType.SESSION_DELETED, ids=[sid])
         self.load_data()
+        if self.page: self.update()
+        show_undo_snackbar(self.page_ref, "Sessão excluída.", on_undone=self.reload)
 
 def get_history_page(page):
     return HistoryPage(page)
@@ -2,6 +2,8 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
+from src.data.toggle_queue import toggle_queue
+from src.data.forecast import forecast
 
 class PlanDetailsPage(ft.Container):
     def __init__(self, page: ft.Page, plan_id):
@@ -12,6 +14,8 @@ class PlanDetailsPage(ft.Container):
         self.padding = 30
         self.plan_data = None
         self.subjects_data = []
+        self.topic_progress = {}  # subject_id -> [completed, total], patched on toggle
+        self.subject_subtitles = {}  # subject_id -> "done/total" Text in the syllabus tab
         
         self.build_ui()
 
@@ -74,12 +78,14 @@ class PlanDetailsPage(ft.Container):
         self.update()
 
     def load_data(self):
+        toggle_queue.flush()  # Read our own pending toggles back
         self.plan_data = crud.get_plan_by_id(self.plan_id)
         if not self.plan_data:
             self.content = ft.Text("Plano não encontrado.")
             return
 
         self.subjects_data = crud.get_subjects_by_plan(self.plan_id)
+        self.topic_progress = {s['id']: [s['completed_topics'], s['total_topics']] for s in self.subjects_data}
         
         self.update_header()
         self.update_summary()
@@ -96,44 +102,68 @@ class PlanDetailsPage(ft.Container):
             self.syllabus_content.controls.append(ft.Text("Nenhuma disciplina cadastrada.", color="grey"))
             return
 
+        # One query for the whole plan; topic rows are only built when a subject is expanded
+        toggle_queue.flush()
+        self.syllabus_topics = crud.get_topics_by_plan(self.plan_id)
+        self.subject_subtitles = {}
+        # Keep subjects that were open before a refresh (e.g. after editing a link) open
+        previously_expanded = getattr(self, "expanded_subjects", set())
+        self.expanded_subjects = set()
+
         for subject in self.subjects_data:
-            topics = crud.get_topics_by_subject(subject['id'])
-            if not topics: continue # Skip empty subjects? Or show header? Show header.
+            topics = self.syllabus_topics.get(subject['id'])
+            if not topics: continue # Skip empty subjects
             
-            # Subject Header
+            done = sum(1 for t in topics if t['completed'] == 1)
             color = subject['color'] or AppTheme.primary
-            self.syllabus_content.controls.append(
-                ft.Container(
-                    content=ft.Row([
-                        ft.Container(width=5, height=20, bgcolor=color),
-                        ft.Text(subject['name'], size=16, weight=ft.FontWeight.BOLD, color="white")
-                    ]),
-                    padding=ft.padding.only(top=20, bottom=10)
-                )
+            expanded = subject['id'] in previously_expanded
+            tile = ft.ExpansionTile(
+                leading=ft.Container(width=5, height=20, bgcolor=color),
+                title=ft.Text(subject['name'], size=16, weight=ft.FontWeight.BOLD, color="white"),
+                subtitle=self.subject_subtitles.setdefault(subject['id'], ft.Text(f"{done}/{len(topics)} tópicos", size=12, color="grey")),
+                controls=[self.create_syllabus_row(t) for t in topics] if expanded else [],
+                initially_expanded=expanded,
+                maintain_state=True,
             )
-            
-            # Topics List
-            for t in topics:
-                link = t['material_link'] if 'material_link' in t.keys() else ""
-                
-                row = ft.Row([
-                    ft.Checkbox(value=(t['completed']==1), on_change=lambda e, tid=t['id']: self.toggle_topic(tid, e.control.value)),
-                    ft.Text(t['title'], expand=True, size=14, color="white"),
-                    ft.IconButton(
-                        ft.Icons.LINK, 
-                        icon_color="blue" if link else "grey", 
-                        tooltip=link or "Adicionar Link", 
-                        on_click=lambda e, tid=t['id'], l=link: self.edit_link(tid, l)
-                    )
-                ])
-                self.syllabus_content.controls.append(ft.Container(content=row, bgcolor="#333", border_radius=5, padding=5, margin=ft.margin.only(bottom=5)))
+            if expanded:
+                self.expanded_subjects.add(subject['id'])
+            tile.on_change = lambda e, sid=subject['id'], tl=tile: self.on_subject_expand(e, sid, tl)
+            self.syllabus_content.controls.append(tile)
+
+        if self.page: self.syllabus_content.update()
 
-        self.syllabus_content.update()
+    def on_subject_expand(self, e, subject_id, tile):
+        if e.data != "true" or subject_id in self.expanded_subjects:
+            return
+        self.expanded_subjects.add(subject_id)
+        tile.controls = [self.create_syllabus_row(t) for t in self.syllabus_topics.get(subject_id, [])]
+        tile.update()
 
-    def toggle_topic(self, tid, val):
-        crud.toggle_topic_complete(tid, val)
-        # We don't need full reload, but summary stats will be outdated in Tab 0.
-        # It's fine for now, or we can trigger self.update_summary() in background.
+    def create_syllabus_row(self, t):
+        link = t['material_link'] if 'material_link' in t.keys() else ""
+        
+        row = ft.Row([
+            ft.Checkbox(value=(t['completed']==1), on_change=lambda e, tid=t['id'], sid=t['subject_id']: self.toggle_topic(tid, sid, e.control.value)),
+            ft.Text(t['title'], expand=True, size=14, color="white"),
+            ft.IconButton(
+                ft.Icons.LINK, 
+                icon_color="blue" if link else "grey", 
+                tooltip=link or "Adicionar Link", 
+                on_click=lambda e, tid=t['id'], l=link: self.edit_link(tid, l)
+            )
+        ])
+        return ft.Container(content=row, bgcolor="#333", border_radius=5, padding=5, margin=ft.margin.only(bottom=5))
+
+    def toggle_topic(self, tid, sid, val):
+        # Optimistic: the write is queued and batched, counters are patched in memory
+        toggle_queue.toggle(tid, val, previous=not val)
+        progress = self.topic_progress.get(sid)
+        if progress:
+            progress[0] += 1 if val else -1
+            subtitle = self.subject_subtitles.get(sid)
+            if subtitle:
+                subtitle.value = f"{progress[0]}/{progress[1]} tópicos"
+                subtitle.update()
         self.update_summary() # Update stats in case user switches back
 
     def edit_link(self, tid, current_link):
@@ -164,19 +194,29 @@ class PlanDetailsPage(ft.Container):
     def update_summary(self):
         # Calculate totals
         total_subs = len(self.subjects_data)
-        total_topics = sum(s['total_topics'] for s in self.subjects_data)
-        completed_topics = sum(s['completed_topics'] for s in self.subjects_data)
+        total_topics = sum(total for _, total in self.topic_progress.values())
+        completed_topics = sum(done for done, _ in self.topic_progress.values())
         
         # Determine stats (mocked or calculated if we had study sessions linked to plan)
         # For now, let's use subject aggregate data
         
         pct = int((completed_topics / total_topics * 100)) if total_topics > 0 else 0
         
+        # Readiness date from the recent completion pace of this plan's subjects
+        outlook = forecast.forecast(self.topic_progress.keys())
+        if total_topics and completed_topics >= total_topics:
+            ready = "Concluído"
+        elif outlook.ready_on:
+            ready = outlook.ready_on.strftime("%d/%m/%Y")
+        else:
+            ready = "Sem ritmo"
+        
         self.summary_container.content = ft.Row(
             controls=[
                 self.create_stat_card("Disciplinas", str(total_subs), ft.Icons.BOOK),
                 self.create_stat_card("Tópicos", f"{completed_topics}/{total_topics}", ft.Icons.LIST),
                 self.create_stat_card("Progresso Estimado", f"{pct}%", ft.Icons.PERCENT),
+                self.create_stat_card("Previsão de Conclusão", ready, ft.Icons.EVENT_AVAILABLE),
             ],
             spacing=20
         )
@@ -2,6 +2,8 @@
 import flet as ft
 from src.theme import AppTheme
 from src.components.session_dialog import SessionDialog
+import src.data.crud as crud
+from src.utils.study_cycle import WIZARD_DAYS
 
 class PlanningPage(ft.Container):
     def __init__(self, page, start_timer_callback):
@@ -14,21 +16,32 @@ class PlanningPage(ft.Container):
         # Session Dialog
         self.session_dialog = SessionDialog(page, on_start_timer=self.start_timer_callback)
 
-        # Mock Planning Columns
-        self.columns = []
+        self.build_ui()
+
+    def build_ui(self):
+        """One column per weekday (SEG..DOM) from the persisted study cycle."""
+        by_day = {}
+        for slot in crud.get_study_cycle():
+            by_day.setdefault(slot['weekday'], []).append(slot)
+        
+        header = ft.Row([
+            ft.Text("Planejamento Semanal", size=24, weight=ft.FontWeight.BOLD, color="white"),
+            ft.ElevatedButton("Editar Planejamento", icon=ft.Icons.EDIT_CALENDAR, on_click=self.open_wizard,
+                              bgcolor=AppTheme.primary, color="white")
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
         
-        # Mock Data for Columns
-        planning_data = [
-            ("Controle Externo", "#ff8a80"), # Red/Pink
-            ("Direito Constitucional", "#ffe57f"), # Yellow
-            ("Direito Civil", "#9fa8da"), # Blue
-            ("Direito Penal", "#bcaaa4"), # Brown
-            ("Raciocínio Lógico", "#a5d6a7"), # Green
-        ]
+        if not by_day:
+            self.content = ft.Column([
+                header,
+                ft.Text("Nenhum ciclo de estudos gerado. Use 'Editar Planejamento' para criar o seu.", color="grey")
+            ])
+            return
         
         row_controls = []
-        for title, color in planning_data:
-            # Create a vertical column for each category
+        # Week starts on Monday in the board, Sunday last
+        for label, weekday in WIZARD_DAYS[1:] + WIZARD_DAYS[:1]:
+            slots = by_day.get(weekday, [])
+            total = sum(s['duration_minutes'] for s in slots)
             row_controls.append(
                 ft.Container(
                     width=150,
@@ -36,19 +49,35 @@ class PlanningPage(ft.Container):
                     border_radius=10,
                     padding=10,
                     content=ft.Column([
-                        ft.Text(title, size=10, weight=ft.FontWeight.BOLD, color="white"),
+                        ft.Text(f"{label} · {self._format_minutes(total)}", size=10, weight=ft.FontWeight.BOLD, color="white"),
                         ft.Divider(color=AppTheme.background),
-                        self._create_card(title, "2h00min", color),
-                        self._create_card(title, "1h30min", color),
+                        *[self._create_card(s['name'], self._format_minutes(s['duration_minutes']), s['color']) for s in slots],
                     ])
                 )
             )
 
         self.content = ft.Column([
-            ft.Text("Planejamento Semanal", size=24, weight=ft.FontWeight.BOLD, color="white"),
+            header,
             ft.Row(controls=row_controls, scroll=ft.ScrollMode.AUTO, alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.START)
         ])
 
+    @staticmethod
+    def _format_minutes(minutes):
+        return f"{minutes // 60}h{minutes % 60:02d}min"
+
+    def open_wizard(self, e):
+        from src.components.planning_wizard import PlanningWizard
+        self.wizard = PlanningWizard(self.page_ref, on_save=self.reload)
+        if self.page_ref:
+            self.page_ref.dialog = self.wizard
+            self.wizard.open = True
+            self.page_ref.update()
+
+    def reload(self):
+        self.build_ui()
+        if self.page:
+            self.update()
+
     def _create_card(self, title, time, color):
         """Create a card with proper closure capture."""
         return ft.Container(
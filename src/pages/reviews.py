@@ -1,15 +1,22 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
-from datetime import datetime
+from src.utils.date_utils import format_datetimes
+from src.utils.spaced_repetition import REVIEW_GRADES
+from datetime import datetime, timedelta
 
 class ReviewsPage(ft.Container):
+    PAGE_SIZE = 30
+
     def __init__(self, page: ft.Page):
         super().__init__()
         self.page_ref = page
         self.expand = True
         self.padding = 30
         self.selected_tab = "PROGRAMADAS"
+        self.window_days = None  # None = no date window
+        self.counts = {}
+        self.loaded = 0
         
         self.build_ui()
 
@@ -32,7 +39,16 @@ class ReviewsPage(ft.Container):
                 ft.Text("Revisões", size=30, weight=ft.FontWeight.BOLD, color="white"),
                 ft.Row([
                     ft.ElevatedButton("Nova Revisão", bgcolor=AppTheme.primary, color="white", on_click=self.open_add_modal),
-                    ft.OutlinedButton("Filtros", icon=ft.Icons.FILTER_LIST),
+                    ft.Dropdown(
+                        label="Período", width=170, text_size=12, height=45, content_padding=5,
+                        value="all",
+                        options=[
+                            ft.dropdown.Option("all", "Todas"),
+                            ft.dropdown.Option("7", "± 7 dias"),
+                            ft.dropdown.Option("30", "± 30 dias"),
+                        ],
+                        on_change=self.on_window_change
+                    ),
                 ])
             ],
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN
@@ -48,56 +64,29 @@ class ReviewsPage(ft.Container):
         return self.list_container
 
     def load_data(self):
-        reviews = crud.get_reviews() # returns list of dicts
-        
-        programadas = []
-        atrasadas = []
-        concluidas = []
-        ignoradas = []
-        
-        now = datetime.now()
-        
-        for r in reviews:
-            # Check if status exists, else fallback to is_completed
-            # In fresh DB it's status. logic:
-            status = r['status'] if 'status' in r.keys() and r['status'] is not None else (1 if r.get('is_completed') else 0)
-            
-            # Parse date - try multiple formats
-            try:
-                dt_obj = datetime.strptime(r['date_time'], "%Y-%m-%d %H:%M:%S")
-            except (ValueError, TypeError):
-                try:
-                    dt_obj = datetime.strptime(r['date_time'], "%d/%m/%Y %H:%M")
-                except (ValueError, TypeError):
-                    dt_obj = now
-            
-            if status == 1:
-                concluidas.append(r)
-            elif status == 2:
-                ignoradas.append(r)
-            elif dt_obj < now:
-                atrasadas.append(r)
-            else:
-                programadas.append(r)
-                
-        self.counts = {
-            "PROGRAMADAS": len(programadas),
-            "ATRASADAS": len(atrasadas),
-            "CONCLUÍDAS": len(concluidas),
-            "IGNORADAS": len(ignoradas)
-        }
-        
-        self.data_map = {
-            "PROGRAMADAS": programadas,
-            "ATRASADAS": atrasadas,
-            "CONCLUÍDAS": concluidas,
-            "IGNORADAS": ignoradas
-        }
-        
+        # Tab badges: one aggregate query; the list: one page of the selected tab
+        self.counts = crud.get_review_counts(**self.window_bounds(datetime.now()))
         self.update_tabs_ui()
         self.update_list_ui()
         # Note: Don't call self.update() here - control may not be mounted yet
 
+    def on_window_change(self, e):
+        value = e.control.value
+        self.window_days = int(value) if value and value != "all" else None
+        self.load_data()
+        if self.page: self.update()
+
+    def window_bounds(self, now):
+        """now/start/end of the Período window, shared by the badges and the list."""
+        if not self.window_days:
+            return {"now": now}
+        return {"now": now, "start": now - timedelta(days=self.window_days),
+                "end": now + timedelta(days=self.window_days)}
+
+    def fetch_page(self, offset):
+        return crud.get_reviews_page(self.selected_tab, limit=self.PAGE_SIZE, offset=offset,
+                                     **self.window_bounds(datetime.now()))
+
     def update_tabs_ui(self):
         tabs = ["PROGRAMADAS", "ATRASADAS", "IGNORADAS", "CONCLUÍDAS"]
         self.tabs_container.controls = []
@@ -138,7 +127,8 @@ class ReviewsPage(ft.Container):
 
     def update_list_ui(self):
         self.list_container.controls = []
-        items = self.data_map.get(self.selected_tab, [])
+        self.loaded = 0
+        items = self.fetch_page(0)
         
         if not items:
             msg = f"Nenhuma revisão em '{self.selected_tab}'."
@@ -146,16 +136,38 @@ class ReviewsPage(ft.Container):
                 msg = "Legal, você não tem revisões atrasadas! ✅"
             self.list_container.controls.append(self.build_empty_state(msg))
         else:
-            for item in items:
-                self.list_container.controls.append(self.create_review_tile(item))
+            self.append_items(items)
 
-    def create_review_tile(self, item):
+    def append_items(self, items):
+        dates = format_datetimes([item['date_time'] for item in items])
+        for item, date_str in zip(items, dates):
+            self.list_container.controls.append(self.create_review_tile(item, date_str))
+        self.loaded += len(items)
+        
+        if len(items) == self.PAGE_SIZE:
+            self.list_container.controls.append(
+                ft.TextButton("Carregar mais", icon=ft.Icons.EXPAND_MORE, on_click=self.load_more)
+            )
+
+    def load_more(self, e):
+        self.list_container.controls.remove(e.control)
+        self.append_items(self.fetch_page(self.loaded))
+        self.list_container.update()
+
+    def create_review_tile(self, item, date_str):
         # item: id, content, date_time, status
-        status = item['status'] if 'status' in item.keys() and item['status'] is not None else (1 if item.get('is_completed') else 0)
+        status = item['status'] or 0
         
         actions = []
         if status == 0: # Pending/Late
-            actions.append(ft.IconButton(ft.Icons.CHECK_CIRCLE_OUTLINE, icon_color="grey", tooltip="Concluir", on_click=lambda e: self.set_status(item['id'], 1)))
+            # Finishing asks how it went, so a forgotten topic comes back sooner
+            actions.append(ft.PopupMenuButton(
+                icon=ft.Icons.CHECK_CIRCLE_OUTLINE, icon_color="grey", tooltip="Concluir",
+                items=[
+                    ft.PopupMenuItem(text=label, on_click=lambda e, q=quality: self.set_status(item['id'], 1, q))
+                    for label, quality in REVIEW_GRADES
+                ],
+            ))
             actions.append(ft.IconButton(ft.Icons.DO_NOT_DISTURB, icon_color="grey", tooltip="Ignorar", on_click=lambda e: self.set_status(item['id'], 2)))
         elif status == 1: # Done
             actions.append(ft.IconButton(ft.Icons.CHECK_CIRCLE, icon_color="green", tooltip="Reabrir", on_click=lambda e: self.set_status(item['id'], 0)))
@@ -169,16 +181,22 @@ class ReviewsPage(ft.Container):
             margin=ft.margin.only(bottom=10),
             content=ft.Row([
                 ft.Column([
-                    ft.Text(item['date_time'], size=10, color="grey"),
+                    ft.Text(date_str, size=10, color="grey"),
                     ft.Text(item['content'], size=14, weight=ft.FontWeight.BOLD, color="white")
                 ], expand=True),
                 ft.Row(actions, spacing=0)
             ])
         )
 
-    def set_status(self, rid, status):
-        crud.update_reminder_status(rid, status)
+    def set_status(self, rid, status, quality=None):
+        if status == 1:
+            crud.complete_review(rid, quality)  # Also schedules the next repetition
+        elif status == 2:
+            crud.ignore_review(rid)  # Also restarts the topic's review cycle
+        else:
+            crud.update_reminder_status(rid, status)
         self.load_data()
+        if self.page: self.update()
 
     def build_empty_state(self, msg):
         return ft.Column(
@@ -2,7 +2,10 @@
 import flet as ft
 from src.theme import AppTheme
 import src.data.crud as crud
-from datetime import datetime
+from src.data.toggle_queue import toggle_queue
+from src.utils.events import bus, EventType
+from src.utils.date_utils import format_datetimes
+from src.utils.topic_tree import SEGMENT_WIDTH, path_depth
 
 class SubjectDetailsPage(ft.Container):
     def __init__(self, page: ft.Page, subject_id, plan_id=None):
@@ -56,10 +59,14 @@ class SubjectDetailsPage(ft.Container):
         # Fetch Subject Info
         # Need a crud for get_subject_by_id. 
         # Using direct query placeholder or generic fetch
+        toggle_queue.flush()  # Read our own pending toggles back
         self.subject_data = crud.db.fetch_one("SELECT * FROM subjects WHERE id = ?", (self.subject_id,))
         if not self.subject_data:
             self.content = ft.Text("Disciplina não encontrada.")
             return
+        # Topic counters are patched in memory on toggle
+        self.topics_done = self.subject_data['completed_topics']
+        self.topics_total = self.subject_data['total_topics']
 
         self.update_header()
         self.update_indicators()
@@ -102,18 +109,17 @@ class SubjectDetailsPage(ft.Container):
         pages_read = stats['total_pages'] if stats else 0
         pages_per_hour = int(pages_read / total_hours) if total_hours > 0 else 0
         
-        # Topics
-        topics_done = self.subject_data['completed_topics']
-        topics_total = self.subject_data['total_topics']
-        topics_pct = int(topics_done / topics_total * 100) if topics_total > 0 else 0
-
         self.indicators_row.controls = [
             self.create_indicator(f"{total_hours:.1f}h", "Tempo Estudado", ft.Icons.ACCESS_TIME),
             self.create_indicator(f"{pct}%", f"{correct}C / {wrong}E", ft.Icons.PIE_CHART),
-            self.create_indicator(f"{topics_pct}%", f"{topics_done}/{topics_total} Tópicos", ft.Icons.CHECK_CIRCLE),
+            self.create_topics_indicator(),
             self.create_indicator(f"{pages_read}", f"{pages_per_hour} pág/h", ft.Icons.BOOK),
         ]
 
+    def create_topics_indicator(self):
+        topics_pct = int(self.topics_done / self.topics_total * 100) if self.topics_total > 0 else 0
+        return self.create_indicator(f"{topics_pct}%", f"{self.topics_done}/{self.topics_total} Tópicos", ft.Icons.CHECK_CIRCLE)
+
     def create_indicator(self, value, label, icon):
         return ft.Container(
             bgcolor="#2c2d3e",
@@ -156,13 +162,8 @@ class SubjectDetailsPage(ft.Container):
             ft.Text("Ações", width=80, color="grey", weight=ft.FontWeight.BOLD),
         ]))
         
-        for s in sessions:
-            # Parse date
-            try:
-                dt_str = datetime.strptime(s['date'], "%Y-%m-%d %H:%M:%S").strftime("%d/%m %H:%M")
-            except:
-                dt_str = s['date']
-            
+        date_strs = format_datetimes([s['date'] for s in sessions], "%d/%m %H:%M")
+        for s, dt_str in zip(sessions, date_strs):
             # Duration
             h = s['duration_seconds'] // 3600
             m = (s['duration_seconds'] % 3600) // 60
@@ -188,32 +189,63 @@ class SubjectDetailsPage(ft.Container):
         return lv
 
     def delete_session(self, sid):
-        crud.db.execute_query("DELETE FROM study_sessions WHERE id = ?", (sid,))
+        from src.components.undo_snackbar import show_undo_snackbar
+        crud.delete_study_session(sid)
+        bus.publish(EventType.SESSION_DELETED, ids=[sid], subject_ids=[self.subject_id])
         self.load_data() # Refresh
+        if self.page: self.update()
+        show_undo_snackbar(self.page_ref, "Sessão excluída.", on_undone=self.reload_after_undo)
+
+    def reload_after_undo(self):
+        self.load_data()
+        if self.page: self.update()
 
     def build_syllabus_list(self):
+        toggle_queue.flush()
         topics = crud.get_topics_by_subject(self.subject_id)
         if not topics:
             return ft.Text("Nenhum tópico cadastrado (Use o editor no painel do plano).", color="grey")
             
+        # Sections of an imported edital show how much of them is done
+        self.section_progress = {
+            section: [done, total] for section, (total, done) in crud.get_section_progress(self.subject_id).items()
+        }
+        self.section_labels = {}
+        
         lv = ft.ListView(expand=True, spacing=5)
         for t in topics:
             link = t['material_link'] if 'material_link' in t.keys() else ""
+            path = t['path']
+            section = path[:SEGMENT_WIDTH] if path else None
             
-            row = ft.Row([
-                ft.Checkbox(value=(t['completed']==1), on_change=lambda e, tid=t['id']: self.toggle_topic(tid, e.control.value)),
-                ft.Text(t['title'], expand=True, size=14),
-                ft.IconButton(ft.Icons.LINK, icon_color="blue" if link else "grey", tooltip=link or "Adicionar Link", on_click=lambda e, tid=t['id'], l=link: self.edit_link(tid, l))
-            ])
-            lv.controls.append(ft.Container(content=row, bgcolor="#333", border_radius=5, padding=5))
+            controls = [
+                ft.Container(width=20 * path_depth(path)),
+                ft.Checkbox(value=(t['completed']==1), on_change=lambda e, tid=t['id'], sec=section: self.toggle_topic(tid, e.control.value, sec)),
+                ft.Text(t['title'], expand=True, size=14, weight=ft.FontWeight.BOLD if path and path == section else None),
+            ]
+            progress = self.section_progress.get(path) if path == section else None
+            if progress and progress[1] > 1:
+                label = ft.Text(f"{progress[0]}/{progress[1]}", size=12, color="grey")
+                self.section_labels[section] = label
+                controls.append(label)
+            controls.append(ft.IconButton(ft.Icons.LINK, icon_color="blue" if link else "grey", tooltip=link or "Adicionar Link", on_click=lambda e, tid=t['id'], l=link: self.edit_link(tid, l)))
+            lv.controls.append(ft.Container(content=ft.Row(controls), bgcolor="#333", border_radius=5, padding=5))
             
         return lv
 
-    def toggle_topic(self, tid, val):
-        crud.toggle_topic_complete(tid, val)
-        # Refresh header stats only? Or full reload? Full reload easier.
-        self.update_indicators() # Needed
+    def toggle_topic(self, tid, val, section=None):
+        # Optimistic: the write is queued and batched, only the topics card is redrawn
+        toggle_queue.toggle(tid, val, previous=not val)
+        self.topics_done += 1 if val else -1
+        self.indicators_row.controls[2] = self.create_topics_indicator()
         if self.page: self.indicators_row.update()
+        
+        label = self.section_labels.get(section)
+        if label:
+            progress = self.section_progress[section]
+            progress[0] += 1 if val else -1
+            label.value = f"{progress[0]}/{progress[1]}"
+            label.update()
 
     def edit_link(self, tid, current_link):
         # Allow editing link via simple dialog
@@ -1,18 +1,32 @@
 
 import flet as ft
 from src.theme import AppTheme
+from src.data.toggle_queue import toggle_queue
 
 
 from src.components.import_modal import ImportSyllabusModal
 
 class SubjectsPage(ft.Container):
+    PAGE_SIZE = 50
+
     def __init__(self, page: ft.Page):
         super().__init__()
         self.page_ref = page
         self.padding = 30
         self.expand = True
         
+        # Edital list state (filter/sort/pagination happen in SQL)
+        self.filter_subject_id = None
+        self.sort_key = "edital"
+        self.offset = 0
+        self.total_topics = 0
+        self.topic_rows = {}  # topic_id -> title Text, for incremental updates
+        self.progress_done = 0
+        self.progress_total = 0
+        
         # --- Top Header Stats ---
+        self.progress_label = ft.Text("", size=10, color="#FF6E40")
+        self.progress_value = ft.Text("", size=24, color="white")
         self.header = ft.Container(
             bgcolor=AppTheme.surface,
             padding=20,
@@ -21,7 +35,7 @@ class SubjectsPage(ft.Container):
                 controls=[
                     ft.Column([ft.Text("TEMPO DE ESTUDO", size=10, weight=ft.FontWeight.BOLD, color="white"), ft.Text("2h55min", size=24, color="white")]),
                     ft.Column([ft.Text("DESEMPENHO", size=10, weight=ft.FontWeight.BOLD, color="white"), ft.Row([ft.Text("42 Acertos", size=10, color="green"), ft.Text("37 Erros", size=10, color="red")]), ft.Text("53%", size=24, color="white")]),
-                    ft.Column([ft.Text("PROGRESSO NO EDITAL", size=10, weight=ft.FontWeight.BOLD, color="white"), ft.Text("1 Tópicos Concluidos", size=10, color="#FF6E40"), ft.Text("3%", size=24, color="white")]),
+                    ft.Column([ft.Text("PROGRESSO NO EDITAL", size=10, weight=ft.FontWeight.BOLD, color="white"), self.progress_label, self.progress_value]),
                     ft.Column([ft.Text("PÁGINAS LIDAS", size=10, weight=ft.FontWeight.BOLD, color="white"), ft.Text("12.0 páginas por hora", size=10, color="grey"), ft.Text("24", size=24, color="white")]),
                 ],
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN
@@ -51,8 +65,24 @@ class SubjectsPage(ft.Container):
         # --- Edital Verticalizado (Detailed Topic List) ---
         self.topic_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
         
-        # Load subjects dropdown to filter topics (Mock for now, just load all first subject?)
-        # For prototype, let's load all topics from DB if any, or show "No topics" message
+        self.subject_filter = ft.Dropdown(
+            label="Disciplina", width=280, text_size=12, height=45, content_padding=5,
+            on_change=self.on_filter_change
+        )
+        self.sort_dropdown = ft.Dropdown(
+            label="Ordenar por", width=200, text_size=12, height=45, content_padding=5,
+            value="edital",
+            options=[
+                ft.dropdown.Option("edital", "Ordem do edital"),
+                ft.dropdown.Option("title", "Título"),
+                ft.dropdown.Option("pending", "Pendentes primeiro"),
+            ],
+            on_change=self.on_sort_change
+        )
+        self.page_label = ft.Text("", size=12, color="grey")
+        self.btn_prev = ft.IconButton(ft.Icons.CHEVRON_LEFT, icon_color="white", on_click=lambda e: self.change_page(-1))
+        self.btn_next = ft.IconButton(ft.Icons.CHEVRON_RIGHT, icon_color="white", on_click=lambda e: self.change_page(1))
+        self.load_subject_filter()
         
         self.topics_section = ft.Container(
             bgcolor=AppTheme.surface, padding=20, border_radius=10, margin=ft.margin.only(top=20),
@@ -65,12 +95,14 @@ class SubjectsPage(ft.Container):
                                       on_click=self.open_import_modal),
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Container(height=10),
+                ft.Row([self.subject_filter, self.sort_dropdown], spacing=10),
                 ft.Row([
                     ft.Text("Tópicos", expand=1, color="grey"),
                     ft.Text("Status", width=60, color="grey"),
                 ]),
                  ft.Divider(color=AppTheme.background),
-                 self.topic_list
+                 self.topic_list,
+                 ft.Row([self.btn_prev, self.page_label, self.btn_next], alignment=ft.MainAxisAlignment.CENTER)
             ])
         )
         
@@ -86,58 +118,123 @@ class SubjectsPage(ft.Container):
         self.load_topics()
 
     def open_import_modal(self, e):
-        modal = ImportSyllabusModal(self.page_ref, on_import_success=self.load_topics)
+        modal = ImportSyllabusModal(self.page_ref, on_import_success=self.reload_topics)
         self.page_ref.dialog = modal
         modal.open = True
         self.page_ref.update()
 
+    def load_subject_filter(self):
+        import src.data.crud as crud
+        subjects = crud.get_all_subjects()
+        self.subject_filter.options = [ft.dropdown.Option("all", "Todas as disciplinas")] + [
+            ft.dropdown.Option(str(s['id']), s['name']) for s in subjects
+        ]
+        self.subject_filter.value = str(self.filter_subject_id) if self.filter_subject_id else "all"
+
+    def on_filter_change(self, e):
+        value = self.subject_filter.value
+        self.filter_subject_id = int(value) if value and value != "all" else None
+        self.offset = 0
+        self.load_topics()
+
+    def on_sort_change(self, e):
+        self.sort_key = self.sort_dropdown.value or "edital"
+        self.offset = 0
+        self.load_topics()
+
+    def change_page(self, direction):
+        new_offset = self.offset + direction * self.PAGE_SIZE
+        if 0 <= new_offset < self.total_topics:
+            self.offset = new_offset
+            self.load_topics()
+
+    def reload_topics(self):
+        """Full refresh (after an import)."""
+        self.load_subject_filter()
+        self.offset = 0
+        self.load_topics()
+
+    def load_progress(self):
+        import src.data.crud as crud
+        if self.filter_subject_id:
+            sub = crud.get_subject_by_id(self.filter_subject_id)
+            self.progress_total = sub['total_topics'] if sub else 0
+            self.progress_done = sub['completed_topics'] if sub else 0
+        else:
+            stats = crud.get_topics_stats()
+            self.progress_total = stats['total_topics'] if stats else 0
+            self.progress_done = stats['completed_topics'] if stats else 0
+        self.render_progress()
+
+    def render_progress(self):
+        pct = int(self.progress_done / self.progress_total * 100) if self.progress_total > 0 else 0
+        self.progress_label.value = f"{self.progress_done} Tópicos Concluídos"
+        self.progress_value.value = f"{pct}%"
+
     def load_topics(self):
         import src.data.crud as crud
+        toggle_queue.flush()  # Read our own pending toggles back
         self.topic_list.controls.clear()
+        self.topic_rows = {}
         
-        # Heuristic: just load from first subject that has topics, or all
-        # To make it simple, let's just query ALL topics from the first subject found?
-        subjects = crud.get_all_subjects()
-        if not subjects: return
-        
-        # Try to find one with topics
-        target_sub = subjects[0]
-        topics = crud.get_topics_by_subject(target_sub['id'])
-        
-        # If no topics, try others
-        if not topics:
-             for s in subjects:
-                 t = crud.get_topics_by_subject(s['id'])
-                 if t:
-                     topics = t
-                     target_sub = s
-                     break
+        topics, self.total_topics = crud.get_topics_page(
+            subject_id=self.filter_subject_id, sort=self.sort_key,
+            limit=self.PAGE_SIZE, offset=self.offset
+        )
+        if not topics and self.offset > 0:
+            # Page vanished (e.g. filter changed the total): go back to the start
+            self.offset = 0
+            topics, self.total_topics = crud.get_topics_page(
+                subject_id=self.filter_subject_id, sort=self.sort_key, limit=self.PAGE_SIZE
+            )
         
         if topics:
-             self.topic_list.controls.append(ft.Text(f"Disciplina: {target_sub['name']}", color=AppTheme.primary, size=14, weight=ft.FontWeight.BOLD))
+             current_subject = None
              for t in topics:
+                 # Subject headers only make sense when rows are grouped by subject
+                 if self.sort_key != "title" and t['subject_id'] != current_subject:
+                     current_subject = t['subject_id']
+                     self.topic_list.controls.append(ft.Text(f"Disciplina: {t['subject_name']}", color=AppTheme.primary, size=14, weight=ft.FontWeight.BOLD))
                  self.topic_list.controls.append(
                      self.create_topic_row_db(t['id'], t['title'], t['completed'])
                  )
         else:
              self.topic_list.controls.append(ft.Text("Nenhum tópico encontrado. Importe um edital.", color="grey"))
+        
+        pages = max(1, -(-self.total_topics // self.PAGE_SIZE))
+        self.page_label.value = f"Página {self.offset // self.PAGE_SIZE + 1} de {pages}"
+        self.btn_prev.disabled = self.offset == 0
+        self.btn_next.disabled = self.offset + self.PAGE_SIZE >= self.total_topics
+        self.load_progress()
              
-        self.page_ref.update()
+        if self.page: self.update()
 
     def create_topic_row_db(self, t_id, title, completed):
-        import src.data.crud as crud
+        title_text = ft.Text(title, expand=1, size=12, color="white" if not completed else "grey")
+        self.topic_rows[t_id] = title_text
+
         def toggle(e):
-            crud.toggle_topic_complete(t_id, e.control.value)
-            print(f"Topic {t_id} toggled: {e.control.value}")
+            toggle_queue.toggle(t_id, e.control.value, previous=not e.control.value)
+            self.on_topic_toggled(t_id, e.control.value)
             
         return ft.Container(
             padding=5,
             content=ft.Row([
-                ft.Text(title, expand=1, size=12, color="white" if not completed else "grey"),
+                title_text,
                 ft.Checkbox(value=bool(completed), on_change=toggle)
             ])
         )
 
+    def on_topic_toggled(self, t_id, completed):
+        """Patch the affected row and the header in place instead of reloading the list."""
+        title_text = self.topic_rows.get(t_id)
+        if title_text:
+            title_text.color = "grey" if completed else "white"
+            title_text.update()
+        self.progress_done += 1 if completed else -1
+        self.render_progress()
+        self.header.update()
+
     def create_history_row(self, date, cat, time, correct, error, perc, topic):
         color_cat = "#66bb6a" if cat == "QUESTÕES" else "#ab47bc"
         return ft.Row([
@@ -0,0 +1,51 @@
+"""
+Daily study-time allocation.
+
+The day's available time is split across subjects in proportion to a
+priority built from the subject weight, how relevant it is for the exam,
+how little the student knows it and how poorly recent questions went.
+Goals are rounded to whole blocks with the largest-remainder method, so
+they always add up to the available time.
+"""
+
+DEFAULT_RELEVANCE = 3  # 0-5, "IMPORTÂNCIA" in the planning wizard
+DEFAULT_KNOWLEDGE = 2  # 0-5, "CONHECIMENTO" in the planning wizard
+BLOCK_SECONDS = 5 * 60
+
+
+def subject_priority(weight, relevance=DEFAULT_RELEVANCE, knowledge=DEFAULT_KNOWLEDGE, accuracy=None):
+    """
+    Relative priority of a subject. Defaults give a factor of 1.0 each, so a
+    subject nobody rated is driven by its weight alone.
+    accuracy: recent correct / answered in [0, 1], or None without questions.
+    """
+    weight = weight if weight is not None else 1.0
+    relevance = relevance if relevance is not None else DEFAULT_RELEVANCE
+    knowledge = knowledge if knowledge is not None else DEFAULT_KNOWLEDGE
+
+    importance = (relevance + 1) / (DEFAULT_RELEVANCE + 1)
+    gap = (6 - knowledge) / (6 - DEFAULT_KNOWLEDGE)
+    # 100% accuracy -> 0.75x, 0% -> 1.25x
+    struggle = 1.0 if accuracy is None else 1.25 - 0.5 * accuracy
+    return max(0.0, weight * importance * gap * struggle)
+
+
+def allocate(available_seconds, priorities, block=BLOCK_SECONDS):
+    """
+    Split `available_seconds` across {key: priority}.
+    Returns {key: seconds}, multiples of `block` summing to the available
+    time rounded down to a block.
+    """
+    total_priority = sum(p for p in priorities.values() if p > 0)
+    blocks = int(available_seconds // block)
+    if blocks <= 0 or total_priority <= 0:
+        return {key: 0 for key in priorities}
+
+    shares = {key: max(p, 0) / total_priority * blocks for key, p in priorities.items()}
+    result = {key: int(share) for key, share in shares.items()}
+    leftover = blocks - sum(result.values())
+    # Hand the remaining blocks to the largest fractional parts (ties: higher priority)
+    by_remainder = sorted(priorities, key=lambda k: (shares[k] - result[k], priorities[k]), reverse=True)
+    for key in by_remainder[:leftover]:
+        result[key] += 1
+    return {key: n * block for key, n in result.items()}
@@ -1,8 +1,14 @@
 """
 Date/time utilities for consistent parsing across the application.
+
+The canonical DB format ("YYYY-MM-DD HH:MM:SS") goes through the C-level
+`datetime.fromisoformat`; other formats fall back to a `strptime` cascade.
+Parsed values are memoised (datetimes are immutable), and the batch helpers
+convert a whole result set at once for list pages.
 """
 
 from datetime import datetime
+from functools import lru_cache
 
 
 # Supported date formats in order of preference
@@ -13,42 +19,111 @@ DATE_FORMATS = [
     "%d/%m/%Y",            # Brazilian date only
 ]
 
+# Formats only reachable through the slow path (ISO shapes use fromisoformat)
+_FALLBACK_FORMATS = [fmt for fmt in DATE_FORMATS if not fmt.startswith("%Y-")]
+
+# Distinct date strings kept in the parse/format caches
+CACHE_SIZE = 4096
+
+
+def _looks_iso(date_string):
+    return len(date_string) >= 10 and date_string[4] == "-" and date_string[7] == "-"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse(date_string):
+    """Parse one string; returns None when no format matches."""
+    if _looks_iso(date_string):
+        try:
+            return datetime.fromisoformat(date_string)
+        except ValueError:
+            pass
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt)
+        except ValueError:
+            continue
+    return None
+
 
 def parse_datetime(date_string, default=None):
     """
     Parse a date string trying multiple formats.
-    
+
     Args:
         date_string: The date string to parse
         default: Default value if parsing fails (defaults to datetime.now())
-    
+
     Returns:
         datetime object or default value
     """
-    if default is None:
-        default = datetime.now()
-    
-    if not date_string:
-        return default
-    
-    for fmt in DATE_FORMATS:
-        try:
-            return datetime.strptime(date_string, fmt)
-        except (ValueError, TypeError):
-            continue
-    
-    return default
+    if isinstance(date_string, datetime):
+        return date_string
+    parsed = _parse(date_string) if date_string and isinstance(date_string, str) else None
+    if parsed is not None:
+        return parsed
+    return default if default is not None else datetime.now()
+
+
+def parse_datetimes(values, default=None):
+    """
+    Parse a whole column of date strings (e.g. `[r['date'] for r in rows]`).
+    Unparseable entries become `default` (None unless given).
+    """
+    memo = {}
+    result = []
+    for value in values:
+        parsed = memo.get(value)
+        if parsed is None and value not in memo:
+            parsed = _parse(value) if value and isinstance(value, str) else None
+            memo[value] = parsed
+        result.append(parsed if parsed is not None else default)
+    return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _format(date_string, format_str):
+    parsed = _parse(date_string)
+    return parsed.strftime(format_str) if parsed else None
 
 
 def format_datetime_display(dt, format_str="%d/%m/%Y %H:%M"):
     """Format a datetime for display."""
     if isinstance(dt, str):
+        formatted = _format(dt, format_str) if dt else None
+        if formatted is not None:
+            return formatted
         dt = parse_datetime(dt)
     return dt.strftime(format_str) if dt else ""
 
 
+def format_datetimes(values, format_str="%d/%m/%Y %H:%M", fallback=None):
+    """
+    Format a column of date strings in one pass.
+    Unparseable entries become `fallback`, or are returned as-is when it is None.
+    """
+    result = []
+    for value in values:
+        formatted = _format(value, format_str) if value and isinstance(value, str) else None
+        if formatted is None:
+            formatted = value if fallback is None else fallback
+        result.append(formatted)
+    return result
+
+
 def format_datetime_db(dt=None):
     """Format a datetime for database storage (ISO format)."""
     if dt is None:
         dt = datetime.now()
     return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def normalize_datetime_db(value):
+    """
+    Convert any supported date string to the DB format, so SQL can compare
+    and sort it as text. Unparseable values are returned unchanged.
+    """
+    if isinstance(value, datetime):
+        return format_datetime_db(value)
+    parsed = _parse(value) if value and isinstance(value, str) else None
+    return format_datetime_db(parsed) if parsed else value
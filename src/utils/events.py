@@ -0,0 +1,127 @@
+"""
+In-process event bus for Estudei Offline.
+Replaces the bare "study_saved" pubsub string with typed events that carry
+the affected ids, coalescing bursts into a single delivery per subscriber.
+"""
+
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class EventType(Enum):
+    SESSION_ADDED = "session_added"
+    SESSION_DELETED = "session_deleted"
+    SESSION_EDITED = "session_edited"
+    TOPIC_TOGGLED = "topic_toggled"
+    PLAN_CHANGED = "plan_changed"
+
+
+@dataclass(frozen=True)
+class Event:
+    """A typed event. `ids` are the affected rows, `subject_ids` their subjects."""
+    type: EventType
+    ids: frozenset = field(default_factory=frozenset)
+    subject_ids: frozenset = field(default_factory=frozenset)
+
+    def __post_init__(self):
+        # Accept any iterable (or None) and normalize to frozensets
+        object.__setattr__(self, "ids", frozenset(i for i in (self.ids or ()) if i is not None))
+        object.__setattr__(self, "subject_ids", frozenset(i for i in (self.subject_ids or ()) if i is not None))
+
+    def merge(self, other):
+        """Coalesce another event of the same type into a new one."""
+        return Event(self.type, self.ids | other.ids, self.subject_ids | other.subject_ids)
+
+
+class EventBus:
+    """
+    Debounced, weakly-referenced publish/subscribe.
+
+    Events published within `delay` seconds of each other are merged per
+    type and delivered once; `max_delay` caps how long a continuous burst
+    can postpone delivery. Handlers are held through weak references, so
+    they must be bound methods or functions kept alive by their owner
+    (a lambda would be collected immediately).
+
+    Handlers are called as `handler(events)` with the list of coalesced
+    events matching their subscription, from the bus timer thread.
+    """
+
+    def __init__(self, delay=0.05, max_delay=0.25):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._subscribers = []  # [(weak handler, frozenset of types or None)]
+        self._pending = {}  # EventType -> coalesced Event
+        self._timer = None
+        self._burst_started = None
+
+    def subscribe(self, handler, types=None):
+        """Register a handler, optionally restricted to some event types."""
+        ref = weakref.WeakMethod(handler) if hasattr(handler, "__self__") else weakref.ref(handler)
+        type_filter = frozenset(types) if types else None
+        with self._lock:
+            self._subscribers = [(r, t) for r, t in self._subscribers if r() is not None and r() != handler]
+            self._subscribers.append((ref, type_filter))
+
+    def unsubscribe(self, handler):
+        """Remove a handler (no-op if it was not subscribed)."""
+        with self._lock:
+            self._subscribers = [(r, t) for r, t in self._subscribers if r() is not None and r() != handler]
+
+    def publish(self, event_type, ids=(), subject_ids=()):
+        """Queue an event; delivery happens after the debounce window."""
+        event = Event(event_type, ids, subject_ids)
+        with self._lock:
+            current = self._pending.get(event_type)
+            self._pending[event_type] = current.merge(event) if current else event
+            self._schedule_locked()
+
+    def flush(self):
+        """Deliver pending events right away (also used by tests)."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._burst_started = None
+            events = list(self._pending.values())
+            self._pending = {}
+            subscribers = list(self._subscribers)
+
+        if not events:
+            return
+
+        for ref, types in subscribers:
+            handler = ref()
+            if handler is None:
+                continue
+            matching = [ev for ev in events if types is None or ev.type in types]
+            if not matching:
+                continue
+            try:
+                handler(matching)
+            except Exception as ex:
+                print(f"Event handler failed: {ex}")
+
+        # Drop references to collected handlers
+        with self._lock:
+            self._subscribers = [(r, t) for r, t in self._subscribers if r() is not None]
+
+    def _schedule_locked(self):
+        now = time.monotonic()
+        if self._burst_started is None:
+            self._burst_started = now
+        if self._timer:
+            self._timer.cancel()
+        remaining = self.max_delay - (now - self._burst_started)
+        wait = max(0.0, min(self.delay, remaining))
+        self._timer = threading.Timer(wait, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+
+# Singleton instance
+bus = EventBus()
@@ -0,0 +1,86 @@
+"""
+On-disk cache of parsed edital PDFs.
+
+Entries are keyed by the SHA-256 of the file content plus the parser
+version, so renaming or moving a file still hits, and a parser change
+invalidates everything. Each entry is a small JSON file; reading one
+refreshes its mtime, and the least recently used entries are removed once
+the directory grows past `max_bytes`.
+"""
+
+import hashlib
+import json
+import os
+
+from src.utils.pdf_parser import PARSER_VERSION
+
+CACHE_DIR_NAME = "parse_cache"
+MAX_CACHE_BYTES = 20 * 1024 * 1024
+_READ_BLOCK = 1024 * 1024
+
+
+def content_key(file_path, version=PARSER_VERSION):
+    """sha256 of the file bytes, read in blocks, tagged with the parser version."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            digest.update(block)
+    return f"{digest.hexdigest()}-v{version}"
+
+
+class ParseCache:
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Cached topic list, or None. A hit marks the entry as recently used."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                topics = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return topics if isinstance(topics, list) else None
+
+    def put(self, key, topics):
+        """Store a topic list (atomic write) and trim the cache to its size budget."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(topics, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            print(f"Could not cache parsed PDF: {ex}")
+            return
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the total fits `max_bytes`."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
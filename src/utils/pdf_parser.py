@@ -1,8 +1,46 @@
 
-import pypdf
+import multiprocessing
+import queue as queue_module
 import re
+import time
+from concurrent.futures import CancelledError, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Bump when topic extraction changes, so cached results are not reused
+PARSER_VERSION = 2
+
+# Numbered items ("1.", "1.2.3") and bullets ("•", "-") followed by text
+TOPIC_PATTERN = re.compile(r'^\s*(\d+(\.\d+)*\.?|•|-)\s+(.+)')
+
+
+def topics_from_text(text):
+    """Topic lines of one page of text (numbering/bullet kept for context)."""
+    topics = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line and TOPIC_PATTERN.match(line):
+            topics.append(line)
+    return topics
+
+
+def read_page_texts(file_path):
+    """Yield (page_count, text) for each page of the PDF, one page at a time."""
+    import pypdf  # only needed when a PDF is actually opened
+
+    reader = pypdf.PdfReader(file_path)
+    page_count = len(reader.pages)
+    for page in reader.pages:
+        yield page_count, page.extract_text() or ""
+
 
 class PDFParser:
+    def iter_topics(self, file_path, page_texts=read_page_texts):
+        """
+        Yield (page_number, page_count, topics) page by page, so callers can
+        show progress and stop early. Nothing is accumulated here.
+        """
+        for number, (page_count, text) in enumerate(page_texts(file_path), start=1):
+            yield number, page_count, topics_from_text(text)
+
     def extract_topics(self, file_path):
         """
         Extracts topics from a PDF file using basic heuristics.
@@ -10,35 +48,164 @@ class PDFParser:
         """
         topics = []
         try:
-            reader = pypdf.PdfReader(file_path)
-            full_text = ""
-            for page in reader.pages:
-                full_text += page.extract_text() + "\n"
-            
-            # Heuristic: Split by lines
-            lines = full_text.split('\n')
-            
-            # Regex patterns for topics (e.g., "1. Topic", "1.1. Subtopic", "• Topic", "- Topic")
-            # We want to catch numbered lists or bullet points
-            pattern = re.compile(r'^\s*(\d+(\.\d+)*\.?|•|-)\s+(.+)')
-            
-            for line in lines:
-                line = line.strip()
-                if not line: continue
-                
-                # Check match
-                match = pattern.match(line)
-                if match:
-                    # Clean the topic text
-                    topic_text = line # Keep the numbering/bullet for context? Or remove?
-                    # Let's keep it as is for now, as it preserves structure visuals
-                    topics.append(topic_text)
-                elif len(line) > 5 and len(line) < 100 and line[0].isupper():
-                     # Fallback for simple titles if no numbering, but risky (headers, etc.)
-                     # For now, let's stick to strict patterns to avoid garbage
-                     pass
-                     
+            for _, _, page_topics in self.iter_topics(file_path):
+                topics.extend(page_topics)
             return topics
         except Exception as e:
             print(f"Error parsing PDF: {e}")
             return []
+
+
+def _extract_worker(file_path, out_queue, cancel_event, page_texts):
+    """Worker process: stream ("page", n, total, topics), then ("done",) or ("error", msg)."""
+    try:
+        for number, page_count, topics in PDFParser().iter_topics(file_path, page_texts):
+            if cancel_event.is_set():
+                out_queue.put(("cancelled",))
+                return
+            out_queue.put(("page", number, page_count, topics))
+        out_queue.put(("done",))
+    except Exception as e:
+        out_queue.put(("error", str(e)))
+
+
+class PDFExtractionJob:
+    """
+    Topic extraction in a separate process, so a large edital never blocks
+    the UI. Call `start()`, then `messages()` from a background thread to
+    receive the page-by-page results; `cancel()` stops it after the current
+    page, and the process is killed if it does not stop within `grace`.
+    """
+
+    def __init__(self, file_path, page_texts=read_page_texts, poll_timeout=0.2, grace=2.0):
+        self.file_path = file_path
+        self.page_texts = page_texts
+        self.poll_timeout = poll_timeout
+        self.grace = grace
+        self.queue = multiprocessing.Queue()
+        self.cancel_event = multiprocessing.Event()
+        self.process = None
+        self._cancelled_at = None
+
+    def start(self):
+        self.process = multiprocessing.Process(
+            target=_extract_worker,
+            args=(self.file_path, self.queue, self.cancel_event, self.page_texts),
+            daemon=True,
+        )
+        self.process.start()
+        return self
+
+    def messages(self):
+        """Yield worker messages until it finishes, fails, is cancelled or dies."""
+        while True:
+            try:
+                message = self.queue.get(timeout=self.poll_timeout)
+            except queue_module.Empty:
+                if self._cancelled_at is not None and time.monotonic() - self._cancelled_at > self.grace:
+                    # Stuck inside one page: stop waiting for it
+                    self.process.terminate()
+                    self.process.join(timeout=1)
+                    yield ("cancelled",)
+                    return
+                if self.process is None or self.process.is_alive():
+                    continue
+                # The worker may have sent its last messages just before exiting
+                while True:
+                    try:
+                        message = self.queue.get_nowait()
+                    except queue_module.Empty:
+                        break
+                    yield message
+                    if message[0] != "page":
+                        self.process.join(timeout=1)
+                        return
+                # Exited without a final message (killed or crashed)
+                yield ("cancelled",) if self.cancel_event.is_set() else ("error", "extraction process exited")
+                return
+            yield message
+            if message[0] != "page":
+                self.process.join(timeout=1)
+                return
+
+    def cancel(self):
+        """Ask the worker to stop; returns immediately."""
+        self.cancel_event.set()
+        self._cancelled_at = time.monotonic()
+
+
+def _extract_file_worker(index, file_path, page_texts, progress_queue, cancel_event):
+    """Pool task: all topics of one file, reporting (index, page, page_count) per page."""
+    topics = []
+    for number, page_count, page_topics in PDFParser().iter_topics(file_path, page_texts):
+        if cancel_event.is_set():
+            return None
+        topics.extend(page_topics)
+        progress_queue.put((index, number, page_count))
+    return topics
+
+
+class BatchExtraction:
+    """
+    Several editais parsed concurrently in a process pool. `run()` blocks
+    (call it from a background thread) and returns one result per file, in
+    input order: ("done", topics), ("error", message) or ("cancelled",).
+    `on_page(index, number, page_count)` and `on_file(index, result)` are
+    called from the thread running `run()`; `cancel()` stops every file
+    after its current page.
+    """
+
+    def __init__(self, file_paths, page_texts=read_page_texts, max_workers=None, poll_timeout=0.2):
+        self.file_paths = list(file_paths)
+        self.page_texts = page_texts
+        self.max_workers = max_workers
+        self.poll_timeout = poll_timeout
+        self._cancelled = False
+
+    def run(self, on_page=None, on_file=None):
+        results = [None] * len(self.file_paths)
+        if self._cancelled:
+            return [("cancelled",)] * len(self.file_paths)
+        if not self.file_paths:
+            return results
+        workers = self.max_workers or min(len(self.file_paths), multiprocessing.cpu_count())
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+            progress = manager.Queue()
+            cancel_event = manager.Event()
+            futures = {
+                pool.submit(_extract_file_worker, index, path, self.page_texts, progress, cancel_event): index
+                for index, path in enumerate(self.file_paths)
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self.poll_timeout, return_when=FIRST_COMPLETED)
+                if self._cancelled and not cancel_event.is_set():
+                    cancel_event.set()
+                    for future in pending:
+                        future.cancel()
+                self._drain(progress, on_page)
+                for future in done:
+                    index = futures[future]
+                    try:
+                        topics = future.result()
+                        results[index] = ("cancelled",) if topics is None else ("done", topics)
+                    except CancelledError:
+                        results[index] = ("cancelled",)
+                    except Exception as e:
+                        results[index] = ("error", str(e))
+                    if on_file:
+                        on_file(index, results[index])
+        return results
+
+    def _drain(self, progress, on_page):
+        while True:
+            try:
+                index, number, page_count = progress.get_nowait()
+            except queue_module.Empty:
+                return
+            if on_page:
+                on_page(index, number, page_count)
+
+    def cancel(self):
+        """Ask every file to stop; returns immediately."""
+        self._cancelled = True
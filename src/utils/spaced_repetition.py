@@ -0,0 +1,69 @@
+"""
+SM-2 style spaced-repetition scheduling.
+
+Each (subject, topic) pair carries a small state: how many successful
+reviews in a row, an ease factor and the current interval in days. Every
+study session is graded from its question accuracy and moves the state
+forward; the next review is due `interval` days later.
+"""
+
+from collections import namedtuple
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# Quality used when the session had no questions (theory, video, reading)
+NO_QUESTIONS_QUALITY = 4
+
+# Self-graded review results offered when finishing a review: (label, quality)
+REVIEW_GRADES = [
+    ("Lembrei bem", 5),
+    ("Lembrei com esforço", 3),
+    ("Esqueci", 1),
+]
+
+ReviewState = namedtuple("ReviewState", ["repetitions", "ease", "interval_days"])
+
+INITIAL_STATE = ReviewState(0, DEFAULT_EASE, 0)
+
+
+def quality_from_accuracy(correct, wrong):
+    """Grade a session 0-5 (SM-2 scale) from its question accuracy."""
+    total = (correct or 0) + (wrong or 0)
+    if total == 0:
+        return NO_QUESTIONS_QUALITY
+    accuracy = (correct or 0) / total
+    if accuracy >= 0.9:
+        return 5
+    if accuracy >= 0.75:
+        return 4
+    if accuracy >= 0.6:
+        return 3
+    if accuracy >= 0.4:
+        return 2
+    if accuracy > 0:
+        return 1
+    return 0
+
+
+def next_state(state, quality):
+    """
+    Apply one graded review to a state and return the new state.
+    Failed reviews (quality < 3) restart the sequence at 1 day but keep
+    the lowered ease, so the topic comes back more often afterwards.
+    """
+    state = state or INITIAL_STATE
+    ease = state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    ease = max(MIN_EASE, ease)
+
+    if quality < 3:
+        return ReviewState(0, ease, 1)
+
+    repetitions = state.repetitions + 1
+    if repetitions == 1:
+        interval = 1
+    elif repetitions == 2:
+        interval = 6
+    else:
+        interval = max(1, round(state.interval_days * ease))
+    return ReviewState(repetitions, ease, interval)
@@ -0,0 +1,131 @@
+"""
+Drift-free stopwatch and shared UI ticker for the study timer.
+
+Elapsed time is derived from monotonic start/pause marks, so it stays exact
+no matter how late the UI ticks arrive. The ticker is a single daemon thread
+shared by every subscriber that only runs while someone is subscribed.
+"""
+
+import threading
+import time
+
+
+class Stopwatch:
+    """
+    Pausable stopwatch based on `time.monotonic()`.
+    The clock is injectable so long sessions can be simulated in tests.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._accumulated = 0.0  # Seconds from finished running spans
+        self._started_at = None  # Monotonic mark of the current running span
+
+    @property
+    def running(self):
+        with self._lock:
+            return self._started_at is not None
+
+    def start(self):
+        """Start or resume. No-op if already running."""
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = self._clock()
+
+    def pause(self):
+        """Pause, folding the current span into the accumulated time."""
+        with self._lock:
+            if self._started_at is not None:
+                self._accumulated += self._clock() - self._started_at
+                self._started_at = None
+
+    def reset(self, seconds=0.0):
+        """Stop and set the accumulated time (0 by default)."""
+        with self._lock:
+            self._accumulated = float(seconds)
+            self._started_at = None
+
+    def elapsed(self):
+        """Total running time in seconds (float)."""
+        with self._lock:
+            total = self._accumulated
+            if self._started_at is not None:
+                total += self._clock() - self._started_at
+            return total
+
+
+def format_hms(seconds):
+    """Format seconds as HH:MM:SS."""
+    mins, s = divmod(int(seconds), 60)
+    hours, mins = divmod(mins, 60)
+    return "{:02d}:{:02d}:{:02d}".format(hours, mins, s)
+
+
+class Ticker:
+    """
+    Single shared background ticker.
+
+    Callbacks are invoked every `interval` seconds from one daemon thread,
+    scheduled against absolute deadlines so a slow callback does not push
+    later ticks back. The thread exits when the last callback is removed
+    and is restarted on the next `add`.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._thread = None
+        self._wake = threading.Event()
+
+    def add(self, callback):
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+            if self._thread is None:
+                self._wake.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True, name="ui-ticker")
+                self._thread.start()
+
+    def remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+            if not self._callbacks:
+                self._wake.set()  # Let the thread exit promptly
+
+    @property
+    def active(self):
+        with self._lock:
+            return self._thread is not None
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while True:
+            self._wake.wait(max(0.0, next_tick - time.monotonic()))
+            with self._lock:
+                if not self._callbacks:
+                    self._thread = None
+                    return
+                if self._wake.is_set():
+                    # Woken by remove() but re-subscribed meanwhile: keep the schedule
+                    self._wake.clear()
+                    continue
+                callbacks = list(self._callbacks)
+
+            for cb in callbacks:
+                try:
+                    cb()
+                except Exception as ex:
+                    print(f"Ticker callback failed: {ex}")
+
+            now = time.monotonic()
+            next_tick += self.interval
+            if next_tick <= now:
+                # We fell behind (sleep/suspend): skip missed ticks instead of bursting
+                next_tick = now + self.interval
+
+
+# Shared instance used by the UI
+ticker = Ticker()
@@ -0,0 +1,79 @@
+"""
+Weekly study-cycle generation.
+
+Subjects take turns by weighted round-robin (stride scheduling): each one
+has a "pass" that advances by minutes studied / priority, and the next
+slot always goes to the lowest pass, kept in a heap. High-priority
+subjects come back more often, every subject with a priority shows up,
+and re-planning thousands of slots is O(slots * log subjects).
+Consecutive slots of the same subject on a day are merged into one block.
+"""
+
+import heapq
+from collections import namedtuple
+
+SLOT_MINUTES = 60
+
+# Wizard order (DOM..SÁB) -> Python weekday (0 = Monday)
+WIZARD_DAYS = [("DOM", 6), ("SEG", 0), ("TER", 1), ("QUA", 2), ("QUI", 3), ("SEX", 4), ("SÁB", 5)]
+
+CycleSlot = namedtuple("CycleSlot", ["weekday", "position", "subject_id", "minutes"])
+
+
+def build_cycle(priorities, minutes_by_weekday, slot_minutes=SLOT_MINUTES):
+    """
+    Fill each weekday's minutes with study blocks.
+
+    priorities: {subject_id: priority}, insertion order breaks ties
+    minutes_by_weekday: {weekday: minutes available}
+    Returns a list of CycleSlot ordered by weekday and position.
+    """
+    heap = [(1.0 / p, order, key) for order, (key, p) in enumerate(priorities.items()) if p > 0]
+    heapq.heapify(heap)
+    slots = []
+    if not heap:
+        return slots
+
+    for weekday in range(7):
+        remaining = int(minutes_by_weekday.get(weekday) or 0)
+        day_start = len(slots)
+        while remaining > 0:
+            minutes = min(slot_minutes, remaining)
+            pass_value, order, key = heap[0]
+            heapq.heapreplace(heap, (pass_value + minutes / slot_minutes / priorities[key], order, key))
+            remaining -= minutes
+
+            last = slots[-1] if len(slots) > day_start else None
+            if last is not None and last.subject_id == key:
+                slots[-1] = last._replace(minutes=last.minutes + minutes)
+            else:
+                slots.append(CycleSlot(weekday, len(slots) - day_start, key, minutes))
+    return slots
+
+
+def minutes_per_subject(slots):
+    """Total weekly minutes per subject: {subject_id: minutes}."""
+    totals = {}
+    for slot in slots:
+        totals[slot.subject_id] = totals.get(slot.subject_id, 0) + slot.minutes
+    return totals
+
+
+def parse_hours(text):
+    """'06:00' / '6:30' / '6' / '6,5' -> hours as float; None when invalid."""
+    text = (text or "").strip()
+    try:
+        if ":" in text:
+            hours, minutes = text.split(":", 1)
+            value = int(hours or 0) + int(minutes or 0) / 60
+        else:
+            value = float(text.replace(",", "."))
+    except ValueError:
+        return None
+    return value if 0 <= value <= 24 else None
+
+
+def format_hours(hours):
+    """6.5 -> '06:30'."""
+    minutes = int(round((hours or 0) * 60))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
@@ -0,0 +1,120 @@
+"""
+Match an updated edital against the topics already stored for a subject.
+
+Two passes:
+1. exact: titles reduced to a normalized key (numbering, accents, case and
+   punctuation dropped) are matched through a dict;
+2. fuzzy: what is left goes through a character-trigram inverted index.
+   Trigrams such as " de" or "cao" appear in almost every title, so
+   candidates are only gathered through the rarer ones (in at most
+   MAX_GRAM_SHARE of the stored titles); the candidates are then scored
+   on all their trigrams. A title made only of common trigrams falls back
+   to every title sharing one.
+
+Every stored topic is matched at most once. Stored topics left over are
+deletions, incoming lines left over are insertions.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict, deque, namedtuple
+
+# Dice coefficient over trigrams needed to call two titles the same topic
+FUZZY_THRESHOLD = 0.65
+# Trigrams in more than this share of the stored titles do not select candidates
+MAX_GRAM_SHARE = 0.05
+MIN_GRAM_POSTINGS = 20
+
+_PREFIX = re.compile(r'^\s*(?:\d+(?:\.\d+)*\.?|•|-)\s+')
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+# matches: [(stored id, incoming index)], inserts: [incoming index], deletes: [stored id]
+MergeDiff = namedtuple("MergeDiff", ["matches", "inserts", "deletes"])
+
+
+def normalize_title(text):
+    """'1.2. Administração  Pública;' -> 'administracao publica'."""
+    text = _PREFIX.sub("", str(text or ""), count=1)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index trigram -> stored ids, for best-match lookups."""
+
+    def __init__(self):
+        self.postings = defaultdict(list)
+        self.grams = {}
+        self.taken = set()
+
+    def add(self, item_id, key):
+        grams = trigrams(key)
+        self.grams[item_id] = grams
+        for gram in grams:
+            self.postings[gram].append(item_id)
+
+    def candidates(self, grams):
+        """Ids sharing a rare trigram with `grams` (any trigram if all are common)."""
+        cap = max(MIN_GRAM_POSTINGS, int(len(self.grams) * MAX_GRAM_SHARE))
+        found = [self.postings[g] for g in grams if g in self.postings]
+        rare = [ids for ids in found if len(ids) <= cap]
+        return set().union(*(rare or found))
+
+    def best_match(self, key, threshold=FUZZY_THRESHOLD):
+        """Untaken id with the highest Dice score >= threshold, or None."""
+        grams = trigrams(key)
+        best, best_rank = None, None
+        for item_id in self.candidates(grams):
+            if item_id in self.taken:
+                continue
+            other = self.grams[item_id]
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            rank = (score, -item_id)  # ties go to the earliest stored topic
+            if score >= threshold and (best_rank is None or rank > best_rank):
+                best, best_rank = item_id, rank
+        return best
+
+
+def diff_topics(existing, incoming, threshold=FUZZY_THRESHOLD):
+    """
+    existing: [(id, title)] stored topics, in display order.
+    incoming: [title] lines of the new edital.
+    """
+    by_key = defaultdict(deque)
+    for item_id, title in existing:
+        by_key[normalize_title(title)].append(item_id)
+
+    matches = []
+    unmatched = []
+    for index, title in enumerate(incoming):
+        key = normalize_title(title)
+        ids = by_key.get(key)
+        if ids:
+            matches.append((ids.popleft(), index))
+        else:
+            unmatched.append((index, key))
+
+    index = TrigramIndex()
+    for key, ids in by_key.items():
+        for item_id in ids:
+            index.add(item_id, key)
+
+    inserts = []
+    for position, key in unmatched:
+        item_id = index.best_match(key, threshold) if key else None
+        if item_id is None:
+            inserts.append(position)
+        else:
+            index.taken.add(item_id)
+            matches.append((item_id, position))
+
+    matched = {item_id for item_id, _ in matches}
+    deletes = [item_id for item_id, _ in existing if item_id not in matched]
+    matches.sort(key=lambda m: m[1])
+    return MergeDiff(matches, inserts, deletes)
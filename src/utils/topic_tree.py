@@ -0,0 +1,99 @@
+"""
+Edital numbering -> topic tree.
+
+"3", "3.1" and "3.1.2" become nested topics. Each node gets a path key made
+of zero-padded sibling ordinals ("0003.0001.0002"), so a whole section is
+one contiguous, index-friendly range of paths: the section itself plus
+everything between "<path>." and "<path>/" ("/" sorts right after ".").
+
+Ordinals count siblings in reading order rather than copying the printed
+numbers, so numbering that restarts (one "1." per block of the edital) or
+skips values still yields unique paths. Bulleted or unnumbered lines
+become children of the closest numbered line above them.
+"""
+
+import re
+from collections import namedtuple
+
+SEGMENT_WIDTH = 4
+SEPARATOR = "."
+
+_NUMBERING = re.compile(r'^\s*(\d+(?:\.\d+)*)\.?\s+')
+
+# parent: index of the parent node in the same list (parents come first)
+TopicNode = namedtuple("TopicNode", ["title", "path", "parent", "depth"])
+
+
+def parse_numbering(line):
+    """'1.2.3. Texto' -> (1, 2, 3); None for bullets and plain text."""
+    match = _NUMBERING.match(line)
+    if not match:
+        return None
+    return tuple(int(n) for n in match.group(1).split("."))
+
+
+def make_path(ordinals):
+    return SEPARATOR.join(str(n).zfill(SEGMENT_WIDTH) for n in ordinals)
+
+
+def path_depth(path):
+    return path.count(SEPARATOR) if path else 0
+
+
+def subtree_bounds(path):
+    """(lower, upper) such that descendants satisfy lower < p < upper."""
+    return path + SEPARATOR, path + chr(ord(SEPARATOR) + 1)
+
+
+def _lookup(by_number, numbers):
+    """Latest node printed as `numbers`, unless one of its ancestors restarted after it."""
+    index = by_number.get(numbers)
+    if index is None:
+        return None
+    for size in range(1, len(numbers)):
+        ancestor = by_number.get(numbers[:size])
+        if ancestor is not None and ancestor > index:
+            return None
+    return index
+
+
+def build_tree(lines, first_root=1):
+    """
+    Turn parsed edital lines into TopicNodes, in input order.
+    `first_root` is the ordinal of the first top-level node, for appending
+    to a subject that already has sections.
+    """
+    nodes = []
+    child_count = {}  # node index (None = root) -> children so far
+    by_number = {}  # printed numbering -> latest node index with it
+    last_numbered = None
+    for line in lines:
+        title = line.strip()
+        if not title:
+            continue
+        numbers = parse_numbering(title)
+        parent = None
+        if numbers is not None:
+            # Closest printed ancestor: 1.2.3 -> 1.2 -> 1
+            for size in range(len(numbers) - 1, 0, -1):
+                parent = _lookup(by_number, numbers[:size])
+                if parent is not None:
+                    break
+        else:
+            parent = last_numbered
+
+        ordinal = child_count.get(parent, 0) + 1
+        child_count[parent] = ordinal
+        if parent is None:
+            path = make_path([first_root - 1 + ordinal])
+            depth = 0
+        else:
+            path = nodes[parent].path + SEPARATOR + make_path([ordinal])
+            depth = nodes[parent].depth + 1
+
+        index = len(nodes)
+        nodes.append(TopicNode(title, path, parent, depth))
+        if numbers is not None:
+            by_number[numbers] = index
+            last_numbered = index
+    return nodes
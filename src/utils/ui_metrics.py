@@ -0,0 +1,192 @@
+"""
+Debug instrumentation for UI work per user interaction.
+
+`UIMetrics.install(control_cls, page_cls)` patches the control base class
+so every control created and every `update()` call is counted, together
+with an approximate diff size: the number of controls under whatever was
+updated, which is what Flet has to walk. Counts go to the interaction
+running on the current thread (see `interaction()` and
+`instrument_method()`), keyed by (page, interaction); work done outside
+any interaction is booked under UNATTRIBUTED.
+
+The classes are passed in, so tests can use small fakes and the app only
+imports Flet where it already does. Nothing is patched unless the app is
+started with ESTUDEI_UI_METRICS=1 (see main.py).
+"""
+
+import contextlib
+import functools
+import threading
+from dataclasses import dataclass
+
+ENV_FLAG = "ESTUDEI_UI_METRICS"
+UNATTRIBUTED = ("-", "(fora de interação)")
+
+
+@dataclass
+class InteractionStats:
+    runs: int = 0
+    controls_created: int = 0
+    updates: int = 0
+    diff_size: int = 0
+
+    def per_run(self):
+        runs = self.runs or 1
+        return InteractionStats(1, self.controls_created // runs, self.updates // runs, self.diff_size // runs)
+
+
+def count_controls(root):
+    """Controls in the subtree of `root` (itself included), without revisiting shared nodes."""
+    seen = set()
+    stack = [root]
+    while stack:
+        control = stack.pop()
+        if control is None or id(control) in seen:
+            continue
+        seen.add(id(control))
+        get_children = getattr(control, "_get_children", None)
+        if callable(get_children):
+            children = get_children() or []
+        else:
+            children = list(getattr(control, "controls", None) or [])
+            content = getattr(control, "content", None)
+            if content is not None and not isinstance(content, (str, int, float)):
+                children.append(content)
+        stack.extend(children)
+    return len(seen)
+
+
+class UIMetrics:
+    def __init__(self):
+        self.stats = {}  # (page, interaction) -> InteractionStats
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patches = []  # (cls, attribute name, original)
+
+    # --- Attribution ---
+    def _current(self):
+        return getattr(self._local, "key", None) or UNATTRIBUTED
+
+    def _bucket(self, key):
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = InteractionStats()
+        return stats
+
+    @contextlib.contextmanager
+    def interaction(self, name, page="-"):
+        """Attribute the UI work done inside the block to (page, name)."""
+        previous = getattr(self._local, "key", None)
+        if previous is not None:
+            yield  # Nested handler: keep counting for the outer interaction
+            return
+        key = (page, name)
+        self._local.key = key
+        with self._lock:
+            self._bucket(key).runs += 1
+        try:
+            yield
+        finally:
+            self._local.key = None
+
+    def instrument_method(self, cls, method_name, page=None, name=None):
+        """Run `cls.method_name` as an interaction (page defaults to the class name)."""
+        original = getattr(cls, method_name)
+        page = page or cls.__name__
+        name = name or method_name
+        metrics = self
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            with metrics.interaction(name, page):
+                return original(*args, **kwargs)
+
+        self._patch(cls, method_name, original, wrapper)
+
+    # --- Patching ---
+    def _patch(self, cls, attr, original, replacement):
+        self._patches.append((cls, attr, cls.__dict__.get(attr)))
+        setattr(cls, attr, replacement)
+
+    def install(self, control_cls, page_cls=None):
+        """Count control construction and update() on these classes (and subclasses)."""
+        metrics = self
+        original_init = control_cls.__init__
+
+        @functools.wraps(original_init)
+        def counting_init(control, *args, **kwargs):
+            original_init(control, *args, **kwargs)
+            with metrics._lock:
+                metrics._bucket(metrics._current()).controls_created += 1
+
+        self._patch(control_cls, "__init__", original_init, counting_init)
+        for cls in (control_cls, page_cls):
+            if cls is not None and hasattr(cls, "update"):
+                self._patch(cls, "update", cls.update, self._counting_update(cls.update))
+
+    def _counting_update(self, original):
+        metrics = self
+
+        @functools.wraps(original)
+        def counting_update(target, *controls, **kwargs):
+            if getattr(metrics._local, "in_update", False):
+                # Control.update() delegates to page.update(control): count once
+                return original(target, *controls, **kwargs)
+            metrics._local.in_update = True
+            try:
+                size = sum(count_controls(c) for c in controls) if controls else count_controls(target)
+                with metrics._lock:
+                    stats = metrics._bucket(metrics._current())
+                    stats.updates += 1
+                    stats.diff_size += size
+                return original(target, *controls, **kwargs)
+            finally:
+                metrics._local.in_update = False
+
+        return counting_update
+
+    def uninstall(self):
+        """Restore every patched attribute."""
+        for cls, attr, original in reversed(self._patches):
+            if original is None:
+                delattr(cls, attr)  # Was inherited before patching
+            else:
+                setattr(cls, attr, original)
+        self._patches.clear()
+
+    # --- Reporting ---
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def report(self):
+        """{(page, interaction): InteractionStats} snapshot."""
+        with self._lock:
+            return {key: InteractionStats(**vars(s)) for key, s in self.stats.items()}
+
+    def format_report(self):
+        lines = [f"{'página':<20} {'interação':<28} {'exec':>5} {'controles':>10} {'updates':>8} {'diff':>8}"]
+        for (page, name), s in sorted(self.report().items(), key=lambda item: -item[1].controls_created):
+            lines.append(f"{page:<20} {name:<28} {s.runs:>5} {s.controls_created:>10} {s.updates:>8} {s.diff_size:>8}")
+        return "\n".join(lines)
+
+    def over_budget(self, budgets):
+        """
+        budgets: {(page, interaction): {"controls_created": n, "updates": n, "diff_size": n}},
+        limits per run. Returns ["page/interaction: field x > n"] for every excess.
+        """
+        report = self.report()
+        problems = []
+        for key, limits in budgets.items():
+            stats = report.get(key)
+            if stats is None:
+                continue
+            per_run = stats.per_run()
+            for field_name, limit in limits.items():
+                value = getattr(per_run, field_name)
+                if value > limit:
+                    problems.append(f"{key[0]}/{key[1]}: {field_name} {value} > {limit}")
+        return problems
+
+
+metrics = UIMetrics()
@@ -0,0 +1,62 @@
+"""
+Unit tests for the daily time allocation.
+Run with: pytest tests/test_allocation.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.allocation import BLOCK_SECONDS, allocate, subject_priority
+
+
+class TestSubjectPriority:
+    def test_defaults_reduce_to_weight(self):
+        assert subject_priority(1.0) == pytest.approx(1.0)
+        assert subject_priority(2.5) == pytest.approx(2.5)
+        assert subject_priority(None) == pytest.approx(1.0)
+
+    def test_ratings_and_accuracy_move_priority(self):
+        base = subject_priority(1.0)
+        assert subject_priority(1.0, relevance=5) > base
+        assert subject_priority(1.0, knowledge=5) < base
+        assert subject_priority(1.0, accuracy=0.2) > base > subject_priority(1.0, accuracy=0.95)
+
+    def test_zero_weight_gets_nothing(self):
+        assert subject_priority(0) == 0
+
+
+class TestAllocate:
+    def test_sums_to_available_time_in_blocks(self):
+        goals = allocate(7200, {1: 1.0, 2: 1.0, 3: 1.0})
+
+        assert sum(goals.values()) == 7200
+        assert all(seconds % BLOCK_SECONDS == 0 for seconds in goals.values())
+        # 24 blocks / 3 = 8 each
+        assert set(goals.values()) == {2400}
+
+    def test_proportional_to_priority(self):
+        goals = allocate(3600, {"a": 3.0, "b": 1.0})
+        assert goals == {"a": 2700, "b": 900}
+
+    def test_largest_remainder_rounding(self):
+        # 4 blocks over 3 equal subjects: one gets the extra block
+        goals = allocate(4 * BLOCK_SECONDS, {1: 1.0, 2: 1.0, 3: 1.0})
+        assert sorted(goals.values()) == [BLOCK_SECONDS, BLOCK_SECONDS, 2 * BLOCK_SECONDS]
+
+    def test_nothing_available_or_no_priority(self):
+        assert allocate(0, {1: 1.0}) == {1: 0}
+        assert allocate(3600, {1: 0.0, 2: 0.0}) == {1: 0, 2: 0}
+        assert allocate(3600, {}) == {}
+
+    def test_many_subjects_stay_exact(self):
+        priorities = {i: 1 + (i % 7) * 0.37 for i in range(200)}
+        goals = allocate(12 * 3600, priorities)
+        assert sum(goals.values()) == 12 * 3600
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -524,5 +524,1058 @@ class TestRemindersCRUD:
         assert result is None
 
 
+
+class TestTimerCheckpointCRUD:
+    """Tests for the running timer checkpoint."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_no_checkpoint_by_default(self):
+        """Test that a fresh database has no orphaned session."""
+        assert self.crud.get_timer_checkpoint() is None
+    
+    def test_save_and_get_checkpoint(self):
+        """Test round-tripping the timer state."""
+        subject_id = self.crud.get_all_subjects()[0]['id']
+        spans = [["2024-01-01 10:30:00", "2024-01-01 10:45:00"]]
+        self.crud.save_timer_checkpoint(subject_id, "Português", "2024-01-01 10:00:00", 1800, spans, True)
+        
+        cp = self.crud.get_timer_checkpoint()
+        assert cp['subject_id'] == subject_id
+        assert cp['topic'] == "Português"
+        assert cp['started_at'] == "2024-01-01 10:00:00"
+        assert cp['accumulated_seconds'] == 1800
+        assert cp['paused_spans'] == spans
+        assert cp['running'] == 1
+        assert cp['updated_at']
+    
+    def test_checkpoint_is_rewritten_in_place(self):
+        """Test that repeated checkpoints keep a single row."""
+        for secs in (30, 60, 90):
+            self.crud.save_timer_checkpoint(None, "T", "2024-01-01 10:00:00", secs, [], True)
+        
+        rows = self.db.fetch_all("SELECT * FROM timer_checkpoint")
+        assert len(rows) == 1
+        assert rows[0]['accumulated_seconds'] == 90
+    
+    def test_clear_checkpoint(self):
+        """Test discarding the orphaned session."""
+        self.crud.save_timer_checkpoint(None, "T", "2024-01-01 10:00:00", 30, [], False)
+        self.crud.clear_timer_checkpoint()
+        assert self.crud.get_timer_checkpoint() is None
+
+
+
+class TestTopicsCRUD:
+    """Tests for Topics (syllabus) CRUD operations."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_get_topics_by_plan_groups_in_order(self):
+        """Test that a plan's syllabus comes back grouped by subject, ordered."""
+        sub_b = self.crud.add_subject_return_id("B Matéria", "Cat", "#000000")
+        sub_a = self.crud.add_subject_return_id("A Matéria", "Cat", "#000000")
+        sub_out = self.crud.add_subject_return_id("Fora do Plano", "Cat", "#000000")
+        self.crud.add_topics_bulk(sub_b, ["b1", "b2"])
+        self.crud.add_topics_bulk(sub_a, ["a1", "a2", "a3"])
+        self.crud.add_topics_bulk(sub_out, ["x"])
+        plan_id = self.crud.add_plan("Plano", "", subject_ids=[sub_b, sub_a])
+        
+        grouped = self.crud.get_topics_by_plan(plan_id)
+        
+        assert list(grouped.keys()) == [sub_a, sub_b]
+        assert [t['title'] for t in grouped[sub_a]] == ["a1", "a2", "a3"]
+        assert [t['title'] for t in grouped[sub_b]] == ["b1", "b2"]
+        assert sub_out not in grouped
+    
+    def test_get_topics_by_plan_empty(self):
+        """Test a plan whose subjects have no topics."""
+        plan_id = self.crud.add_plan("Vazio", "", subject_ids=[self.crud.get_all_subjects()[0]['id']])
+        assert self.crud.get_topics_by_plan(plan_id) == {}
+    
+    def test_get_topics_by_plan_large(self):
+        """Test a 12-subject, 800-topic plan in one call."""
+        subject_ids = []
+        for i in range(12):
+            sid = self.crud.add_subject_return_id(f"Matéria {i:02d}", "Cat", "#000000")
+            self.crud.add_topics_bulk(sid, [f"T{i}-{j}" for j in range(800 // 12 + 1)])
+            subject_ids.append(sid)
+        plan_id = self.crud.add_plan("Grande", "", subject_ids=subject_ids)
+        
+        grouped = self.crud.get_topics_by_plan(plan_id)
+        
+        assert len(grouped) == 12
+        assert sum(len(v) for v in grouped.values()) >= 800
+
+    def test_get_topics_page_filters_and_paginates(self):
+        """Test subject filter, LIMIT/OFFSET and the total count."""
+        sub_a = self.crud.add_subject_return_id("A Matéria", "Cat", "#000000")
+        sub_b = self.crud.add_subject_return_id("B Matéria", "Cat", "#000000")
+        self.crud.add_topics_bulk(sub_a, [f"a{i}" for i in range(7)])
+        self.crud.add_topics_bulk(sub_b, ["b0", "b1"])
+        
+        rows, total = self.crud.get_topics_page(subject_id=sub_a, limit=5)
+        assert total == 7
+        assert [r['title'] for r in rows] == ["a0", "a1", "a2", "a3", "a4"]
+        assert rows[0]['subject_name'] == "A Matéria"
+        
+        rows, total = self.crud.get_topics_page(subject_id=sub_a, limit=5, offset=5)
+        assert total == 7
+        assert [r['title'] for r in rows] == ["a5", "a6"]
+        
+        rows, total = self.crud.get_topics_page(subject_id=sub_a, limit=5, offset=10)
+        assert rows == [] and total == 0
+    
+    def test_get_topics_page_sorting(self):
+        """Test edital, title and pending-first orderings."""
+        sub_b = self.crud.add_subject_return_id("B Matéria", "Cat", "#000000")
+        sub_a = self.crud.add_subject_return_id("A Matéria", "Cat", "#000000")
+        self.crud.add_topics_bulk(sub_b, ["zeta", "alfa"])
+        self.crud.add_topics_bulk(sub_a, ["Meio"])
+        done = self.crud.get_topics_by_subject(sub_a)[0]['id']
+        self.crud.toggle_topic_complete(done, True)
+        
+        rows, total = self.crud.get_topics_page(sort="edital")
+        assert total == 3
+        assert [r['title'] for r in rows] == ["Meio", "zeta", "alfa"]
+        
+        rows, _ = self.crud.get_topics_page(sort="title")
+        assert [r['title'] for r in rows] == ["alfa", "Meio", "zeta"]
+        
+        rows, _ = self.crud.get_topics_page(sort="pending")
+        assert [r['title'] for r in rows] == ["zeta", "alfa", "Meio"]
+        
+        # Unknown sort keys fall back to the edital order
+        rows, _ = self.crud.get_topics_page(sort="; DROP TABLE topics")
+        assert [r['title'] for r in rows] == ["Meio", "zeta", "alfa"]
+
+
+
+class TestToggleTopicsBulk:
+    """Tests for the batched topic toggle write."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_bulk_toggle_updates_topics_and_stats(self):
+        """Test that one call updates topics of several subjects and their counters."""
+        sub_a = self.crud.add_subject_return_id("A", "Cat", "#000000")
+        sub_b = self.crud.add_subject_return_id("B", "Cat", "#000000")
+        self.crud.add_topics_bulk(sub_a, ["a1", "a2", "a3"])
+        self.crud.add_topics_bulk(sub_b, ["b1"])
+        a_ids = [t['id'] for t in self.crud.get_topics_by_subject(sub_a)]
+        b_ids = [t['id'] for t in self.crud.get_topics_by_subject(sub_b)]
+        
+        affected = self.crud.toggle_topics_bulk({a_ids[0]: True, a_ids[2]: True, b_ids[0]: True})
+        
+        assert affected == {sub_a, sub_b}
+        a = self.crud.get_subject_by_id(sub_a)
+        b = self.crud.get_subject_by_id(sub_b)
+        assert (a['completed_topics'], a['total_topics']) == (2, 3)
+        assert (b['completed_topics'], b['total_topics']) == (1, 1)
+        
+        self.crud.toggle_topics_bulk({a_ids[0]: False})
+        assert self.crud.get_subject_by_id(sub_a)['completed_topics'] == 1
+    
+    def test_bulk_toggle_empty(self):
+        """Test that no changes is a no-op."""
+        assert self.crud.toggle_topics_bulk({}) == set()
+
+
+
+class TestTopicOrdering:
+    """Tests for gap-based topic ordering and transactional topic edits."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_order_index_between(self):
+        """Test picking a slot between neighbours."""
+        gap = self.crud.TOPIC_ORDER_GAP
+        assert self.crud.order_index_between(None, None) == 0
+        assert self.crud.order_index_between(None, 0) == -gap
+        assert self.crud.order_index_between(gap, None) == 2 * gap
+        assert self.crud.order_index_between(0, gap) == gap // 2
+        assert self.crud.order_index_between(5, 6) is None
+    
+    def test_bulk_and_single_add_use_gaps(self):
+        """Test that appended topics are spaced and keep their order."""
+        sid = self.crud.add_subject_return_id("Matéria", "Cat", "#000000")
+        self.crud.add_topics_bulk(sid, ["a", "b"])
+        self.crud.add_topic(sid, "c")
+        self.crud.add_topics_bulk(sid, ["d"])
+        
+        topics = self.crud.get_topics_by_subject(sid)
+        gap = self.crud.TOPIC_ORDER_GAP
+        assert [t['title'] for t in topics] == ["a", "b", "c", "d"]
+        assert [t['order_index'] for t in topics] == [0, gap, 2 * gap, 3 * gap]
+    
+    def test_save_topic_edits(self):
+        """Test that adds, updates and deletes land together with fresh stats."""
+        sid = self.crud.add_subject_return_id("Matéria", "Cat", "#000000")
+        self.crud.add_topics_bulk(sid, ["a", "b", "c"])
+        a, b, c = self.crud.get_topics_by_subject(sid)
+        
+        self.crud.save_topic_edits(
+            sid,
+            added=[("d", -10)],
+            updated=[(c['id'], "C renomeado", c['order_index'])],
+            deleted=[b['id']],
+        )
+        
+        topics = self.crud.get_topics_by_subject(sid)
+        assert [t['title'] for t in topics] == ["d", "a", "C renomeado"]
+        assert self.crud.get_subject_by_id(sid)['total_topics'] == 3
+    
+    def test_save_topic_edits_is_atomic(self):
+        """Test that a failing statement rolls back the whole session."""
+        sid = self.crud.add_subject_return_id("Matéria", "Cat", "#000000")
+        self.crud.add_topics_bulk(sid, ["a", "b"])
+        a, b = self.crud.get_topics_by_subject(sid)
+        
+        with pytest.raises(sqlite3.Error):
+            self.crud.save_topic_edits(
+                sid,
+                updated=[(a['id'], "a2", a['order_index'])],
+                deleted=[b['id']],
+                added=[(object(), 0)],  # Cannot be bound: fails after the first two statements
+            )
+        
+        assert [t['title'] for t in self.crud.get_topics_by_subject(sid)] == ["a", "b"]
+
+
+
+class TestReviewsCRUD:
+    """Tests for SQL-side review counts and per-tab pages."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def add_review(self, content, date_time, status=0):
+        self.crud.add_reminder(content, "Revisão", date_time)
+        rid = self.db.fetch_one("SELECT MAX(id) as id FROM reminders")['id']
+        if status:
+            self.crud.update_reminder_status(rid, status)
+        return rid
+    
+    def test_add_reminder_normalizes_date(self):
+        """Test that reminders from the modal (DD/MM/YYYY HH:MM) are stored in DB format."""
+        rid = self.add_review("Revisar", "05/03/2026 14:30")
+        row = self.db.fetch_one("SELECT date_time FROM reminders WHERE id = ?", (rid,))
+        assert row['date_time'] == "2026-03-05 14:30:00"
+    
+    def test_counts_split_late_against_now(self):
+        """Test per-tab counts from the aggregate query."""
+        from datetime import datetime
+        now = datetime(2026, 3, 10, 12, 0, 0)
+        self.add_review("atrasada 1", "01/03/2026 08:00")
+        self.add_review("atrasada 2", "2026-03-10 11:59:59")
+        self.add_review("vence agora", "2026-03-10 12:00:00")
+        self.add_review("programada", "2026-03-10 12:00:01")
+        self.add_review("feita", "2026-03-01 08:00:00", status=1)
+        self.add_review("ignorada", "2026-03-20 08:00:00", status=2)
+        self.crud.add_reminder("não é revisão", "Geral", "2026-03-01 08:00:00")
+        
+        counts = self.crud.get_review_counts(now)
+        
+        assert counts == {"PROGRAMADAS": 1, "ATRASADAS": 3, "CONCLUÍDAS": 1, "IGNORADAS": 1}
+        late = self.crud.get_reviews_page("ATRASADAS", now=now)
+        assert [r['content'] for r in late] == ["atrasada 1", "atrasada 2", "vence agora"]
+        # Same boundary as the reviews served as due
+        assert sorted(r['content'] for r in self.crud.get_due_reviews(now=now)) == sorted(r['content'] for r in late)
+    
+    def test_counts_follow_the_date_window(self):
+        """Test that the badges count the same window the list shows."""
+        from datetime import datetime, timedelta
+        now = datetime(2026, 3, 10, 12, 0, 0)
+        self.add_review("atrasada antiga", "2025-12-01 08:00:00")
+        self.add_review("atrasada recente", "2026-03-08 08:00:00")
+        self.add_review("programada", "2026-03-12 08:00:00")
+        window = {"now": now, "start": now - timedelta(days=7), "end": now + timedelta(days=7)}
+        
+        counts = self.crud.get_review_counts(**window)
+        
+        assert counts["ATRASADAS"] == len(self.crud.get_reviews_page("ATRASADAS", **window)) == 1
+        assert counts["PROGRAMADAS"] == 1
+        assert self.crud.get_review_counts(now)["ATRASADAS"] == 2
+    
+    def test_counts_empty(self):
+        """Test counts with no reviews."""
+        assert set(self.crud.get_review_counts().values()) == {0}
+    
+    def test_pagination_and_window(self):
+        """Test LIMIT/OFFSET and the date window on a tab."""
+        from datetime import datetime, timedelta
+        now = datetime(2026, 1, 1, 0, 0, 0)
+        for day in range(1, 61):
+            self.add_review(f"r{day:02d}", self.crud.format_datetime_db(now + timedelta(days=day)))
+        
+        first = self.crud.get_reviews_page("PROGRAMADAS", now=now, limit=25)
+        second = self.crud.get_reviews_page("PROGRAMADAS", now=now, limit=25, offset=25)
+        assert [r['content'] for r in first][:2] == ["r01", "r02"]
+        assert second[0]['content'] == "r26"
+        assert len(self.crud.get_reviews_page("PROGRAMADAS", now=now, limit=25, offset=50)) == 10
+        
+        windowed = self.crud.get_reviews_page("PROGRAMADAS", now=now, start=now, end=now + timedelta(days=7, hours=1))
+        assert [r['content'] for r in windowed] == [f"r{d:02d}" for d in range(1, 8)]
+    
+    def test_migration_normalizes_legacy_dates(self):
+        """Test that init rewrites legacy reminder dates in place."""
+        conn = self.db.get_connection()
+        conn.executemany("INSERT INTO reminders (content, category, date_time, status) VALUES (?, 'Revisão', ?, ?)", [
+            ("a", "05/03/2026 14:30", 0),
+            ("b", "06/03/2026", None),
+            ("c", "2026-03-07 09:15", 0),
+            ("d", "texto livre", 0),
+        ])
+        conn.commit()
+        
+        self.db._initialized = False
+        self.db.init_db()
+        
+        rows = self.db.fetch_all("SELECT content, date_time, status FROM reminders ORDER BY content")
+        assert [(r['date_time'], r['status']) for r in rows] == [
+            ("2026-03-05 14:30:00", 0),
+            ("2026-03-06 00:00:00", 0),
+            ("2026-03-07 09:15:00", 0),
+            ("texto livre", 0),
+        ]
+
+
+
+class TestSpacedRepetitionCRUD:
+    """Tests for review generation from study sessions."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.subject_id = self.crud.add_subject_return_id("Direito Penal", "Cat", "#000000")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def pending_reviews(self):
+        return self.db.fetch_all(
+            "SELECT * FROM reminders WHERE category = 'Revisão' AND status = 0 ORDER BY date_time")
+    
+    def test_session_schedules_next_review(self):
+        """Test that a session with schedule_review creates one review due after the interval."""
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 9, 1,
+                                    date="2026-03-01 10:00:00", schedule_review=True)
+        
+        (review,) = self.pending_reviews()
+        assert review['subject_id'] == self.subject_id
+        assert review['topic'] == "Dolo"
+        assert review['content'] == "Direito Penal: Dolo"
+        assert review['date_time'] == "2026-03-02 10:00:00"
+    
+    def test_default_does_not_schedule(self):
+        """Test that existing callers keep their behaviour."""
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "TEORIA")
+        assert self.pending_reviews() == []
+    
+    def test_repeated_sessions_replace_pending_review(self):
+        """Test that a topic has at most one pending generated review, moving further out."""
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                    date="2026-03-01 10:00:00", schedule_review=True)
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                    date="2026-03-02 10:00:00", schedule_review=True)
+        
+        (review,) = self.pending_reviews()
+        assert review['date_time'] == "2026-03-08 10:00:00"  # 6-day interval
+        state = self.db.fetch_one("SELECT * FROM review_schedule WHERE topic = 'Dolo'")
+        assert state['repetitions'] == 2
+    
+    def test_bulk_backlog_and_priority(self):
+        """Test generating thousands of reviews in one call and serving the most urgent first."""
+        from datetime import datetime
+        sessions = []
+        for i in range(3000):
+            # Old sessions with poor accuracy on some topics
+            wrong = 9 if i % 10 == 0 else 1
+            sessions.append((self.subject_id, f"T{i}", 10 - wrong, wrong, "2025-01-01 08:00:00"))
+        
+        assert self.crud.schedule_reviews_bulk(sessions) == 3000
+        assert len(self.pending_reviews()) == 3000
+        
+        due = self.crud.get_due_reviews(limit=10)
+        assert len(due) == 10
+        ratios = [r['overdue_ratio'] for r in due]
+        assert ratios == sorted(ratios, reverse=True)
+        # All due after one day; the low-ease (failed) topics come first on ties
+        assert all(r['topic'] in {f"T{i}" for i in range(0, 3000, 10)} for r in due)
+        
+        assert self.crud.get_due_reviews(now=datetime(2024, 1, 1)) == []
+    
+    def test_complete_review_schedules_next(self):
+        """Test that completing a generated review queues the following one."""
+        from datetime import datetime
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                    date="2026-03-01 10:00:00", schedule_review=True)
+        (review,) = self.pending_reviews()
+        
+        self.crud.complete_review(review['id'], now=datetime(2026, 3, 2, 10, 0, 0))
+        
+        (next_review,) = self.pending_reviews()
+        assert next_review['id'] != review['id']
+        assert next_review['date_time'] == "2026-03-08 10:00:00"
+    
+    def test_forgotten_review_comes_back_next_day(self):
+        """Test that grading a review as forgotten shortens the interval instead of growing it."""
+        from datetime import datetime
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                    date="2026-03-01 10:00:00", schedule_review=True)
+        (review,) = self.pending_reviews()
+        
+        self.crud.complete_review(review['id'], quality=1, now=datetime(2026, 3, 2, 10, 0, 0))
+        
+        (next_review,) = self.pending_reviews()
+        assert next_review['date_time'] == "2026-03-03 10:00:00"
+        state = self.db.fetch_one("SELECT repetitions, ease FROM review_schedule WHERE topic = 'Dolo'")
+        assert state['repetitions'] == 0 and state['ease'] < 2.5
+    
+    def test_ignored_review_restarts_the_cycle(self):
+        """Test that ignoring a review resets the topic to its initial state."""
+        from datetime import datetime
+        for day in (1, 2):
+            self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                        date=f"2026-03-0{day} 10:00:00", schedule_review=True)
+        (review,) = self.pending_reviews()
+        
+        self.crud.ignore_review(review['id'])
+        
+        assert self.pending_reviews() == []
+        assert self.db.fetch_one("SELECT status FROM reminders WHERE id = ?", (review['id'],))['status'] == 2
+        assert self.db.fetch_one("SELECT COUNT(*) as n FROM review_schedule")['n'] == 0
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "QUESTÕES", 10, 0,
+                                    date="2026-03-10 10:00:00", schedule_review=True)
+        (fresh,) = self.pending_reviews()
+        assert fresh['date_time'] == "2026-03-11 10:00:00"  # First interval again
+    
+    def test_delete_subject_removes_schedule(self):
+        """Test that deleting a subject drops its generated reviews."""
+        self.crud.add_study_session(self.subject_id, "Dolo", 3600, "TEORIA", schedule_review=True)
+        self.crud.delete_subject(self.subject_id)
+        
+        assert self.pending_reviews() == []
+        assert self.db.fetch_one("SELECT COUNT(*) as n FROM review_schedule")['n'] == 0
+
+
+
+class TestAllocationInputs:
+    """Tests for the daily plan queries."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.subject_id = self.crud.add_subject_return_id("Direito Penal", "Cat", "#000000")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_inputs_split_today_and_recent_window(self):
+        """Test that today's time and the 30-day accuracy come from one aggregate."""
+        from datetime import datetime
+        today = datetime(2026, 3, 10, 15, 0)
+        self.crud.add_study_session(self.subject_id, "A", 1800, "Teoria", 5, 5, date="2026-03-10 09:00:00")
+        self.crud.add_study_session(self.subject_id, "A", 600, "Teoria", 3, 1, date="2026-03-01 09:00:00")
+        self.crud.add_study_session(self.subject_id, "A", 900, "Teoria", 0, 50, date="2025-12-01 09:00:00")
+        
+        rows = {r['id']: r for r in self.crud.get_allocation_inputs(today)}
+        row = rows[self.subject_id]
+        
+        assert row['today_seconds'] == 1800
+        assert (row['recent_correct'], row['recent_wrong']) == (8, 6)
+        assert (row['relevance'], row['knowledge']) == (3, 2)
+        # Subjects without sessions still appear
+        assert len(rows) == len(self.crud.get_all_subjects())
+        assert all(r['today_seconds'] == 0 for sid, r in rows.items() if sid != self.subject_id)
+    
+    def test_today_seconds_for_selected_subjects(self):
+        """Test the incremental per-subject query."""
+        from datetime import datetime
+        today = datetime(2026, 3, 10, 15, 0)
+        other = self.crud.add_subject_return_id("Outra", "Cat", "#000000")
+        self.crud.add_study_session(self.subject_id, "A", 1200, "Teoria", date="2026-03-10 08:00:00")
+        self.crud.add_study_session(self.subject_id, "A", 300, "Teoria", date="2026-03-10 20:00:00")
+        self.crud.add_study_session(self.subject_id, "A", 999, "Teoria", date="2026-03-09 20:00:00")
+        
+        assert self.crud.get_today_seconds([self.subject_id, other], today) == {self.subject_id: 1500, other: 0}
+        assert self.crud.get_today_seconds([], today) == {}
+    
+    def test_daily_hours_default_and_override(self):
+        """Test availability per weekday with a default for unset days."""
+        assert self.crud.get_daily_hours(0) == self.crud.DEFAULT_DAILY_HOURS
+        
+        self.crud.set_study_availability({0: 4, 6: 0})
+        self.crud.set_study_availability({0: 3.5})
+        
+        assert self.crud.get_daily_hours(0) == 3.5
+        assert self.crud.get_daily_hours(6) == 0
+        assert self.crud.get_daily_hours(2) == self.crud.DEFAULT_DAILY_HOURS
+
+
+
+class TestStudyPlanCRUD:
+    """Tests for persisting the planning wizard and the study cycle."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.a = self.crud.add_subject_return_id("A", "Cat", "#111111")
+        self.b = self.crud.add_subject_return_id("B", "Cat", "#222222")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_save_study_plan_round_trip(self):
+        """Test that ratings, availability and slots are stored together."""
+        from src.utils.study_cycle import build_cycle
+        slots = build_cycle({self.a: 1.0, self.b: 2.0}, {0: 180, 3: 60})
+        
+        self.crud.save_study_plan({self.a: (5, 1), self.b: (2, 4)}, {0: 3, 3: 1, 6: 0}, slots)
+        
+        assert (self.crud.get_subject_by_id(self.a)['relevance'], self.crud.get_subject_by_id(self.a)['knowledge']) == (5, 1)
+        hours = self.crud.get_study_availability()
+        assert (hours[0], hours[3], hours[6]) == (3, 1, 0)
+        assert hours[1] == self.crud.DEFAULT_DAILY_HOURS
+        cycle = self.crud.get_study_cycle()
+        assert [(r['weekday'], r['position'], r['subject_id'], r['duration_minutes']) for r in cycle] == \
+            [tuple(s) for s in slots]
+        assert cycle[0]['name'] == "B"
+    
+    def test_saving_replaces_previous_cycle(self):
+        """Test that a new plan replaces the old slots."""
+        from src.utils.study_cycle import CycleSlot
+        self.crud.save_study_plan({}, {}, [CycleSlot(0, 0, self.a, 60), CycleSlot(1, 0, self.b, 60)])
+        self.crud.save_study_plan({}, {}, [CycleSlot(2, 0, self.b, 30)])
+        
+        assert [(r['weekday'], r['subject_id']) for r in self.crud.get_study_cycle()] == [(2, self.b)]
+    
+    def test_cycle_goals_per_weekday(self):
+        """Test today's planned seconds per subject from the cycle."""
+        from src.utils.study_cycle import CycleSlot
+        assert self.crud.get_cycle_goals(0) == {}
+        
+        self.crud.save_study_plan({}, {}, [
+            CycleSlot(0, 0, self.a, 60), CycleSlot(0, 1, self.b, 30), CycleSlot(0, 2, self.a, 30),
+            CycleSlot(1, 0, self.b, 90),
+        ])
+        
+        assert self.crud.get_cycle_goals(0) == {self.a: 5400, self.b: 1800}
+        assert self.crud.get_cycle_goals(1) == {self.a: 0, self.b: 5400}
+    
+    def test_delete_subject_removes_its_slots(self):
+        """Test that deleting a subject drops it from the cycle."""
+        from src.utils.study_cycle import CycleSlot
+        self.crud.save_study_plan({}, {}, [CycleSlot(0, 0, self.a, 60), CycleSlot(0, 1, self.b, 60)])
+        
+        self.crud.delete_subject(self.a)
+        
+        assert [r['subject_id'] for r in self.crud.get_study_cycle()] == [self.b]
+
+
+
+class TestTopicTreeCRUD:
+    """Tests for storing the edital tree and querying subtree progress."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.subject_id = self.crud.add_subject_return_id("Direito Administrativo", "Cat", "#000000")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def topics(self):
+        return {t['title']: t for t in self.crud.get_topics_by_subject(self.subject_id)}
+    
+    def test_bulk_import_stores_parent_and_path(self):
+        """Test that numbering depth becomes parent_id and path."""
+        self.crud.add_topics_bulk(self.subject_id, ["1. Atos", "1.1. Conceito", "1.2. Elementos", "2. Poderes"])
+        
+        t = self.topics()
+        assert t["1. Atos"]['path'] == "0001" and t["1. Atos"]['parent_id'] is None
+        assert t["1.1. Conceito"]['parent_id'] == t["1. Atos"]['id']
+        assert t["1.2. Elementos"]['path'] == "0001.0002"
+        assert self.crud.get_subject_by_id(self.subject_id)['total_topics'] == 4
+    
+    def test_second_import_appends_new_sections(self):
+        """Test that a later import does not collide with existing paths."""
+        self.crud.add_topics_bulk(self.subject_id, ["1. Atos", "1.1. Conceito"])
+        self.crud.add_topics_bulk(self.subject_id, ["1. Licitações", "1.1. Modalidades"])
+        
+        t = self.topics()
+        assert t["1. Licitações"]['path'] == "0002"
+        assert t["1.1. Modalidades"]['parent_id'] == t["1. Licitações"]['id']
+    
+    def test_subtree_progress_is_a_range_query(self):
+        """Test section progress through the (subject_id, path) range."""
+        self.crud.add_topics_bulk(self.subject_id, [
+            "1. Atos", "1.1. Conceito", "1.1.1. Detalhe", "1.2. Elementos", "2. Poderes", "2.1. Polícia",
+        ])
+        t = self.topics()
+        self.crud.toggle_topics_bulk({t["1.1.1. Detalhe"]['id']: True, t["1.2. Elementos"]['id']: True,
+                                      t["2.1. Polícia"]['id']: True})
+        
+        section_1 = self.crud.get_subtree_progress(self.subject_id, "0001")
+        assert (section_1['total'], section_1['completed']) == (4, 2)
+        branch = self.crud.get_subtree_progress(self.subject_id, "0001.0001")
+        assert (branch['total'], branch['completed']) == (2, 1)
+        assert self.crud.get_section_progress(self.subject_id) == {"0001": (4, 2), "0002": (2, 1)}
+        
+        plan = self.db.fetch_all("EXPLAIN QUERY PLAN SELECT COUNT(*) FROM topics WHERE subject_id = 1 AND path > '0001.' AND path < '0001/'")
+        assert any("idx_topics_subject_path" in row['detail'] for row in plan)
+    
+    def test_deleting_a_parent_detaches_children(self):
+        """Test that children do not keep a dangling parent id."""
+        self.crud.add_topics_bulk(self.subject_id, ["1. Atos", "1.1. Conceito"])
+        t = self.topics()
+        
+        self.crud.delete_topic(t["1. Atos"]['id'])
+        
+        assert self.topics()["1.1. Conceito"]['parent_id'] is None
+
+
+
+class TestMergeTopicsCRUD:
+    """Tests for re-importing an updated edital over existing topics."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.subject_id = self.crud.add_subject_return_id("Direito Constitucional", "Cat", "#000000")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def topics(self):
+        return {t['title']: t for t in self.crud.get_topics_by_subject(self.subject_id)}
+    
+    def test_merge_keeps_completion_and_material_link(self):
+        """Test that a retified edital updates matches instead of duplicating them."""
+        self.crud.add_topics_bulk(self.subject_id, [
+            "1. Direitos fundamentais", "1.1. Direitos individuais", "1.2. Direitos sociais", "2. Organização do Estado"])
+        before = self.topics()
+        self.crud.toggle_topic_complete(before["1.1. Direitos individuais"]['id'], True)
+        self.crud.update_topic(before["1.2. Direitos sociais"]['id'], material_link="http://pdf")
+        
+        result = self.crud.merge_topics(self.subject_id, [
+            "1. Direitos fundamentais", "1.1. Direitos e deveres individuais", "1.2. Direitos sociais",
+            "1.3. Nacionalidade", "2. Organização do Estado"])
+        
+        after = self.topics()
+        assert len(after) == 5
+        assert result == {"inserted": 1, "updated": 2, "deleted": 0, "kept": 0, "unchanged": 2}
+        renamed = after["1.1. Direitos e deveres individuais"]
+        assert renamed['id'] == before["1.1. Direitos individuais"]['id']
+        assert renamed['completed'] == 1
+        assert after["1.2. Direitos sociais"]['material_link'] == "http://pdf"
+        assert after["1.3. Nacionalidade"]['parent_id'] == after["1. Direitos fundamentais"]['id']
+        assert after["2. Organização do Estado"]['path'] == "0002"
+        subject = self.crud.get_subject_by_id(self.subject_id)
+        assert (subject['total_topics'], subject['completed_topics']) == (5, 1)
+    
+    def test_merge_deletes_removed_topics(self):
+        """Test that topics missing from the new edital are removed."""
+        self.crud.add_topics_bulk(self.subject_id, ["1. Poder Legislativo", "2. Processo legislativo", "3. Tribunais de contas"])
+        
+        result = self.crud.merge_topics(self.subject_id, ["1. Poder Legislativo", "2. Tribunais de Contas"])
+        
+        assert set(self.topics()) == {"1. Poder Legislativo", "2. Tribunais de Contas"}
+        assert result["deleted"] == 1 and result["inserted"] == 0
+    
+    def test_merge_keeps_removed_topics_with_progress(self):
+        """Test that completed, linked or studied topics survive a merge that drops them."""
+        self.crud.add_topics_bulk(self.subject_id, [
+            "1. Poder Executivo", "2. Poder Judiciário", "3. Ministério Público", "4. Defensoria", "5. Advocacia"])
+        before = self.topics()
+        self.crud.toggle_topic_complete(before["2. Poder Judiciário"]['id'], True)
+        self.crud.update_topic(before["3. Ministério Público"]['id'], material_link="http://pdf")
+        self.crud.add_study_session(self.subject_id, "4. Defensoria", 600, "Teoria")
+        
+        result = self.crud.merge_topics(self.subject_id, ["1. Poder Executivo", "2. Controle externo"])
+        
+        after = self.topics()
+        assert result["deleted"] == 1 and result["kept"] == 3
+        assert "5. Advocacia" not in after
+        assert after["2. Poder Judiciário"]['id'] == before["2. Poder Judiciário"]['id']
+        kept = [after[title] for title in ("2. Poder Judiciário", "3. Ministério Público", "4. Defensoria")]
+        assert [t['path'] for t in kept] == ["0003", "0004", "0005"]
+        assert all(t['parent_id'] is None for t in kept)
+        assert len(after) == 5
+    
+    def test_merge_same_edital_is_a_no_op(self):
+        """Test that re-importing the same file changes nothing."""
+        lines = ["1. Controle", "1.1. Difuso", "1.2. Concentrado"]
+        self.crud.add_topics_bulk(self.subject_id, lines)
+        
+        result = self.crud.merge_topics(self.subject_id, lines)
+        
+        assert result == {"inserted": 0, "updated": 0, "deleted": 0, "kept": 0, "unchanged": 3}
+        assert len(self.topics()) == 3
+    
+    def test_merge_matches_large_editais(self):
+        """Test that a 2000-topic merge pairs every rectified line with its topic."""
+        lines = [f"{i // 10 + 1}.{i % 10 + 1}. Tópico número {i} sobre tema {i * 7 % 97}" for i in range(2000)]
+        self.crud.add_topics_bulk(self.subject_id, lines)
+        updated = [line + " (retificado)" if i % 5 == 0 else line for i, line in enumerate(lines)]
+        
+        result = self.crud.merge_topics(self.subject_id, updated)
+        
+        assert result["inserted"] == 0 and result["deleted"] == 0
+        assert result["updated"] == 400
+
+
+
+class TestImportTopicsBulkCRUD:
+    """Tests for importing several editais in one transaction."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.penal = self.crud.add_subject_return_id("Direito Penal", "Cat", "#000000")
+        self.civil = self.crud.add_subject_return_id("Direito Civil", "Cat", "#000000")
+        
+        yield
+        
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def test_imports_every_subject(self):
+        """Test that each subject receives its own tree and stats."""
+        self.crud.import_topics_bulk({
+            self.penal: ["1. Crime", "1.1. Tipicidade"],
+            self.civil: ["1. Pessoas", "2. Bens", "3. Fatos jurídicos"],
+        })
+        
+        penal = self.crud.get_topics_by_subject(self.penal)
+        assert [t['title'] for t in penal] == ["1. Crime", "1.1. Tipicidade"]
+        assert penal[1]['parent_id'] == penal[0]['id']
+        assert self.crud.get_subject_by_id(self.civil)['total_topics'] == 3
+    
+    def test_merge_mode_returns_counts_per_subject(self):
+        """Test that merge=True merges each subject and reports its diff."""
+        self.crud.add_topics_bulk(self.penal, ["1. Crime", "2. Pena"])
+        
+        results = self.crud.import_topics_bulk({self.penal: ["1. Crime", "2. Penas"], self.civil: ["1. Pessoas"]}, merge=True)
+        
+        assert results[self.penal] == {"inserted": 0, "updated": 1, "deleted": 0, "kept": 0, "unchanged": 1}
+        assert results[self.civil]["inserted"] == 1
+    
+    def test_failure_writes_nothing(self):
+        """Test that one failing subject rolls back the whole import."""
+        with pytest.raises(Exception):
+            self.crud.import_topics_bulk({self.penal: ["1. Crime"], self.civil: None})
+        
+        assert self.crud.get_topics_by_subject(self.penal) == []
+        assert self.crud.get_topics_by_subject(self.civil) == []
+
+
+
+class TestUndoCRUD:
+    """Tests for undo/redo through the changelog."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test database."""
+        import src.data.database as database_module
+        original_db = database_module.db
+        
+        test_db = build_test_db(tmp_path)
+        
+        database_module.db = test_db
+        self.db = test_db
+        
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        self.crud.undo_history.clear()
+        self.subject_id = self.crud.add_subject_return_id("Direito Penal", "Cat", "#000000")
+        
+        yield
+        
+        self.crud.undo_history.clear()
+        database_module.db = original_db
+        test_db.close_all()
+    
+    def snapshot(self):
+        tables = ["subjects", "topics", "study_sessions", "plan_subjects", "review_schedule", "reminders"]
+        return {t: [dict(r) for r in self.db.fetch_all(f"SELECT * FROM {t} ORDER BY rowid")] for t in tables}
+    
+    def test_undo_and_redo_session_delete(self):
+        """Test that a deleted session comes back with the same id."""
+        self.crud.add_study_session(self.subject_id, "Crime", 3600, "TEORIA", 8, 2, date="2026-03-01 10:00:00")
+        session = self.db.fetch_one("SELECT * FROM study_sessions")
+        self.crud.delete_study_session(session['id'])
+        
+        assert self.crud.undo() == "Excluir sessão"
+        assert dict(self.db.fetch_one("SELECT * FROM study_sessions")) == dict(session)
+        
+        assert self.crud.redo() == "Excluir sessão"
+        assert self.db.fetch_one("SELECT * FROM study_sessions") is None
+    
+    def test_undo_subject_delete_restores_cascaded_rows(self):
+        """Test that topics, sessions, reviews and plan links come back."""
+        plan_id = self.crud.add_plan("TJ", "", subject_ids=[self.subject_id])
+        self.crud.add_topics_bulk(self.subject_id, ["1. Crime", "1.1. Tipicidade"])
+        self.crud.add_study_session(self.subject_id, "Crime", 3600, "QUESTÕES", 7, 3,
+                                    date="2026-03-01 10:00:00", schedule_review=True)
+        before = self.snapshot()
+        
+        self.crud.delete_subject(self.subject_id)
+        assert self.crud.get_subject_by_id(self.subject_id) is None
+        
+        assert self.crud.undo() == "Excluir disciplina"
+        assert self.snapshot() == before
+        assert [s['id'] for s in self.crud.get_subjects_by_plan(plan_id)] == [self.subject_id]
+    
+    def test_undo_bulk_import_and_edits(self):
+        """Test that an import is undone as one step and updates revert."""
+        self.crud.add_topics_bulk(self.subject_id, ["1. Crime", "2. Pena"])
+        topic_id = self.crud.get_topics_by_subject(self.subject_id)[0]['id']
+        self.crud.update_topic(topic_id, title="1. Teoria do crime")
+        
+        self.crud.undo()
+        assert self.crud.get_topics_by_subject(self.subject_id)[0]['title'] == "1. Crime"
+        self.crud.undo()
+        assert self.crud.get_topics_by_subject(self.subject_id) == []
+        assert self.crud.get_subject_by_id(self.subject_id)['total_topics'] == 0
+    
+    def test_new_command_clears_redo_and_stack_is_bounded(self):
+        """Test the usual stack rules."""
+        self.crud.add_reminder("a", "Geral", "2026-03-01 09:00")
+        self.crud.undo()
+        assert self.crud.undo_history.can_redo()
+        self.crud.add_reminder("b", "Geral", "2026-03-01 09:00")
+        assert not self.crud.undo_history.can_redo()
+        
+        for n in range(self.crud.undo_history.undo_stack.maxlen + 10):
+            self.crud.add_reminder(f"r{n}", "Geral", "2026-03-01 09:00")
+        assert len(self.crud.undo_history.undo_stack) == self.crud.undo_history.undo_stack.maxlen
+        assert self.crud.redo() is None
+    
+    def test_undo_mock_exam_removes_header_and_items(self):
+        """Test that a saved simulado is undone as one step, header included."""
+        exam_id = self.crud.save_mock_exam("Simulado TJ", "2026-03-01", 7.5, 10, "01:00", "Certo/Errado", "Cebraspe",
+                                           [(self.subject_id, 1.0, 8, 2, 0)])
+        assert self.db.fetch_one("SELECT COUNT(*) as n FROM mock_exam_items WHERE mock_exam_id = ?", (exam_id,))['n'] == 1
+        
+        assert self.crud.undo() == "Registrar simulado"
+        assert self.crud.get_mock_exams() == []
+        assert self.db.fetch_one("SELECT COUNT(*) as n FROM mock_exam_items")['n'] == 0
+    
+    def test_nested_calls_are_one_command(self):
+        """Test that add_topics_bulk (which calls import_topics_bulk) is one step."""
+        depth = len(self.crud.undo_history.undo_stack)
+        self.crud.add_topics_bulk(self.subject_id, ["1. Crime"])
+        assert len(self.crud.undo_history.undo_stack) == depth + 1
+    
+    def test_concurrent_writes_are_not_part_of_the_command(self):
+        """Test that another thread writing while a command runs keeps its own changes."""
+        import threading
+        
+        def other_thread():
+            self.crud.add_study_session(self.subject_id, "Pena", 600, "TEORIA", date="2026-03-02 10:00:00")
+            self.crud.add_reminder("fora do comando", "Geral", "2026-03-01 09:00")
+        
+        @self.crud.undoable("Comando lento")
+        def slow_command():
+            self.crud.add_study_session(self.subject_id, "Crime", 3600, "TEORIA", date="2026-03-01 10:00:00")
+            writer = threading.Thread(target=other_thread)
+            writer.start()
+            writer.join()
+            self.crud.add_reminder("dentro do comando", "Geral", "2026-03-01 09:00")
+        
+        slow_command()
+        
+        assert [c.label for c in self.crud.undo_history.undo_stack][-3:] == ["Registrar sessão", "Criar lembrete", "Comando lento"]
+        assert self.crud.undo() == "Comando lento"
+        topics = [r['topic'] for r in self.db.fetch_all("SELECT topic FROM study_sessions")]
+        reminders = [r['content'] for r in self.db.fetch_all("SELECT content FROM reminders")]
+        assert topics == ["Pena"]
+        assert reminders == ["fora do comando"]
+        
+        # The other thread's commands still undo on their own, once each
+        assert self.crud.undo() == "Criar lembrete"
+        assert self.crud.undo() == "Registrar sessão"
+        assert self.db.fetch_one("SELECT COUNT(*) as n FROM study_sessions")['n'] == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
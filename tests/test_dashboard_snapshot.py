@@ -0,0 +1,144 @@
+"""
+Unit tests for the persisted dashboard view-model.
+Run with: pytest tests/test_dashboard_snapshot.py -v
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+
+class TestDashboardSnapshot:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data import dashboard_snapshot
+        from src.data.forecast import forecast
+        forecast.invalidate()  # cached pace belongs to the previous test's database
+        self.snapshot = dashboard_snapshot
+        self.tmp_path = tmp_path
+
+        yield
+
+        database_module.db = original_db
+        test_db.close_all()
+
+    def test_snapshot_lives_next_to_database(self):
+        assert self.snapshot.snapshot_path() == str(self.tmp_path / self.snapshot.SNAPSHOT_FILE)
+
+    def test_view_model_reflects_database(self):
+        sid = self.crud.get_all_subjects()[0]['id']
+        self.crud.add_study_session(sid, "Tópico", 5400, "Teoria", correct=8, wrong=2)
+        self.crud.add_reminder("Revisar", "Geral", "2026-01-01 10:00")
+
+        vm = self.snapshot.build_view_model()
+
+        assert vm['stats'] == {"total_seconds": 5400, "total_correct": 8, "total_wrong": 2}
+        assert len(vm['weekly']) == 7
+        assert vm['recent'][0]['duration_seconds'] == 5400
+        assert vm['reminders'][0]['content'] == "Revisar"
+        # Plain data only: must survive a JSON round trip unchanged
+        assert json.loads(json.dumps(vm)) == vm
+
+    def test_save_and_load_round_trip(self):
+        vm = self.snapshot.build_view_model()
+        self.snapshot.save_snapshot(vm)
+
+        assert self.snapshot.load_snapshot() == vm
+        assert not os.path.exists(self.snapshot.snapshot_path() + ".tmp")
+
+    def test_missing_corrupt_or_outdated_snapshot_is_ignored(self):
+        assert self.snapshot.load_snapshot() is None
+
+        path = self.snapshot.snapshot_path()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        assert self.snapshot.load_snapshot() is None
+
+        vm = self.snapshot.build_view_model()
+        vm['version'] = self.snapshot.SNAPSHOT_VERSION + 1
+        self.snapshot.save_snapshot(vm)
+        assert self.snapshot.load_snapshot() is None
+
+    def test_same_data_ignores_computed_at(self):
+        a = self.snapshot.build_view_model()
+        b = dict(a, computed_at="1999-01-01 00:00:00")
+        assert self.snapshot.same_data(a, b)
+
+        sid = self.crud.get_all_subjects()[0]['id']
+        self.crud.add_study_session(sid, "Tópico", 60, "Teoria")
+        assert not self.snapshot.same_data(a, self.snapshot.build_view_model())
+        assert not self.snapshot.same_data(a, None)
+
+    def test_daily_plan_allocates_available_hours(self):
+        from datetime import datetime
+        today = datetime(2026, 3, 10, 15, 0)
+        self.crud.set_study_availability({today.weekday(): 3})
+        sid = self.crud.get_all_subjects()[0]['id']
+        self.crud.add_study_session(sid, "Tópico", 1200, "Teoria", date="2026-03-10 09:00:00")
+
+        plan = self.snapshot.build_daily_plan(today)
+
+        assert plan['date'] == "2026-03-10"
+        assert plan['available_seconds'] == 3 * 3600
+        assert sum(i['goal_seconds'] for i in plan['items']) == 3 * 3600
+        studied = {i['subject_id']: i['studied_seconds'] for i in plan['items']}
+        assert studied[sid] == 1200
+
+    def test_session_change_patches_plan_without_reallocating(self):
+        from datetime import datetime
+        today = datetime(2026, 3, 10, 15, 0)
+        subjects = self.crud.get_all_subjects()
+        sid, other = subjects[0]['id'], subjects[1]['id']
+        vm = self.snapshot.build_view_model(today=today)
+        goals = {i['subject_id']: i['goal_seconds'] for i in vm['plan']['items']}
+
+        # Accuracy changes priorities, but goals stay fixed for the day
+        self.crud.add_study_session(sid, "Tópico", 900, "Teoria", 0, 20, date="2026-03-10 16:00:00")
+        self.crud.add_study_session(other, "Tópico", 600, "Teoria", date="2026-03-10 16:30:00")
+        patched = self.snapshot.build_view_model(vm, changed_subject_ids={sid}, today=today)
+
+        items = {i['subject_id']: i for i in patched['plan']['items']}
+        assert {k: i['goal_seconds'] for k, i in items.items()} == goals
+        assert items[sid]['studied_seconds'] == 900
+        # Not in the change set: left as it was
+        assert items[other]['studied_seconds'] == 0
+
+        # A new day (or no change set) reallocates from scratch
+        fresh = self.snapshot.build_view_model(patched, changed_subject_ids={sid}, today=datetime(2026, 3, 11, 8, 0))
+        assert fresh['plan']['date'] == "2026-03-11"
+        assert all(i['studied_seconds'] == 0 for i in fresh['plan']['items'])
+
+    def test_daily_plan_follows_saved_cycle(self):
+        from datetime import datetime
+        from src.utils.study_cycle import CycleSlot
+        today = datetime(2026, 3, 10, 15, 0)  # Tuesday
+        sid = self.crud.get_all_subjects()[0]['id']
+        self.crud.save_study_plan({}, {}, [CycleSlot(today.weekday(), 0, sid, 90)])
+
+        plan = self.snapshot.build_daily_plan(today)
+
+        goals = {i['subject_id']: i['goal_seconds'] for i in plan['items']}
+        assert goals[sid] == 5400
+        assert plan['available_seconds'] == 5400
+        assert sum(goals.values()) == 5400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Unit tests and a micro-benchmark for date parsing/formatting.
+Run with: pytest tests/test_date_utils.py -v
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import date_utils
+from src.utils.date_utils import (
+    format_datetime_display,
+    format_datetimes,
+    parse_datetime,
+    parse_datetimes,
+)
+
+
+class TestParseDatetime:
+    def test_all_supported_formats(self):
+        assert parse_datetime("2026-03-01 14:05:09") == datetime(2026, 3, 1, 14, 5, 9)
+        assert parse_datetime("2026-03-01") == datetime(2026, 3, 1)
+        assert parse_datetime("01/03/2026 14:05") == datetime(2026, 3, 1, 14, 5)
+        assert parse_datetime("01/03/2026") == datetime(2026, 3, 1)
+
+    def test_invalid_returns_default(self):
+        default = datetime(2000, 1, 1)
+        assert parse_datetime("ontem", default) == default
+        assert parse_datetime("2026-13-45 00:00:00", default) == default
+        assert parse_datetime("", default) == default
+        assert parse_datetime(None, default) == default
+        assert parse_datetime(12345, default) == default
+
+    def test_default_is_now(self):
+        before = datetime.now()
+        assert parse_datetime("inválido") >= before
+
+    def test_datetime_passthrough(self):
+        dt = datetime(2026, 1, 2, 3, 4, 5)
+        assert parse_datetime(dt) is dt
+
+
+class TestBatchHelpers:
+    def test_parse_datetimes(self):
+        values = ["2026-03-01 10:00:00", "lixo", None, "2026-03-01 10:00:00", "02/03/2026"]
+        parsed = parse_datetimes(values)
+        assert parsed == [
+            datetime(2026, 3, 1, 10), None, None, datetime(2026, 3, 1, 10), datetime(2026, 3, 2)
+        ]
+        default = datetime(1999, 1, 1)
+        assert parse_datetimes(["lixo"], default=default) == [default]
+
+    def test_format_datetimes(self):
+        values = ["2026-03-01 10:30:00", "sem data", None]
+        assert format_datetimes(values, "%d/%m %H:%M") == ["01/03 10:30", "sem data", None]
+        assert format_datetimes(values, "%H:%M", fallback="") == ["10:30", "", ""]
+
+    def test_format_display(self):
+        assert format_datetime_display("2026-03-01 10:30:00") == "01/03/2026 10:30"
+        assert format_datetime_display(datetime(2026, 3, 1, 10, 30), "%H:%M") == "10:30"
+        assert format_datetime_display(None) == ""
+
+
+def test_history_column_matches_strptime_cascade():
+    """
+    A history-sized column (many sessions, few distinct days repeated),
+    converted in batch, gives the same strings as the old per-row strptime
+    cascade.
+    """
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    values = [
+        (start + timedelta(hours=i * 7 % 2000)).strftime("%Y-%m-%d %H:%M:%S")
+        for i in range(20000)
+    ]
+
+    def old_way():
+        out = []
+        for v in values:
+            for fmt in date_utils.DATE_FORMATS:
+                try:
+                    out.append(datetime.strptime(v, fmt).strftime("%d/%m %H:%M"))
+                    break
+                except ValueError:
+                    continue
+        return out
+
+    date_utils._parse.cache_clear()
+    date_utils._format.cache_clear()
+
+    assert format_datetimes(values, "%d/%m %H:%M") == old_way()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
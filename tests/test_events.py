@@ -0,0 +1,146 @@
+"""
+Unit tests for the in-process event bus.
+Run with: pytest tests/test_events.py -v
+"""
+
+import gc
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.events import Event, EventBus, EventType
+
+
+class Recorder:
+    """Subscriber stand-in for a page."""
+
+    def __init__(self):
+        self.calls = []
+        self.delivered = threading.Event()
+
+    def on_events(self, events):
+        self.calls.append(events)
+        self.delivered.set()
+
+
+class TestEvent:
+    def test_ids_normalized_to_frozensets(self):
+        ev = Event(EventType.SESSION_ADDED, [1, 2, None], (3,))
+        assert ev.ids == frozenset({1, 2})
+        assert ev.subject_ids == frozenset({3})
+
+    def test_merge_unions_ids(self):
+        a = Event(EventType.TOPIC_TOGGLED, [1], [10])
+        b = Event(EventType.TOPIC_TOGGLED, [2], [11])
+        merged = a.merge(b)
+        assert merged.ids == {1, 2}
+        assert merged.subject_ids == {10, 11}
+
+
+class TestEventBus:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Long delay so nothing is delivered unless the test flushes
+        self.bus = EventBus(delay=60, max_delay=60)
+        yield
+        self.bus.flush()
+
+    def test_burst_is_coalesced_into_one_delivery(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events)
+
+        for tid in range(30):
+            self.bus.publish(EventType.TOPIC_TOGGLED, ids=[tid], subject_ids=[tid % 3])
+        self.bus.flush()
+
+        assert len(rec.calls) == 1
+        (event,) = rec.calls[0]
+        assert event.type is EventType.TOPIC_TOGGLED
+        assert event.ids == frozenset(range(30))
+        assert event.subject_ids == {0, 1, 2}
+
+    def test_mixed_types_delivered_together(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events)
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.publish(EventType.PLAN_CHANGED, ids=[5])
+        self.bus.flush()
+
+        assert len(rec.calls) == 1
+        assert {ev.type for ev in rec.calls[0]} == {EventType.SESSION_ADDED, EventType.PLAN_CHANGED}
+
+    def test_type_filter(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events, types=[EventType.PLAN_CHANGED])
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.flush()
+        assert rec.calls == []
+
+        self.bus.publish(EventType.PLAN_CHANGED, ids=[2])
+        self.bus.flush()
+        assert len(rec.calls) == 1
+
+    def test_unsubscribe(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events)
+        self.bus.unsubscribe(rec.on_events)
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.flush()
+        assert rec.calls == []
+
+    def test_subscribe_twice_delivers_once(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events)
+        self.bus.subscribe(rec.on_events)
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.flush()
+        assert len(rec.calls) == 1
+
+    def test_collected_subscriber_is_dropped(self):
+        rec = Recorder()
+        self.bus.subscribe(rec.on_events)
+        del rec
+        gc.collect()
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.flush()
+        assert self.bus._subscribers == []
+
+    def test_failing_handler_does_not_block_others(self):
+        class Broken:
+            def on_events(self, events):
+                raise RuntimeError("boom")
+
+        broken = Broken()
+        rec = Recorder()
+        self.bus.subscribe(broken.on_events)
+        self.bus.subscribe(rec.on_events)
+
+        self.bus.publish(EventType.SESSION_ADDED, ids=[1])
+        self.bus.flush()
+        assert len(rec.calls) == 1
+
+
+def test_debounced_delivery_happens_on_timer():
+    bus = EventBus(delay=0.01, max_delay=0.05)
+    rec = Recorder()
+    bus.subscribe(rec.on_events)
+
+    for i in range(5):
+        bus.publish(EventType.SESSION_ADDED, ids=[i])
+
+    assert rec.delivered.wait(timeout=2)
+    assert len(rec.calls) == 1
+    assert rec.calls[0][0].ids == frozenset(range(5))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,162 @@
+"""
+Unit tests for the streaming CSV / JSON Lines export.
+Run with: pytest tests/test_export.py -v
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+
+def populate(crud, sessions=500):
+    """Deterministic dataset touching every exported table."""
+    subject_ids = [s['id'] for s in crud.get_all_subjects()]
+    for i, sid in enumerate(subject_ids):
+        crud.add_topics_bulk(sid, [f"Tópico {i}.{n}, com \"aspas\"" for n in range(5)])
+    for n in range(sessions):
+        sid = subject_ids[n % len(subject_ids)]
+        crud.add_study_session(sid, f"Tópico {n % 5}", 60 * (n % 90 + 1), "QUESTÕES", n % 7, n % 3,
+                               date=f"2026-01-{n % 28 + 1:02d} 10:{n % 60:02d}:00")
+    crud.add_mock_exam("Simulado 1", "2026-02-01", 70.5, 100, 3600)
+    exam_id = crud.get_mock_exams()[0]['id']
+    crud.add_mock_exam_items_bulk(exam_id, [(sid, 1.0, 5, 2, 1) for sid in subject_ids])
+    crud.add_reminder("Revisar\nlinha dupla", "Geral", "2026-02-02 09:00")
+
+
+class TestExport:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+        self.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data import export
+        self.export = export
+        self.out = str(tmp_path / "export")
+
+        yield
+
+        database_module.db = original_db
+        test_db.close_all()
+
+    def db_rows(self, table):
+        return [dict(r) for r in self.db.fetch_all(f"SELECT * FROM {table} ORDER BY rowid")]
+
+    def test_jsonl_round_trip(self):
+        populate(self.crud)
+
+        counts = self.export.export_tables(self.out, "jsonl", chunk_size=64)
+
+        for table in self.export.EXPORT_TABLES:
+            rows = list(self.export.read_export(os.path.join(self.out, table + ".jsonl")))
+            assert rows == self.db_rows(table)
+            assert counts[table] == len(rows)
+        assert counts["study_sessions"] == 500
+
+    def test_csv_round_trip(self):
+        populate(self.crud)
+
+        self.export.export_tables(self.out, "csv", chunk_size=64)
+
+        for table in self.export.EXPORT_TABLES:
+            rows = list(self.export.read_export(os.path.join(self.out, table + ".csv")))
+            expected = [{k: "" if v is None else str(v) for k, v in r.items()} for r in self.db_rows(table)]
+            assert rows == expected
+
+    def test_empty_table_still_has_csv_header(self):
+        self.export.export_tables(self.out, "csv", tables=["reminders"])
+
+        with open(os.path.join(self.out, "reminders.csv"), encoding="utf-8") as f:
+            assert f.read().startswith("id,content,category,date_time")
+
+    def test_progress_and_chunking(self):
+        populate(self.crud, sessions=250)
+        chunks = [len(rows) for _, rows in self.export.iter_chunks("study_sessions", chunk_size=100)]
+        assert chunks == [100, 100, 50]
+
+        progress = []
+        self.export.export_tables(self.out, "csv", tables=["study_sessions"], chunk_size=100,
+                                  on_progress=lambda done, total: progress.append((done, total)))
+        assert progress == [(100, 250), (200, 250), (250, 250), (250, 250)]
+
+    def test_memory_stays_flat(self):
+        sid = self.crud.get_all_subjects()[0]['id']
+        self.db.get_connection().executemany(
+            "INSERT INTO study_sessions (subject_id, topic, date, duration_seconds, type) VALUES (?, ?, ?, ?, ?)",
+            [(sid, "x" * 200, "2026-01-01 10:00:00", 60, "Teoria") for _ in range(20000)])
+        self.db.get_connection().commit()
+
+        tracemalloc.start()
+        self.export.export_tables(self.out, "jsonl", tables=["study_sessions"], chunk_size=500)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # The file is ~5 MB; only a chunk is ever held in memory
+        assert os.path.getsize(os.path.join(self.out, "study_sessions.jsonl")) > 4_000_000
+        assert peak < 1_500_000
+
+    def test_background_export_and_cancel(self):
+        populate(self.crud)
+        done = threading.Event()
+        results = []
+
+        def on_done(result, error):
+            results.append((result, error))
+            done.set()
+
+        self.export.start_export(self.out, "csv", on_done=on_done)
+        assert done.wait(10)
+        assert results[0][1] is None
+        assert results[0][0]["study_sessions"] == 500
+
+        # Cancelled before the first chunk: no partial files are left behind
+        done.clear()
+        results.clear()
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(self.export.ExportCancelled):
+            self.export.export_tables(str(self.out) + "_2", "csv", cancel=cancel)
+        assert os.listdir(str(self.out) + "_2") == []
+
+    def test_cancel_mid_export_keeps_the_previous_files(self):
+        populate(self.crud)
+        self.export.export_tables(self.out, "csv")
+        before = {name: open(os.path.join(self.out, name), encoding="utf-8").read() for name in os.listdir(self.out)}
+        self.crud.add_subject_return_id("Nova", "Cat", "#000000")
+
+        cancel = threading.Event()
+
+        def cancel_after_first_table(done, total):
+            if done >= self.export.count_rows("subjects"):
+                cancel.set()
+
+        with pytest.raises(self.export.ExportCancelled):
+            self.export.export_tables(self.out, "csv", on_progress=cancel_after_first_table, cancel=cancel)
+
+        after = {name: open(os.path.join(self.out, name), encoding="utf-8").read() for name in os.listdir(self.out)}
+        assert after == before
+
+    def test_rejects_unknown_format_and_table(self):
+        with pytest.raises(ValueError):
+            self.export.export_tables(self.out, "xml")
+        with pytest.raises(ValueError):
+            list(self.export.iter_chunks("sqlite_master"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""
+Unit tests for the edital completion forecast.
+Run with: pytest tests/test_forecast.py -v
+"""
+
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+TODAY = datetime(2026, 3, 10, 12, 0)
+
+
+class TestCompletionForecast:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+        self.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data import forecast as forecast_module
+        self.module = forecast_module
+        self.forecast = forecast_module.CompletionForecast()
+
+        self.sid = self.crud.add_subject_return_id("Penal", "Cat", "#000000")
+        self.crud.add_topics_bulk(self.sid, [f"T{i}" for i in range(40)])
+        self.topic_ids = [t['id'] for t in self.crud.get_topics_by_subject(self.sid)]
+
+        yield
+
+        database_module.db = original_db
+        test_db.close_all()
+
+    def complete(self, topic_ids, completed_at):
+        self.crud.toggle_topics_bulk({tid: True for tid in topic_ids})
+        placeholders = ",".join("?" * len(topic_ids))
+        self.db.execute_query(f"UPDATE topics SET completed_at = ? WHERE id IN ({placeholders})",
+                              (completed_at, *topic_ids))
+
+    def test_toggle_stamps_and_clears_completed_at(self):
+        tid = self.topic_ids[0]
+        self.crud.toggle_topic_complete(tid, True)
+        stamped = self.db.fetch_one("SELECT completed_at FROM topics WHERE id = ?", (tid,))['completed_at']
+        assert stamped is not None
+
+        # Completing again keeps the first timestamp
+        self.crud.toggle_topics_bulk({tid: True})
+        assert self.db.fetch_one("SELECT completed_at FROM topics WHERE id = ?", (tid,))['completed_at'] == stamped
+
+        self.crud.toggle_topics_bulk({tid: False})
+        assert self.db.fetch_one("SELECT completed_at FROM topics WHERE id = ?", (tid,))['completed_at'] is None
+
+    def test_pace_windows(self):
+        self.complete(self.topic_ids[:7], "2026-03-09 10:00:00")  # in both windows
+        self.complete(self.topic_ids[7:10], "2026-02-20 10:00:00")  # 30-day window only
+        self.complete(self.topic_ids[10:12], "2025-12-01 10:00:00")  # too old
+
+        row = next(r for r in self.crud.get_completion_pace((7, 30), TODAY) if r['subject_id'] == self.sid)
+        assert (row['done_7'], row['done_30']) == (7, 10)
+        assert (row['total_topics'], row['completed_topics']) == (40, 12)
+
+    def test_projects_readiness_date(self):
+        self.complete(self.topic_ids[:7], "2026-03-09 10:00:00")
+        self.complete(self.topic_ids[7:22], "2026-02-20 10:00:00")
+
+        outlook = self.forecast.forecast([self.sid], today=TODAY)
+
+        # 7/7 = 1.0 per day and 22/30 per day, blended
+        per_day = (1.0 + 22 / 30) / 2
+        assert outlook.pending == 18
+        assert outlook.per_day == pytest.approx(per_day)
+        assert outlook.ready_on == date(2026, 3, 31)  # ceil(18 / 0.8667) = 21 days
+
+    def test_no_pace_or_nothing_pending(self):
+        assert self.forecast.forecast([self.sid], today=TODAY).ready_on is None
+
+        self.complete(self.topic_ids, "2026-03-01 10:00:00")
+        self.forecast.invalidate([self.sid])
+        assert self.forecast.forecast([self.sid], today=TODAY).ready_on == TODAY.date()
+
+    def test_refreshes_only_invalidated_subjects(self, monkeypatch):
+        other = self.crud.add_subject_return_id("Civil", "Cat", "#000000")
+        self.crud.add_topics_bulk(other, ["A", "B"])
+        self.forecast.forecast(today=TODAY)
+
+        calls = []
+        original = self.crud.get_completion_pace
+        monkeypatch.setattr(self.crud, "get_completion_pace",
+                            lambda windows, today=None, subject_ids=None: calls.append(subject_ids) or
+                            original(windows, today, subject_ids))
+
+        # Cached: no query
+        self.forecast.forecast([self.sid, other], today=TODAY)
+        assert calls == []
+
+        self.complete(self.topic_ids[:5], "2026-03-10 09:00:00")
+        self.forecast.on_events([self.toggled_event(self.sid)])
+        outlook = self.forecast.forecast([self.sid, other], today=TODAY)
+        assert calls == [{self.sid}]
+        assert outlook.pending == 35 + 2
+
+        # A new day reloads everything
+        self.forecast.forecast(today=datetime(2026, 3, 11, 8, 0))
+        assert calls[-1] is None
+
+    def test_deleted_subject_leaves_the_pace(self):
+        other = self.crud.add_subject_return_id("Civil", "Cat", "#000000")
+        self.crud.add_topics_bulk(other, ["A", "B", "C", "D"])
+        other_topics = [t['id'] for t in self.crud.get_topics_by_subject(other)]
+        self.complete(other_topics[:3], "2026-03-09 10:00:00")
+        self.complete(self.topic_ids[:7], "2026-03-09 10:00:00")
+        before = self.forecast.forecast(today=TODAY)
+
+        self.crud.delete_subject(other)
+        self.forecast.on_events([self.toggled_event(other)])
+        after = self.forecast.forecast(today=TODAY)
+
+        assert after.per_day < before.per_day
+        assert after == self.module.CompletionForecast().forecast(today=TODAY)
+
+    def toggled_event(self, subject_id):
+        from src.utils.events import Event, EventType
+        return Event(EventType.TOPIC_TOGGLED, {1}, {subject_id})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,62 @@
+"""
+Unit tests for the parsed-PDF disk cache.
+Run with: pytest tests/test_parse_cache.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.parse_cache import ParseCache, content_key
+
+
+def write_pdf(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestContentKey:
+    def test_same_content_same_key(self, tmp_path):
+        a = write_pdf(tmp_path / "a.pdf", b"%PDF edital 2024")
+        b = write_pdf(tmp_path / "copia.pdf", b"%PDF edital 2024")
+        assert content_key(a) == content_key(b)
+
+    def test_content_and_version_change_the_key(self, tmp_path):
+        a = write_pdf(tmp_path / "a.pdf", b"%PDF edital 2024")
+        b = write_pdf(tmp_path / "b.pdf", b"%PDF edital 2025")
+        assert content_key(a) != content_key(b)
+        assert content_key(a, version=1) != content_key(a, version=2)
+
+
+class TestParseCache:
+    def test_round_trip(self, tmp_path):
+        cache = ParseCache(str(tmp_path / "cache"))
+        assert cache.get("abc-v2") is None
+        cache.put("abc-v2", ["1. Direito", "1.1 Princípios"])
+        assert cache.get("abc-v2") == ["1. Direito", "1.1 Princípios"]
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ParseCache(str(tmp_path))
+        (tmp_path / "bad-v2.json").write_text("{not json")
+        assert cache.get("bad-v2") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        topics = ["x" * 100]
+        cache = ParseCache(str(tmp_path), max_bytes=350)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.put(key, topics)
+            os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+        cache.get("a")  # a is now the most recent
+
+        cache.put("d", topics)
+
+        assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json", "d.json"]
+
+    def test_total_size_stays_within_budget(self, tmp_path):
+        cache = ParseCache(str(tmp_path), max_bytes=1000)
+        for i in range(30):
+            cache.put(f"k{i}", [f"{i}. Tópico"] * 10)
+        total = sum(os.path.getsize(tmp_path / n) for n in os.listdir(tmp_path))
+        assert total <= 1000
+        assert cache.get("k29") is not None
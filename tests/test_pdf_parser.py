@@ -0,0 +1,172 @@
+"""
+Unit tests for the page-by-page edital parser and its worker process.
+Run with: pytest tests/test_pdf_parser.py -v
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.pdf_parser import BatchExtraction, PDFExtractionJob, PDFParser, topics_from_text
+
+PAGES = [
+    "EDITAL\n1. Direito Constitucional\n1.1. Princípios\nTexto corrido\n",
+    "• Controle de constitucionalidade\n- Poder constituinte\n",
+    "",
+    "2 Direito Administrativo\n2.1.3. Atos administrativos",
+]
+
+
+def fake_pages(file_path):
+    for text in PAGES:
+        yield len(PAGES), text
+
+
+def slow_pages(file_path):
+    for n in range(1000):
+        time.sleep(0.01)
+        yield 1000, f"{n}. Tópico {n}"
+
+
+def stuck_pages(file_path):
+    yield 2, "1. Primeiro"
+    time.sleep(60)
+    yield 2, "2. Nunca"
+
+
+def failing_pages(file_path):
+    yield 2, "1. Primeiro"
+    raise RuntimeError("arquivo corrompido")
+
+
+def pages_by_name(file_path):
+    """Each fake file holds its own name as topics; "ruim" files fail."""
+    if "ruim" in file_path:
+        raise RuntimeError("arquivo corrompido")
+    for n in range(1, 4):
+        yield 3, f"{n}. {file_path} {n}"
+
+
+class TestTopicsFromText:
+    def test_numbered_and_bulleted_lines(self):
+        assert topics_from_text(PAGES[0]) == ["1. Direito Constitucional", "1.1. Princípios"]
+        assert topics_from_text(PAGES[1]) == ["• Controle de constitucionalidade", "- Poder constituinte"]
+        assert topics_from_text("") == []
+
+    def test_iter_topics_streams_pages(self):
+        pages = list(PDFParser().iter_topics("edital.pdf", page_texts=fake_pages))
+        assert [(n, total) for n, total, _ in pages] == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        assert pages[3][2] == ["2 Direito Administrativo", "2.1.3. Atos administrativos"]
+
+    def test_large_document_keeps_every_topic(self):
+        def many_pages(file_path):
+            for n in range(2000):
+                yield 2000, "\n".join(f"{n}.{i}. Tópico" for i in range(20))
+
+        count = sum(len(t) for _, _, t in PDFParser().iter_topics("x.pdf", page_texts=many_pages))
+        assert count == 40000
+
+
+class TestPDFExtractionJob:
+    def test_streams_pages_then_done(self):
+        job = PDFExtractionJob("edital.pdf", page_texts=fake_pages).start()
+        messages = list(job.messages())
+
+        assert [m[0] for m in messages] == ["page"] * 4 + ["done"]
+        assert [m[1:3] for m in messages[:4]] == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        topics = [t for m in messages[:4] for t in m[3]]
+        assert len(topics) == 6
+        assert not job.process.is_alive()
+
+    def test_cancel_stops_after_current_page(self):
+        job = PDFExtractionJob("edital.pdf", page_texts=slow_pages).start()
+        received = []
+        for message in job.messages():
+            received.append(message[0])
+            if len(received) == 3:
+                job.cancel()
+        assert received[-1] == "cancelled"
+        assert received.count("page") < 50
+
+    def test_cancel_kills_a_stuck_worker(self):
+        job = PDFExtractionJob("edital.pdf", page_texts=stuck_pages, grace=0.3).start()
+        messages = job.messages()
+        assert next(messages)[0] == "page"
+        job.cancel()
+        assert next(messages) == ("cancelled",)
+        assert not job.process.is_alive()
+
+    def test_errors_are_reported(self):
+        job = PDFExtractionJob("edital.pdf", page_texts=failing_pages).start()
+        messages = list(job.messages())
+        assert messages[-1] == ("error", "arquivo corrompido")
+
+    def test_messages_left_by_an_exited_worker_are_drained(self):
+        import queue
+
+        class LateQueue(queue.Queue):
+            """The worker's last messages only show up after the poll timed out."""
+            def get(self, block=True, timeout=None):
+                raise queue.Empty
+
+            def get_nowait(self):
+                return super().get(block=False)
+
+        class ExitedProcess:
+            def is_alive(self):
+                return False
+
+            def join(self, timeout=None):
+                pass
+
+        job = PDFExtractionJob("edital.pdf", poll_timeout=0.01)
+        job.queue = LateQueue()
+        job.queue.put(("page", 1, 1, ["1. Primeiro"]))
+        job.queue.put(("done",))
+        job.process = ExitedProcess()
+
+        assert [m[0] for m in job.messages()] == ["page", "done"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+class TestBatchExtraction:
+    def test_files_parse_in_parallel_in_input_order(self):
+        pages = []
+        files = []
+        extraction = BatchExtraction(["penal.pdf", "civil.pdf", "ruim.pdf"], page_texts=pages_by_name, max_workers=2)
+        results = extraction.run(
+            on_page=lambda index, number, total: pages.append((index, number, total)),
+            on_file=lambda index, result: files.append(index),
+        )
+
+        assert results[0] == ("done", ["1. penal.pdf 1", "2. penal.pdf 2", "3. penal.pdf 3"])
+        assert results[1][1][0] == "1. civil.pdf 1"
+        assert results[2] == ("error", "arquivo corrompido")
+        assert sorted(files) == [0, 1, 2]
+        assert sorted(p for p in pages if p[0] == 0) == [(0, 1, 3), (0, 2, 3), (0, 3, 3)]
+
+    def test_cancel_stops_every_file(self):
+        extraction = BatchExtraction(["a.pdf", "b.pdf"], page_texts=slow_pages, max_workers=2)
+        seen = []
+
+        def on_page(index, number, total):
+            seen.append(index)
+            if len(seen) == 5:
+                extraction.cancel()
+
+        results = extraction.run(on_page=on_page)
+        assert results == [("cancelled",), ("cancelled",)]
+        # Both files stopped long before their 2000 pages were read
+        assert len(seen) < 200
+
+    def test_cancel_before_run(self):
+        extraction = BatchExtraction(["a.pdf"], page_texts=slow_pages)
+        extraction.cancel()
+        assert extraction.run() == [("cancelled",)]
@@ -0,0 +1,177 @@
+"""
+Unit tests for the CSV study-session importer.
+Run with: pytest tests/test_session_import.py -v
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+
+class TestParsing:
+    def test_parse_duration(self):
+        from src.data.session_import import parse_duration
+        assert parse_duration("01:30:00") == 5400
+        assert parse_duration("1:30") == 5400
+        assert parse_duration("1h30") == 5400
+        assert parse_duration("2h") == 7200
+        assert parse_duration("90min") == 5400
+        assert parse_duration("90") == 5400
+        assert parse_duration("1,5") == 90  # bare numbers are minutes
+        assert parse_duration("45s") == 45
+        assert parse_duration("") is None
+        assert parse_duration("0") is None
+        assert parse_duration("abc") is None
+
+    def test_map_columns_ignores_case_and_accents(self):
+        from src.data.session_import import map_columns
+        mapping = map_columns(["Disciplina", "Tópico", "DATA", "Duração", "Acertos", "Erros", "Outra"])
+        assert mapping == {"subject": 0, "topic": 1, "date": 2, "duration": 3, "correct": 4, "wrong": 5}
+
+
+class TestSessionImporter:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+        self.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data import session_import
+        self.module = session_import
+        self.tmp_path = tmp_path
+        self.sid = self.crud.add_subject_return_id("Direito Constitucional", "Cat", "#000000")
+
+        yield
+
+        database_module.db = original_db
+        test_db.close_all()
+
+    def write_csv(self, text, name="sessoes.csv"):
+        path = self.tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def sessions(self):
+        return self.db.fetch_all("SELECT * FROM study_sessions WHERE subject_id = ? ORDER BY date", (self.sid,))
+
+    def test_imports_valid_rows_and_reports_rejected(self):
+        path = self.write_csv(
+            "Disciplina;Tópico;Data;Duração;Tipo;Acertos;Erros\n"
+            "direito constitucional;Art. 5º;10/01/2026 08:00;1h30;Questoes;8;2\n"
+            "Direito Constitucional;Art. 6º;2026-01-11 09:00:00;45;teoria;;\n"
+            "Inexistente;X;10/01/2026;1h;;0;0\n"
+            "Direito Constitucional;Y;31/02/2026;1h;;0;0\n"
+            "Direito Constitucional;Z;10/01/2026;zero;;0;0\n"
+            "Direito Constitucional;W;10/01/2026;1h;;-1;0\n"
+            ";;;;;;\n"
+        )
+
+        result = self.module.SessionImporter(schedule_reviews=False).import_file(path)
+
+        assert result.imported == 2
+        assert result.subject_ids == {self.sid}
+        assert [(r.line, r.reason.split(":")[0]) for r in result.rejected] == [
+            (4, "Disciplina desconhecida"), (5, "Data inválida"), (6, "Duração inválida"),
+            (7, "Valores negativos não são permitidos"),
+        ]
+        first, second = self.sessions()
+        assert (first['date'], first['duration_seconds'], first['type']) == ("2026-01-10 08:00:00", 5400, "QUESTÕES")
+        assert (first['questions_correct'], first['questions_wrong']) == (8, 2)
+        assert (second['duration_seconds'], second['type'], second['questions_correct']) == (2700, "TEORIA", 0)
+
+    def test_inserts_in_chunks(self, monkeypatch):
+        lines = ["disciplina,data,duracao"] + [f"Direito Constitucional,2026-01-01 10:{i % 60:02d}:00,30" for i in range(1050)]
+        path = self.write_csv("\n".join(lines) + "\n")
+        importer = self.module.SessionImporter(schedule_reviews=False, chunk_size=500)
+        chunks = []
+        original = importer._insert_chunk
+        monkeypatch.setattr(importer, "_insert_chunk", lambda rows: chunks.append(len(rows)) or original(rows))
+        progress = []
+
+        result = importer.import_file(path, on_progress=lambda lines, done: progress.append(done))
+
+        assert result.imported == 1050
+        assert chunks == [500, 500, 50]
+        assert progress == [500, 1000, 1050]
+        assert len(self.sessions()) == 1050
+
+    def test_reviews_are_scheduled_once_at_the_end(self, monkeypatch):
+        path = self.write_csv(
+            "disciplina,topico,data,duracao,acertos,erros\n"
+            "Direito Constitucional,Art. 5º,2026-01-12 10:00:00,1h,9,1\n"
+            "Direito Constitucional,Art. 5º,2026-01-10 10:00:00,1h,9,1\n"
+            "Direito Constitucional,,2026-01-10 10:00:00,1h,0,0\n"
+        )
+        calls = []
+        original = self.crud.schedule_reviews_bulk
+        monkeypatch.setattr(self.crud, "schedule_reviews_bulk", lambda s, **kw: calls.append(list(s)) or original(s, **kw))
+
+        self.module.SessionImporter(schedule_reviews=True, chunk_size=1, now=datetime(2026, 1, 13)).import_file(path)
+
+        # One call, chronological, sessions without a topic skipped
+        assert len(calls) == 1
+        assert [s[4] for s in calls[0]] == ["2026-01-10 10:00:00", "2026-01-12 10:00:00"]
+        state = self.db.fetch_one("SELECT repetitions FROM review_schedule WHERE subject_id = ?", (self.sid,))
+        assert state['repetitions'] == 2
+
+    def test_old_sessions_do_not_flood_overdue_reviews(self):
+        path = self.write_csv(
+            "disciplina,topico,data,duracao,acertos,erros\n"
+            "Direito Constitucional,Art. 1º,2023-03-01 10:00:00,1h,9,1\n"
+            "Direito Constitucional,Art. 2º,2024-07-15 10:00:00,1h,5,5\n"
+            "Direito Constitucional,Art. 3º,2026-01-10 10:00:00,1h,9,1\n"
+        )
+        now = datetime(2026, 1, 20, 12, 0, 0)
+
+        assert not self.module.SessionImporter().schedule_reviews
+        result = self.module.SessionImporter(schedule_reviews=True, now=now).import_file(path)
+
+        assert result.imported == 3
+        reviews = self.db.fetch_all("SELECT topic, date_time FROM reminders WHERE subject_id = ?", (self.sid,))
+        # Only the recent session is scheduled, and never before the import
+        assert [r['topic'] for r in reviews] == ["Art. 3º"]
+        assert reviews[0]['date_time'] >= "2026-01-20 12:00:00"
+
+    def test_create_subjects_and_subject_id_column(self):
+        path = self.write_csv(
+            "subject_id,subject_name,date,duration_seconds\n"
+            f"{self.sid},,2026-01-10 10:00:00,600\n"
+            ",Nova Disciplina,2026-01-10 10:00:00,300\n"
+            ",nova disciplina,2026-01-11 10:00:00,300\n"
+        )
+
+        result = self.module.SessionImporter(create_subjects=True, schedule_reviews=False).import_file(path)
+
+        assert result.imported == 3
+        created = [s for s in self.crud.get_all_subjects() if s['name'] == "Nova Disciplina"]
+        assert len(created) == 1
+        assert result.subject_ids == {self.sid, created[0]['id']}
+
+    def test_missing_required_column(self):
+        path = self.write_csv("disciplina,duracao\nDireito Constitucional,1h\n")
+        with pytest.raises(ValueError):
+            self.module.SessionImporter().import_file(path)
+
+    def test_rejected_report(self):
+        from src.data.session_import import RejectedRow, write_rejected_report
+        report = self.tmp_path / "rejeitadas.csv"
+        write_rejected_report([RejectedRow(3, "Data inválida", ["A", "x"])], str(report))
+        assert report.read_text(encoding="utf-8").splitlines() == ["linha,motivo,conteudo", "3,Data inválida,A | x"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
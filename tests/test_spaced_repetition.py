@@ -0,0 +1,70 @@
+"""
+Unit tests for the SM-2 scheduling rules.
+Run with: pytest tests/test_spaced_repetition.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.spaced_repetition import (
+    INITIAL_STATE,
+    MIN_EASE,
+    NO_QUESTIONS_QUALITY,
+    ReviewState,
+    next_state,
+    quality_from_accuracy,
+)
+
+
+class TestQuality:
+    def test_accuracy_bands(self):
+        assert quality_from_accuracy(10, 0) == 5
+        assert quality_from_accuracy(8, 2) == 4
+        assert quality_from_accuracy(6, 4) == 3
+        assert quality_from_accuracy(4, 6) == 2
+        assert quality_from_accuracy(1, 9) == 1
+        assert quality_from_accuracy(0, 10) == 0
+
+    def test_no_questions(self):
+        assert quality_from_accuracy(0, 0) == NO_QUESTIONS_QUALITY
+        assert quality_from_accuracy(None, None) == NO_QUESTIONS_QUALITY
+
+
+class TestNextState:
+    def test_classic_sequence(self):
+        s1 = next_state(None, 5)
+        s2 = next_state(s1, 5)
+        s3 = next_state(s2, 5)
+        assert (s1.repetitions, s1.interval_days) == (1, 1)
+        assert (s2.repetitions, s2.interval_days) == (2, 6)
+        assert s3.repetitions == 3
+        assert s3.interval_days == round(6 * s3.ease)
+        assert s3.ease > INITIAL_STATE.ease
+
+    def test_failure_resets_but_keeps_lower_ease(self):
+        good = ReviewState(4, 2.5, 40)
+        failed = next_state(good, 1)
+        assert failed.repetitions == 0
+        assert failed.interval_days == 1
+        assert failed.ease < good.ease
+
+    def test_low_accuracy_grows_slower(self):
+        strong = weak = None
+        for _ in range(5):
+            strong = next_state(strong, 5)
+            weak = next_state(weak, 3)
+        assert weak.interval_days < strong.interval_days
+
+    def test_ease_floor(self):
+        state = None
+        for _ in range(20):
+            state = next_state(state, 0)
+        assert state.ease == pytest.approx(MIN_EASE)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
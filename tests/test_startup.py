@@ -0,0 +1,70 @@
+"""
+Cold-start checks based on `python -X importtime`.
+Run with: pytest tests/test_startup.py -v
+
+Each check runs a fresh interpreter in an empty working directory, so
+nothing is cached and no database file exists beforehand.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import budgets in milliseconds (generous, to absorb slow CI machines)
+DATA_LAYER_BUDGET_MS = 300
+MAIN_BUDGET_MS = 2500
+
+# Modules main.py must not import before the first frame
+DEFERRED_MODULES = [
+    "src.pages.dashboard",
+    "src.components.study_modal",
+    "src.components.timer_overlay",
+    "src.components.planning_wizard",
+    "src.data.crud",
+    "src.data.database",
+]
+
+
+def run_importtime(module, cwd):
+    """Import `module` in a fresh interpreter; return {module: cumulative_us}."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_data_layer_import_is_cheap_and_lazy(tmp_path):
+    timings = run_importtime("src.data.crud", tmp_path)
+
+    assert timings["src.data.crud"] / 1000 < DATA_LAYER_BUDGET_MS
+    # The schema/migration pass must not run at import time
+    assert not (tmp_path / "estudei.db").exists()
+
+
+def test_main_defers_pages_and_database(tmp_path):
+    pytest.importorskip("flet")
+    timings = run_importtime("main", tmp_path)
+
+    assert timings["main"] / 1000 < MAIN_BUDGET_MS
+    for module in DEFERRED_MODULES:
+        assert module not in timings, f"{module} is imported before the first frame"
+    assert not (tmp_path / "estudei.db").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
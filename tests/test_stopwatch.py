@@ -0,0 +1,152 @@
+"""
+Unit tests for the monotonic stopwatch and the shared ticker.
+Run with: pytest tests/test_stopwatch.py -v
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.stopwatch import Stopwatch, Ticker, format_hms
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestStopwatch:
+    def test_starts_at_zero(self):
+        sw = Stopwatch(clock=FakeClock())
+        assert sw.elapsed() == 0
+        assert not sw.running
+
+    def test_pause_freezes_elapsed(self):
+        clock = FakeClock()
+        sw = Stopwatch(clock=clock)
+        sw.start()
+        clock.advance(90)
+        sw.pause()
+        clock.advance(600)
+        assert sw.elapsed() == 90
+
+    def test_start_twice_does_not_reset_span(self):
+        clock = FakeClock()
+        sw = Stopwatch(clock=clock)
+        sw.start()
+        clock.advance(10)
+        sw.start()
+        clock.advance(5)
+        assert sw.elapsed() == 15
+
+    def test_reset(self):
+        clock = FakeClock()
+        sw = Stopwatch(clock=clock)
+        sw.start()
+        clock.advance(10)
+        sw.reset(42)
+        assert not sw.running
+        assert sw.elapsed() == 42
+
+    def test_long_session_accuracy_with_late_ticks(self):
+        """
+        Simulate an 8h session with pauses where UI ticks arrive late and
+        irregularly (as under load). The stopwatch must match the real
+        running time exactly, while a per-tick counter drifts.
+        """
+        rng = random.Random(1234)
+        clock = FakeClock()
+        sw = Stopwatch(clock=clock)
+
+        expected = 0.0
+        naive_counter = 0  # Old behaviour: +1 per tick
+        for _block in range(16):
+            sw.start()
+            running_for = 0.0
+            while running_for < 30 * 60:
+                step = 1.0 + rng.uniform(0.0, 0.4)  # Tick delivered late
+                clock.advance(step)
+                running_for += step
+                naive_counter += 1
+            expected += running_for
+            sw.pause()
+            clock.advance(rng.uniform(60, 900))  # Break, not counted
+
+        assert sw.elapsed() == pytest.approx(expected, abs=1e-6)
+        assert int(sw.elapsed()) >= 8 * 3600
+        # The counter approach loses minutes over the same session
+        assert expected - naive_counter > 60
+
+    def test_format_hms(self):
+        assert format_hms(0) == "00:00:00"
+        assert format_hms(3661.9) == "01:01:01"
+        assert format_hms(36000) == "10:00:00"
+
+
+class TestTicker:
+    def test_calls_callbacks_and_stops_when_empty(self):
+        ticker = Ticker(interval=0.01)
+        calls = threading.Event()
+        ticker.add(calls.set)
+        assert calls.wait(timeout=2)
+        assert ticker.active
+
+        ticker.remove(calls.set)
+        deadline = time.monotonic() + 2
+        while ticker.active and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert not ticker.active
+
+    def test_single_thread_shared_by_subscribers(self):
+        ticker = Ticker(interval=0.01)
+        hits = {"a": 0, "b": 0}
+
+        def a():
+            hits["a"] += 1
+
+        def b():
+            hits["b"] += 1
+
+        before = threading.active_count()
+        ticker.add(a)
+        ticker.add(b)
+        for _ in range(5):
+            ticker.remove(a)
+            ticker.add(a)
+        assert threading.active_count() - before <= 1
+
+        time.sleep(0.1)
+        ticker.remove(a)
+        ticker.remove(b)
+        assert hits["a"] > 0 and hits["b"] > 0
+
+    def test_failing_callback_does_not_kill_thread(self):
+        ticker = Ticker(interval=0.01)
+        ok = threading.Event()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        ticker.add(broken)
+        ticker.add(ok.set)
+        assert ok.wait(timeout=2)
+        ticker.remove(broken)
+        ticker.remove(ok.set)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,93 @@
+"""
+Unit tests for the weekly study-cycle generator.
+Run with: pytest tests/test_study_cycle.py -v
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.study_cycle import (
+    SLOT_MINUTES,
+    build_cycle,
+    format_hours,
+    minutes_per_subject,
+    parse_hours,
+)
+
+FULL_WEEK = {day: 24 * 60 for day in range(7)}
+
+
+class TestBuildCycle:
+    def test_fills_each_day_exactly(self):
+        minutes = {0: 150, 1: 0, 2: 60, 6: 45}
+        slots = build_cycle({"a": 1.0, "b": 1.0}, minutes)
+
+        per_day = {}
+        for s in slots:
+            per_day[s.weekday] = per_day.get(s.weekday, 0) + s.minutes
+        assert per_day == {0: 150, 2: 60, 6: 45}
+        # Positions restart at 0 every day
+        monday = [s.position for s in slots if s.weekday == 0]
+        assert monday == list(range(len(monday)))
+
+    def test_higher_priority_comes_first_and_more_often(self):
+        slots = build_cycle({"a": 1.0, "b": 3.0}, {0: 8 * 60})
+        assert slots[0].subject_id == "b"
+        assert minutes_per_subject(slots) == {"a": 120, "b": 360}
+
+    def test_round_robin_interleaves_equal_subjects(self):
+        slots = build_cycle({"a": 1.0, "b": 1.0, "c": 1.0}, {0: 6 * 60})
+        assert [s.subject_id for s in slots] == ["a", "b", "c", "a", "b", "c"]
+
+    def test_consecutive_blocks_of_one_subject_are_merged(self):
+        slots = build_cycle({"only": 1.0}, {0: 4 * 60, 1: 90})
+        assert [(s.weekday, s.position, s.minutes) for s in slots] == [(0, 0, 240), (1, 0, 90)]
+
+    def test_no_subjects_or_no_time(self):
+        assert build_cycle({}, FULL_WEEK) == []
+        assert build_cycle({"a": 0.0}, FULL_WEEK) == []
+        assert build_cycle({"a": 1.0}, {}) == []
+
+
+class TestLargePlans:
+    def test_thousands_of_slots_are_proportional(self):
+        rng = random.Random(42)
+        priorities = {i: rng.uniform(0.2, 3.0) for i in range(300)}
+
+        slots = build_cycle(priorities, FULL_WEEK, slot_minutes=5)
+
+        week = 7 * 24 * 60
+        assert sum(s.minutes for s in slots) == week
+        # Weighted round-robin keeps every subject within one slot of its share
+        totals = minutes_per_subject(slots)
+        total_priority = sum(priorities.values())
+        for sid, p in priorities.items():
+            assert abs(totals.get(sid, 0) - week * p / total_priority) <= 5
+
+    def test_replanning_is_deterministic(self):
+        priorities = {i: 1 + (i % 5) for i in range(1000)}
+        first = build_cycle(priorities, FULL_WEEK, slot_minutes=SLOT_MINUTES // 2)
+        second = build_cycle(dict(priorities), FULL_WEEK, slot_minutes=SLOT_MINUTES // 2)
+        assert first == second
+
+
+class TestHoursText:
+    def test_parse_hours(self):
+        assert parse_hours("06:00") == 6
+        assert parse_hours("6:30") == 6.5
+        assert parse_hours("2,5") == 2.5
+        assert parse_hours("abc") is None
+        assert parse_hours("25:00") is None
+
+    def test_format_hours(self):
+        assert format_hours(6.5) == "06:30"
+        assert format_hours(0) == "00:00"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
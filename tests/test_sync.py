@@ -0,0 +1,210 @@
+"""
+Unit tests for the changelog triggers and shared-folder sync.
+Run with: pytest tests/test_sync.py -v
+"""
+
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+
+class TestSync:
+    """Two machines (databases) sharing one folder."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        (tmp_path / "desktop").mkdir()
+        (tmp_path / "laptop").mkdir()
+        self.desktop = build_test_db(tmp_path / "desktop")
+        self.laptop = build_test_db(tmp_path / "laptop")
+        self.folder = str(tmp_path / "shared")
+
+        database_module.db = self.desktop
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+        import src.data.sync as sync_module
+        self.sync = sync_module
+
+        yield
+
+        database_module.db = original_db
+        self.desktop.close_all()
+        self.laptop.close_all()
+
+    def use(self, machine):
+        """Point crud (and so sync) at one machine's database."""
+        self.crud.db = machine
+
+    def subjects(self):
+        return {s['name']: s for s in self.crud.get_all_subjects()}
+
+    def test_changelog_records_writes_and_cascades(self):
+        self.use(self.desktop)
+        start = self.desktop.fetch_one("SELECT MAX(clock) as c FROM changelog")['c']
+        sid = self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        self.crud.add_topics_bulk(sid, ["1. Crime"])
+        self.crud.delete_subject(sid)
+
+        rows = self.desktop.fetch_all("SELECT * FROM changelog WHERE clock > ? ORDER BY clock", (start,))
+        clocks = [r['clock'] for r in rows]
+        assert clocks == sorted(set(clocks))
+        subject_uid = rows[0]['uid']
+        topic = next(r for r in rows if r['table_name'] == "topics" and r['op'] == "U")
+        assert json.loads(topic['data'])['subject_id'] == subject_uid
+        assert [(r['table_name'], r['op']) for r in rows[-2:]] == [("topics", "D"), ("subjects", "D")]
+
+    def test_sync_copies_rows_and_resolves_foreign_keys(self):
+        self.use(self.desktop)
+        sid = self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        self.crud.add_topics_bulk(sid, ["1. Crime", "1.1. Tipicidade"])
+        self.crud.add_study_session(sid, "Crime", 3600, "TEORIA", date="2026-03-01 10:00:00")
+        self.sync.sync_folder(self.folder)
+
+        self.use(self.laptop)
+        result = self.sync.sync_folder(self.folder)
+
+        subjects = self.subjects()
+        assert len(subjects) == 8  # Seeded subjects are shared, not duplicated
+        penal = subjects["Direito Penal"]
+        topics = self.crud.get_topics_by_subject(penal['id'])
+        assert [t['title'] for t in topics] == ["1. Crime", "1.1. Tipicidade"]
+        assert topics[1]['parent_id'] == topics[0]['id']
+        sessions = self.laptop.fetch_all("SELECT * FROM study_sessions")
+        assert [(s['subject_id'], s['duration_seconds']) for s in sessions] == [(penal['id'], 3600)]
+        assert result.applied > 0
+
+    def test_sync_is_incremental(self):
+        self.use(self.desktop)
+        self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        first = self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        self.sync.sync_folder(self.folder)
+
+        self.use(self.desktop)
+        self.crud.add_subject_return_id("Direito Civil", "Direito", "#000000")
+        second = self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        result = self.sync.sync_folder(self.folder)
+
+        assert second.exported == 1 < first.exported
+        assert result.applied == 1
+        assert "Direito Civil" in self.subjects()
+        assert self.sync.sync_folder(self.folder).applied == 0
+
+    def test_concurrent_edits_converge(self):
+        self.use(self.desktop)
+        sid = self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        self.sync.sync_folder(self.folder)
+
+        # Both rename the same subject offline
+        laptop_id = self.subjects()["Direito Penal"]['id']
+        self.crud.update_subject_details(laptop_id, "Penal (laptop)", "#111111")
+        self.use(self.desktop)
+        self.crud.update_subject_details(sid, "Penal (desktop)", "#222222")
+
+        for machine in (self.desktop, self.laptop, self.desktop):
+            self.use(machine)
+            self.sync.sync_folder(self.folder)
+
+        names = []
+        for machine in (self.desktop, self.laptop):
+            self.use(machine)
+            names.append(sorted(self.subjects()))
+        assert names[0] == names[1]
+        assert len([n for n in names[0] if n.startswith("Penal")]) == 1
+
+    def test_delete_propagates_with_cascade(self):
+        self.use(self.desktop)
+        sid = self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        self.crud.add_topics_bulk(sid, ["1. Crime"])
+        self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        self.sync.sync_folder(self.folder)
+
+        self.use(self.desktop)
+        self.crud.delete_subject(sid)
+        self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        self.sync.sync_folder(self.folder)
+
+        assert "Direito Penal" not in self.subjects()
+        assert self.laptop.fetch_one("SELECT COUNT(*) as n FROM topics")['n'] == 0
+        # Applying did not log the received changes as new local ones
+        assert self.sync.local_changes(int(self.sync.get_state("exported_seq", 0)))[0] == []
+
+    def test_stale_and_duplicate_changes_are_skipped(self):
+        self.use(self.laptop)
+        newer = {"clock": 1000, "device": "aa", "table": "subjects", "uid": "x1", "op": "U", "data": {"name": "Nova"}}
+        older = {"clock": 999, "device": "bb", "table": "subjects", "uid": "x1", "op": "D", "data": None}
+        assert self.sync.apply_changes([newer]) == (1, 0)
+        assert self.sync.apply_changes([older, newer]) == (0, 2)
+        assert "Nova" in self.subjects()
+
+    def test_child_before_parent_in_a_compacted_batch(self):
+        self.use(self.laptop)
+        applied, _ = self.sync.apply_changes([
+            {"clock": 5, "device": "aa", "table": "topics", "uid": "t1", "op": "U", "data": {"subject_id": "s1", "title": "1. Crime"}},
+            {"clock": 9, "device": "aa", "table": "subjects", "uid": "s1", "op": "U", "data": {"name": "Penal"}},
+        ])
+        topic = self.laptop.fetch_one("SELECT * FROM topics WHERE uid = 't1'")
+        assert applied == 2
+        assert topic['subject_id'] == self.subjects()["Penal"]['id']
+
+    def test_existing_install_gets_seed_uids(self, tmp_path):
+        import sqlite3
+        from src.data.database import SEED_SUBJECTS
+        old = tmp_path / "old"
+        old.mkdir()
+        conn = sqlite3.connect(old / "test_estudei.db")
+        conn.execute("CREATE TABLE subjects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, category TEXT, "
+                     "total_topics INTEGER DEFAULT 0, completed_topics INTEGER DEFAULT 0)")
+        conn.executemany("INSERT INTO subjects (name, category) VALUES (?, ?)",
+                         [("Minha disciplina", "X")] + [(s[0], s[1]) for s in reversed(SEED_SUBJECTS)])
+        conn.commit()
+        conn.close()
+
+        machine = build_test_db(old)
+        try:
+            uids = {r['name']: r['uid'] for r in machine.fetch_all("SELECT name, uid FROM subjects")}
+            assert uids["Direito Constitucional"] == "seed-5"
+            assert uids["Informática"] == "seed-7"
+            assert not uids["Minha disciplina"].startswith("seed-")
+        finally:
+            machine.close_all()
+
+    def test_changelog_is_pruned_on_start(self, tmp_path):
+        self.use(self.desktop)
+        sid = self.crud.add_subject_return_id("Direito Penal", "Direito", "#000000")
+        for n in range(5):
+            self.crud.update_subject_details(sid, f"Penal {n}", "#000000")
+        self.crud.add_plan("TJ", "", subject_ids=[sid])
+        uid = self.desktop.fetch_one("SELECT uid FROM subjects WHERE id = ?", (sid,))['uid']
+        last_clock = self.desktop.fetch_one("SELECT MAX(clock) as c FROM changelog WHERE uid = ?", (uid,))['c']
+        self.desktop.close_all()
+
+        self.desktop = build_test_db(tmp_path / "desktop")  # Next start
+        self.use(self.desktop)
+        rows = self.desktop.fetch_all("SELECT * FROM changelog WHERE uid = ?", (uid,))
+        assert [r['clock'] for r in rows] == [last_clock]
+        assert rows[0]['before'] is None
+        assert self.desktop.fetch_one("SELECT COUNT(*) as n FROM changelog WHERE table_name = 'plan_subjects'")['n'] == 0
+        # The kept entry still wins over an older change, and sync still carries the row
+        stale = {"clock": last_clock - 1, "device": "ff", "table": "subjects", "uid": uid, "op": "D", "data": None}
+        assert self.sync.apply_changes([stale]) == (0, 1)
+        self.sync.sync_folder(self.folder)
+        self.use(self.laptop)
+        self.sync.sync_folder(self.folder)
+        assert "Penal 4" in self.subjects()
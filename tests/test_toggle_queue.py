@@ -0,0 +1,136 @@
+"""
+Unit tests for the coalescing topic toggle queue.
+Run with: pytest tests/test_toggle_queue.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.events import EventBus, EventType
+from test_crud import build_test_db
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def on_events(self, events):
+        self.calls.append(events)
+
+
+class TestTopicToggleQueue:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data.toggle_queue import TopicToggleQueue
+        self.bus = EventBus(delay=60, max_delay=60)
+        self.recorder = Recorder()
+        self.bus.subscribe(self.recorder.on_events)
+        # Long delay so nothing is written unless the test flushes
+        self.queue = TopicToggleQueue(delay=60, max_delay=60, event_bus=self.bus)
+
+        self.subject_id = self.crud.add_subject_return_id("Direito", "Cat", "#000000")
+        self.crud.add_topics_bulk(self.subject_id, [f"T{i}" for i in range(20)])
+        self.topic_ids = [t['id'] for t in self.crud.get_topics_by_subject(self.subject_id)]
+
+        yield
+
+        self.queue.flush()
+        database_module.db = original_db
+        test_db.close_all()
+
+    def completed_ids(self):
+        return {t['id'] for t in self.crud.get_topics_by_subject(self.subject_id) if t['completed']}
+
+    def test_burst_written_once_on_flush(self):
+        for tid in self.topic_ids:
+            self.queue.toggle(tid, True, previous=False)
+        assert self.completed_ids() == set()  # Nothing written yet
+
+        affected = self.queue.flush()
+        self.bus.flush()
+
+        assert affected == {self.subject_id}
+        assert self.completed_ids() == set(self.topic_ids)
+        assert self.crud.get_subject_by_id(self.subject_id)['completed_topics'] == 20
+        assert len(self.recorder.calls) == 1
+        (event,) = self.recorder.calls[0]
+        assert event.type is EventType.TOPIC_TOGGLED
+        assert event.ids == frozenset(self.topic_ids)
+        assert event.subject_ids == {self.subject_id}
+
+    def test_last_value_wins(self):
+        tid = self.topic_ids[0]
+        self.queue.toggle(tid, True, previous=False)
+        self.queue.toggle(tid, False, previous=True)
+        self.queue.toggle(tid, True, previous=False)
+        assert self.queue.pending(tid) is True
+
+        self.queue.flush()
+        assert self.completed_ids() == {tid}
+
+    def test_toggle_undone_before_flush_is_dropped(self):
+        tid = self.topic_ids[0]
+        self.queue.toggle(tid, True, previous=False)
+        self.queue.toggle(tid, False, previous=True)
+        assert self.queue.pending(tid) is None
+
+        assert self.queue.flush() == set()
+        self.bus.flush()
+        assert self.recorder.calls == []
+
+    def test_flush_without_changes(self):
+        assert self.queue.flush() == set()
+
+    def test_debounced_flush_happens_on_timer(self):
+        from src.data.toggle_queue import TopicToggleQueue
+        queue = TopicToggleQueue(delay=0.01, max_delay=0.05, event_bus=self.bus)
+        queue.toggle(self.topic_ids[0], True, previous=False)
+
+        queue._timer.join(timeout=2)
+        assert self.completed_ids() == {self.topic_ids[0]}
+
+    def test_failed_flush_is_retried(self, monkeypatch):
+        from src.data.toggle_queue import TopicToggleQueue
+        queue = TopicToggleQueue(delay=0.2, max_delay=0.5, event_bus=self.bus)
+        original = self.crud.toggle_topics_bulk
+        attempts = []
+
+        def flaky(changes):
+            attempts.append(dict(changes))
+            if len(attempts) == 1:
+                raise RuntimeError("database is locked")
+            return original(changes)
+
+        monkeypatch.setattr(self.crud, "toggle_topics_bulk", flaky)
+        first, second = self.topic_ids[:2]
+        queue.toggle(first, True, previous=False)
+        queue.toggle(second, True, previous=False)
+
+        assert queue.flush() == set()
+        assert queue.pending(first) is True
+        # The original value is kept, so undoing before the retry still drops it
+        queue.toggle(second, False, previous=True)
+        assert queue.pending(second) is None
+
+        queue._timer.join(timeout=2)  # Retry scheduled by the failed flush
+        assert len(attempts) == 2
+        assert self.completed_ids() == {first}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+Unit tests for staged topic editing (SubjectEditModal's edit session).
+Run with: pytest tests/test_topic_editor.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_crud import build_test_db
+
+
+class TestTopicEditSession:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        import src.data.database as database_module
+        original_db = database_module.db
+
+        test_db = build_test_db(tmp_path)
+        database_module.db = test_db
+
+        import importlib
+        import src.data.crud as crud_module
+        importlib.reload(crud_module)
+        self.crud = crud_module
+
+        from src.data.topic_editor import TopicEditSession
+        self.Session = TopicEditSession
+
+        self.subject_id = self.crud.add_subject_return_id("Direito", "Cat", "#000000")
+        self.crud.add_topics_bulk(self.subject_id, [f"T{i}" for i in range(500)])
+
+        yield
+
+        database_module.db = original_db
+        test_db.close_all()
+
+    def titles(self):
+        return [t['title'] for t in self.crud.get_topics_by_subject(self.subject_id)]
+
+    def test_nothing_written_until_commit(self):
+        session = self.Session(self.subject_id)
+        session.rename(session.items[0], "Renomeado")
+        session.delete(session.items[1])
+        session.add("Novo")
+        session.move(0, 10)
+
+        assert self.titles()[:2] == ["T0", "T1"]
+        assert session.dirty
+
+    def test_move_rewrites_one_row(self):
+        session = self.Session(self.subject_id)
+        session.move(400, 3)
+        session.move(0, 499)
+
+        added, updated, deleted = session.changes()
+        assert added == [] and deleted == []
+        assert len(updated) == 2
+
+        session.commit()
+        titles = self.titles()
+        assert titles[2] == "T400"  # T0 moved out from in front of it
+        assert titles[-1] == "T0"
+        assert len(titles) == 500
+
+    def test_renumbers_only_when_gap_exhausted(self):
+        session = self.Session(self.subject_id)
+        # Keep inserting at the same spot until the gap between two neighbours runs out
+        moves = 0
+        while True:
+            session.move(len(session) - 1, 1)
+            moves += 1
+            if len(session.changes()[1]) > moves:
+                break
+        assert moves > 5  # log2(gap) moves fit before a renumber
+
+        expected = [item["title"] for item in session.items]
+        session.commit()
+        assert self.titles() == expected
+
+    def test_commit_applies_all_changes_and_stats(self):
+        session = self.Session(self.subject_id)
+        session.rename(session.items[0], "Renomeado")
+        session.delete(session.items[1])
+        session.add("Novo")
+        session.move(len(session) - 1, 0)
+
+        assert session.commit()
+        titles = self.titles()
+        assert titles[:3] == ["Novo", "Renomeado", "T2"]
+        assert "T1" not in titles
+        assert self.crud.get_subject_by_id(self.subject_id)['total_topics'] == 500
+        assert not session.dirty
+        assert not session.commit()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
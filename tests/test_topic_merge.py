@@ -0,0 +1,65 @@
+"""
+Unit tests for matching an updated edital against stored topics.
+Run with: pytest tests/test_topic_merge.py -v
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.topic_merge import TrigramIndex, diff_topics, normalize_title, trigrams
+
+
+class TestNormalizeTitle:
+    def test_drops_numbering_accents_and_punctuation(self):
+        assert normalize_title("1.2. Administração  Pública;") == "administracao publica"
+        assert normalize_title("• Licitações - Lei 14.133") == "licitacoes lei 14 133"
+
+    def test_renumbered_lines_share_a_key(self):
+        assert normalize_title("3.1 Atos administrativos") == normalize_title("4.2. ATOS ADMINISTRATIVOS")
+
+
+class TestTrigramIndex:
+    def test_best_match_and_threshold(self):
+        index = TrigramIndex()
+        index.add(1, "controle de constitucionalidade")
+        index.add(2, "direitos sociais")
+        assert index.best_match("controle da constitucionalidade") == 1
+        assert index.best_match("servidores publicos") is None
+
+    def test_taken_ids_are_skipped(self):
+        index = TrigramIndex()
+        index.add(1, "atos administrativos")
+        index.taken.add(1)
+        assert index.best_match("atos administrativos") is None
+
+    def test_common_trigrams_do_not_select_candidates(self):
+        index = TrigramIndex()
+        for n in range(1000):
+            index.add(n, f"nocao de tema {n * 7919 % 100003} da administracao")
+        index.add(1000, "licitacao de obras publicas")
+        candidates = index.candidates(trigrams("licitacoes de obras publicas"))
+        assert 1000 in candidates
+        assert len(candidates) < 100
+        assert index.best_match("licitacoes de obras publicas") == 1000
+
+
+class TestDiffTopics:
+    def test_exact_fuzzy_insert_and_delete(self):
+        existing = [(10, "1. Poderes"), (11, "1.1 Poder de polícia"), (12, "2. Licitações")]
+        incoming = ["1. Poderes", "1.1. Poder de polícia administrativa", "1.2. Poder hierárquico"]
+
+        diff = diff_topics(existing, incoming)
+
+        assert diff.matches == [(10, 0), (11, 1)]
+        assert diff.inserts == [2]
+        assert diff.deletes == [12]
+
+    def test_duplicate_titles_match_one_to_one(self):
+        existing = [(1, "1. Noções gerais"), (2, "2. Noções gerais")]
+        diff = diff_topics(existing, ["1. Noções gerais", "2. Noções gerais", "3. Noções gerais"])
+
+        assert diff.matches == [(1, 0), (2, 1)]
+        assert diff.inserts == [2]
+        assert diff.deletes == []
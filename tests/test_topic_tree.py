@@ -0,0 +1,78 @@
+"""
+Unit tests for turning edital numbering into a topic tree.
+Run with: pytest tests/test_topic_tree.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.topic_tree import build_tree, make_path, parse_numbering, path_depth, subtree_bounds
+
+
+class TestParseNumbering:
+    def test_numbering_forms(self):
+        assert parse_numbering("1. Direito") == (1,)
+        assert parse_numbering("1.2.3. Direito") == (1, 2, 3)
+        assert parse_numbering("  10.2 Direito") == (10, 2)
+        assert parse_numbering("• Direito") is None
+        assert parse_numbering("Direito 1.2") is None
+
+
+class TestBuildTree:
+    def test_depth_from_numbering(self):
+        nodes = build_tree(["1. A", "1.1. B", "1.1.1. C", "1.2. D", "2. E"])
+
+        assert [n.path for n in nodes] == ["0001", "0001.0001", "0001.0001.0001", "0001.0002", "0002"]
+        assert [n.parent for n in nodes] == [None, 0, 1, 0, None]
+        assert [n.depth for n in nodes] == [0, 1, 2, 1, 0]
+        assert nodes[2].title == "1.1.1. C"
+
+    def test_bullets_go_under_the_last_numbered_line(self):
+        nodes = build_tree(["• solto", "1. A", "• a1", "- a2", "1.1. B", "• b1"])
+        assert [(n.path, n.parent) for n in nodes] == [
+            ("0001", None), ("0002", None), ("0002.0001", 1), ("0002.0002", 1),
+            ("0002.0003", 1), ("0002.0003.0001", 4),
+        ]
+
+    def test_restarted_and_skipped_numbering_stay_unique(self):
+        nodes = build_tree(["1. Português", "1.1. Crase", "1. Matemática", "1.1. Frações", "3.2. Órfão"])
+
+        paths = [n.path for n in nodes]
+        assert len(set(paths)) == len(paths)
+        # The second "1.1" belongs to the restarted "1."
+        assert nodes[3].parent == 2
+        # Missing parent: promoted to a top-level section
+        assert nodes[4].parent is None
+
+    def test_first_root_offset_and_blank_lines(self):
+        nodes = build_tree(["", "1. A", "   ", "1.1. B"], first_root=5)
+        assert [n.path for n in nodes] == ["0005", "0005.0001"]
+
+    def test_subtree_bounds_cover_descendants_only(self):
+        lower, upper = subtree_bounds(make_path([3]))
+        inside = ["0003.0001", "0003.0001.0009", "0003.9999"]
+        outside = ["0003", "0004", "0030", "0002.0003"]
+        assert all(lower < p < upper for p in inside)
+        assert not any(lower < p < upper for p in outside)
+        assert path_depth("0003.0001.0002") == 2
+        assert path_depth(None) == 0
+
+    def test_large_edital(self):
+        lines = []
+        for a in range(1, 31):
+            lines.append(f"{a}. Seção {a}")
+            for b in range(1, 11):
+                lines.append(f"{a}.{b}. Item")
+                lines.extend(f"{a}.{b}.{c}. Subitem" for c in range(1, 6))
+        nodes = build_tree(lines)
+        assert len(nodes) == 30 * (1 + 10 * 6)
+        assert len({n.path for n in nodes}) == len(nodes)
+        assert max(n.depth for n in nodes) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,135 @@
+"""
+Unit tests for the per-interaction UI instrumentation (with fake controls).
+Run with: pytest tests/test_ui_metrics.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.ui_metrics import UNATTRIBUTED, UIMetrics, count_controls
+
+
+class FakeControl:
+    """Shaped like ft.Control: update() goes through the page."""
+
+    def __init__(self, controls=None, content=None):
+        self.controls = controls or []
+        self.content = content
+        self.page = None
+
+    def update(self):
+        if self.page:
+            self.page.update(self)
+
+
+class FakePage(FakeControl):
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def update(self, *controls):
+        self.sent += 1
+
+
+class FakeList(FakeControl):
+    pass
+
+
+class FakeScreen:
+    """A page handler that rebuilds a whole list on every click."""
+
+    def __init__(self, page, rows):
+        self.page = page
+        self.rows = rows
+        self.list = FakeList()
+        self.list.page = page
+
+    def handle_click(self):
+        self.list.controls = [FakeControl(content=FakeControl()) for _ in range(self.rows)]
+        self.list.update()
+
+    def toggle_one(self):
+        self.list.controls[0].content = FakeControl()
+        self.page.update(self.list.controls[0])
+
+
+@pytest.fixture
+def metrics():
+    m = UIMetrics()
+    m.install(FakeControl, FakePage)
+    m.instrument_method(FakeScreen, "handle_click", page="Revisões")
+    m.instrument_method(FakeScreen, "toggle_one", page="Revisões")
+    yield m
+    m.uninstall()
+
+
+class TestCountControls:
+    def test_counts_controls_and_content(self):
+        tree = FakeControl(controls=[FakeControl(), FakeControl(content=FakeControl())])
+        assert count_controls(tree) == 4
+
+    def test_prefers_get_children(self):
+        class WithChildren:
+            def __init__(self, children):
+                self.children = children
+
+            def _get_children(self):
+                return self.children
+
+        assert count_controls(WithChildren([WithChildren([]), WithChildren([])])) == 3
+
+
+class TestUIMetrics:
+    def test_counts_per_interaction(self, metrics):
+        page = FakePage()
+        screen = FakeScreen(page, rows=100)
+        metrics.reset()
+
+        screen.handle_click()
+        screen.handle_click()
+        screen.toggle_one()
+
+        report = metrics.report()
+        rebuild = report[("Revisões", "handle_click")]
+        assert (rebuild.runs, rebuild.controls_created, rebuild.updates) == (2, 400, 2)
+        assert rebuild.diff_size == 2 * 201
+        toggle = report[("Revisões", "toggle_one")]
+        assert (toggle.controls_created, toggle.updates, toggle.diff_size) == (1, 1, 2)
+        assert page.sent == 3
+
+    def test_budgets_catch_a_regression(self, metrics):
+        screen = FakeScreen(FakePage(), rows=2000)
+        metrics.reset()
+        screen.handle_click()
+
+        problems = metrics.over_budget({("Revisões", "handle_click"): {"controls_created": 500, "updates": 2}})
+        assert problems == ["Revisões/handle_click: controls_created 4000 > 500"]
+        assert metrics.over_budget({("Revisões", "handle_click"): {"updates": 1}}) == []
+
+    def test_work_outside_interactions_is_unattributed(self, metrics):
+        metrics.reset()
+        FakeControl()
+        with metrics.interaction("abrir", page="Dashboard"):
+            FakeControl()
+            with metrics.interaction("interna"):
+                FakeControl()
+        report = metrics.report()
+        assert report[UNATTRIBUTED].controls_created == 1
+        assert report[("Dashboard", "abrir")].controls_created == 2
+        assert "Dashboard" in metrics.format_report()
+
+    def test_uninstall_restores_classes(self):
+        original_init, original_update = FakeControl.__init__, FakePage.update
+        m = UIMetrics()
+        m.install(FakeControl, FakePage)
+        m.instrument_method(FakeScreen, "handle_click")
+        m.uninstall()
+        assert FakeControl.__init__ is original_init
+        assert FakePage.update is original_update
+        assert "update" not in FakeList.__dict__
+        FakeControl()
+        assert m.report() == {}